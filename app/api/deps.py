@@ -0,0 +1,29 @@
+from fastapi import Depends
+from sqlalchemy.orm import Session
+from app.core.sync_manager import SyncManager, get_sync_manager
+from app.db.session import get_db
+from app.services.auth_service import AuthService
+from app.services.cart_service import CartService
+from app.services.product_service import ProductService
+from app.utils.aws_client import AWSClient, get_lazy_aws_client
+
+def get_auth_service(
+    db: Session = Depends(get_db),
+    aws_client: AWSClient = Depends(get_lazy_aws_client),
+    sync_manager: SyncManager = Depends(get_sync_manager)
+) -> AuthService:
+    return AuthService(db, aws_client, sync_manager)
+
+def get_product_service(
+    db: Session = Depends(get_db),
+    aws_client: AWSClient = Depends(get_lazy_aws_client),
+    sync_manager: SyncManager = Depends(get_sync_manager)
+) -> ProductService:
+    return ProductService(db, aws_client, sync_manager)
+
+def get_cart_service(
+    db: Session = Depends(get_db),
+    aws_client: AWSClient = Depends(get_lazy_aws_client),
+    sync_manager: SyncManager = Depends(get_sync_manager)
+) -> CartService:
+    return CartService(db, aws_client, sync_manager)
\ No newline at end of file
@@ -1,45 +1,59 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.api.deps import get_cart_service
+from app.core.cart_cache import cart_cache
 from app.core.security import get_current_user
-from app.schemas.cart import CartItemCreate, CartItemInDB, CartItemUpdate
+from app.schemas.cart import CartBulkUpdate, CartItemCreate, CartItemInDB, CartItemUpdate, PricedCart
+from app.schemas.user import UserInDB
 from app.services.cart_service import CartService
-from app.db.session import get_db
+from app.utils.serialization import FastJSONResponse
 
 router = APIRouter()
 
-@router.get("/", response_model=list[CartItemInDB])
+@router.get("/", response_model=PricedCart)
 async def get_cart_items(
-    db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user)
+    service: CartService = Depends(get_cart_service),
+    current_user: UserInDB = Depends(get_current_user)
 ):
-    service = CartService(db)
-    return await service.get_cart_items(current_user.id)
+    return FastJSONResponse(await service.get_priced_cart(current_user.id))
+
+@router.get("/cache/stats")
+async def get_cart_cache_stats():
+    return cart_cache.stats
 
 @router.post("/", response_model=CartItemInDB)
 async def add_to_cart(
     item: CartItemCreate,
-    db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user)
+    service: CartService = Depends(get_cart_service),
+    current_user: UserInDB = Depends(get_current_user)
+):
+    return FastJSONResponse(await service.add_to_cart(current_user.id, item))
+
+@router.put("/", response_model=PricedCart)
+async def bulk_update_cart(
+    bulk: CartBulkUpdate,
+    service: CartService = Depends(get_cart_service),
+    current_user: UserInDB = Depends(get_current_user)
 ):
-    service = CartService(db)
-    return await service.add_to_cart(current_user.id, item)
+    return FastJSONResponse(await service.bulk_update_cart(current_user.id, bulk))
 
 @router.put("/{item_id}", response_model=CartItemInDB)
 async def update_cart_item(
     item_id: str,
     item: CartItemUpdate,
-    db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user)
+    service: CartService = Depends(get_cart_service),
+    current_user: UserInDB = Depends(get_current_user)
 ):
-    service = CartService(db)
-    return await service.update_cart_item(item_id, item)
+    updated_item = await service.update_cart_item(current_user.id, item_id, item)
+    if updated_item is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart item not found")
+    return FastJSONResponse(updated_item)
 
 @router.delete("/{item_id}")
 async def remove_from_cart(
     item_id: str,
-    db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_user)
+    service: CartService = Depends(get_cart_service),
+    current_user: UserInDB = Depends(get_current_user)
 ):
-    service = CartService(db)
-    await service.remove_from_cart(item_id)
+    if not await service.remove_from_cart(current_user.id, item_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart item not found")
     return {"message": "Item removed from cart"}
\ No newline at end of file
@@ -0,0 +1,8 @@
+from fastapi import APIRouter
+from app.db.engine import pool_metrics
+
+router = APIRouter()
+
+@router.get("/db-pool")
+async def get_db_pool_metrics():
+    return pool_metrics.snapshot()
\ No newline at end of file
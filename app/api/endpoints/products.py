@@ -1,22 +1,44 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.schemas.product import Product, ProductCreate
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.api.deps import get_product_service
+from app.core.catalog_cache import catalog_cache
+from app.core.config import settings
+from app.schemas.product import Product, ProductCreate, ProductPage
 from app.services.product_service import ProductService
-from app.db.session import get_db
+from app.utils.serialization import FastJSONResponse
 
 router = APIRouter()
 
-@router.get("/", response_model=list[Product])
-async def get_products(db: Session = Depends(get_db)):
-    service = ProductService(db)
-    return await service.get_all_products()
+@router.get("/", response_model=ProductPage)
+async def get_products(
+    category: Optional[str] = None,
+    sort: str = Query("name", regex="^-?(name|price)$"),
+    limit: int = Query(settings.PRODUCTS_PAGE_SIZE, ge=1, le=settings.PRODUCTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    service: ProductService = Depends(get_product_service)
+):
+    # response_model solo documenta: el cuerpo se serializa una vez y sin revalidar
+    return FastJSONResponse(await service.list_products_json(category, sort, limit, cursor))
+
+@router.get("/search", response_model=list[Product])
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    service: ProductService = Depends(get_product_service)
+):
+    return FastJSONResponse(await service.search_products(q, limit))
+
+@router.get("/cache/stats")
+async def get_catalog_cache_stats():
+    return catalog_cache.stats
 
 @router.get("/{product_id}", response_model=Product)
-async def get_product(product_id: str, db: Session = Depends(get_db)):
-    service = ProductService(db)
-    return await service.get_product_by_id(product_id)
+async def get_product(product_id: str, service: ProductService = Depends(get_product_service)):
+    product = await service.get_product_by_id(product_id)
+    if product is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
+    return FastJSONResponse(product)
 
 @router.post("/", response_model=Product)
-async def create_product(product: ProductCreate, db: Session = Depends(get_db)):
-    service = ProductService(db)
+async def create_product(product: ProductCreate, service: ProductService = Depends(get_product_service)):
     return await service.create_product(product)
\ No newline at end of file
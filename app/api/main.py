@@ -1,8 +1,9 @@
 from fastapi import APIRouter
-from app.api.endpoints import auth, products, cart
+from app.api.endpoints import auth, products, cart, metrics
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(products.router, prefix="/products", tags=["products"])
-api_router.include_router(cart.router, prefix="/cart", tags=["cart"])
\ No newline at end of file
+api_router.include_router(cart.router, prefix="/cart", tags=["cart"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
\ No newline at end of file
@@ -0,0 +1,64 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+from app.core.config import settings
+from app.schemas.user import UserInDB
+
+class PrincipalCache:
+    """LRU de tokens ya verificados y su usuario, válido hasta que caduca cada token"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        # token -> (usuario, instante de caducidad del token en segundos epoch)
+        self._entries: "OrderedDict[str, Tuple[UserInDB, float]]" = OrderedDict()
+        self._tokens_by_email: Dict[str, Set[str]] = {}
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0,
+        }
+
+    def get(self, token: str) -> Optional[UserInDB]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        user, expires_at = entry
+        if time.time() >= expires_at:
+            self._discard(token)
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        self._entries.move_to_end(token)
+        return user
+
+    def put(self, token: str, user: UserInDB, expires_at: float):
+        self._discard(token)
+        self._entries[token] = (user, expires_at)
+        self._tokens_by_email.setdefault(user.email, set()).add(token)
+        while len(self._entries) > self.max_entries:
+            self._discard(next(iter(self._entries)))
+            self.stats['evictions'] += 1
+
+    def invalidate_user(self, email: str):
+        """Olvida todos los tokens de un usuario; llamar siempre que cambie su registro"""
+        self.stats['invalidations'] += 1
+        for token in self._tokens_by_email.pop(email, set()):
+            self._entries.pop(token, None)
+
+    def clear(self):
+        self._entries.clear()
+        self._tokens_by_email.clear()
+
+    def _discard(self, token: str):
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_email.get(entry[0].email)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_email[entry[0].email]
+
+principal_cache = PrincipalCache(max_entries=settings.AUTH_CACHE_MAX_ENTRIES)
\ No newline at end of file
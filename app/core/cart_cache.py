@@ -0,0 +1,93 @@
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.core.config import settings
+from app.schemas.cart import CartItemInDB
+from app.schemas.product import Product
+
+CartLine = Tuple[CartItemInDB, Optional[Product]]
+
+class CartCache:
+    """Carritos por usuario (LRU): se cargan al leer y cada mutación los actualiza en el sitio
+
+    Solo ve las mutaciones de su propio proceso; las de otros workers se notan al caducar
+    la entrada, así que el TTL acota cuánto puede quedarse atrás un carrito.
+    """
+
+    def __init__(self, max_users: int = 10000, ttl: float = 2.0):
+        self.max_users = max_users
+        self.ttl = ttl
+        # user_id -> (item_id -> (item, producto), instante de carga)
+        self._carts: "OrderedDict[str, Tuple[Dict[str, CartLine], float]]" = OrderedDict()
+        # Reloj de mutaciones: cada usuario guarda el instante de su última mutación para
+        # descartar solo sus lecturas que empezaron antes. Se recuerdan como mucho max_users;
+        # al olvidar uno, _floor sube y las lecturas anteriores de cualquier usuario se descartan
+        self._clock = 0
+        self._changed: "OrderedDict[str, int]" = OrderedDict()
+        self._floor = 0
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'updates': 0,
+        }
+
+    def generation(self, user_id: str) -> int:
+        """Marca que se toma antes de leer el carrito de `user_id` y se pasa a put()"""
+        return self._clock
+
+    def _touch(self, user_id: str):
+        self._clock += 1
+        self._changed[user_id] = self._clock
+        self._changed.move_to_end(user_id)
+        while len(self._changed) > self.max_users:
+            _, forgotten = self._changed.popitem(last=False)
+            self._floor = max(self._floor, forgotten)
+
+    def get(self, user_id: str) -> Optional[List[CartLine]]:
+        entry = self._carts.get(user_id)
+        if entry is None or time.monotonic() - entry[1] >= self.ttl:
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        self._carts.move_to_end(user_id)
+        return list(entry[0].values())
+
+    def contains(self, user_id: str) -> bool:
+        return user_id in self._carts
+
+    def put(self, user_id: str, lines: Iterable[CartLine], generation: int):
+        """Guarda el carrito leído, salvo que ese usuario haya cambiado algo desde `generation`"""
+        if self._changed.get(user_id, self._floor) > generation:
+            return
+        self._carts[user_id] = ({item.id: (item, product) for item, product in lines}, time.monotonic())
+        self._carts.move_to_end(user_id)
+        while len(self._carts) > self.max_users:
+            self._carts.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def upsert(self, user_id: str, item: CartItemInDB, product: Optional[Product]):
+        self._touch(user_id)
+        entry = self._carts.get(user_id)
+        if entry is not None:
+            self.stats['updates'] += 1
+            entry[0][item.id] = (item, product)
+
+    def remove(self, user_id: str, item_id: str):
+        self._touch(user_id)
+        entry = self._carts.get(user_id)
+        if entry is not None:
+            self.stats['updates'] += 1
+            entry[0].pop(item_id, None)
+
+    def invalidate(self, user_id: Optional[str] = None):
+        if user_id is None:
+            self._clock += 1
+            self._floor = self._clock
+            self._changed.clear()
+            self._carts.clear()
+        else:
+            self._touch(user_id)
+            self._carts.pop(user_id, None)
+
+cart_cache = CartCache(max_users=settings.CART_CACHE_MAX_USERS, ttl=settings.CART_CACHE_TTL_SECONDS)
\ No newline at end of file
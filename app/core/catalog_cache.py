@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.schemas.product import Product
+
+logger = logging.getLogger(__name__)
+
+CatalogLoader = Callable[[], Awaitable[List[Product]]]
+ProductLoader = Callable[[str], Awaitable[Optional[Product]]]
+
+class CatalogCache:
+    """Caché en memoria del catálogo con TTL, refresco anticipado y stale-while-revalidate"""
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        refresh_ahead: float = 10.0,
+        stale_ttl: float = 300.0,
+        max_items: int = 1000
+    ):
+        self.ttl = ttl
+        self.refresh_ahead = refresh_ahead
+        self.stale_ttl = stale_ttl
+        self.max_items = max_items
+
+        self._products: Optional[List[Product]] = None
+        self._index: Dict[str, Product] = {}
+        # Vistas ordenadas (claves, productos) por (categoría, campo), válidas para el catálogo actual
+        self._views: Dict[Tuple[Optional[str], str], Tuple[List[Tuple], List[Product]]] = {}
+        # Respuestas ya serializadas (LRU), válidas solo para el catálogo actual
+        self._rendered: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self._loaded_at = 0.0
+        self._items: "OrderedDict[str, Tuple[Product, float]]" = OrderedDict()
+        # Se incrementa al invalidar para descartar cargas que ya estaban en curso
+        self._generation = 0
+        self._loading: Optional[asyncio.Future] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+        self.stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'invalidations': 0,
+            'rendered_hits': 0,
+        }
+
+    async def get_all(self, loader: CatalogLoader, background_loader: Optional[CatalogLoader] = None) -> List[Product]:
+        """Lista de productos disponibles; `background_loader` no debe depender de la petición"""
+        if self._products is not None:
+            age = time.monotonic() - self._loaded_at
+            if age < self.ttl:
+                self.stats['hits'] += 1
+                if age >= self.ttl - self.refresh_ahead:
+                    self._schedule_refresh(background_loader or loader)
+                return self._products
+            if age < self.ttl + self.stale_ttl:
+                # Servimos la copia caducada mientras se refresca en segundo plano
+                self.stats['stale_hits'] += 1
+                self._schedule_refresh(background_loader or loader)
+                return self._products
+
+        self.stats['misses'] += 1
+        # Las peticiones concurrentes comparten una única carga
+        if self._loading is None or self._loading.done():
+            self._loading = asyncio.ensure_future(self._load(loader))
+        return await asyncio.shield(self._loading)
+
+    async def get_by_id(self, product_id: str, loader: ProductLoader) -> Optional[Product]:
+        """Producto por ID, desde el catálogo en memoria o desde su propia entrada"""
+        if self._products is not None and time.monotonic() - self._loaded_at < self.ttl + self.stale_ttl:
+            product = self._index.get(product_id)
+            if product is not None:
+                self.stats['hits'] += 1
+                return product
+
+        entry = self._items.get(product_id)
+        if entry is not None and time.monotonic() - entry[1] < self.ttl:
+            self.stats['hits'] += 1
+            self._items.move_to_end(product_id)
+            return entry[0]
+
+        self.stats['misses'] += 1
+        generation = self._generation
+        product = await loader(product_id)
+        if product is not None and generation == self._generation:
+            self._items[product_id] = (product, time.monotonic())
+            self._items.move_to_end(product_id)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+        return product
+
+    def sorted_view(
+        self,
+        products: List[Product],
+        category: Optional[str],
+        sort_field: str
+    ) -> Tuple[List[Tuple], List[Product]]:
+        """Productos disponibles de una categoría ordenados por (campo, id), con sus claves para bisect"""
+        key = (category, sort_field)
+        cacheable = products is self._products
+        if cacheable and key in self._views:
+            return self._views[key]
+        items = sorted(
+            (p for p in products if p.is_available and (category is None or p.category == category)),
+            key=lambda p: (getattr(p, sort_field), p.id)
+        )
+        view = ([(getattr(p, sort_field), p.id) for p in items], items)
+        if cacheable:
+            self._views[key] = view
+        return view
+
+    def get_rendered(self, products: List[Product], key: Tuple) -> Optional[bytes]:
+        """Cuerpo JSON ya serializado para `key`, si se generó a partir de este mismo catálogo"""
+        if products is not self._products:
+            return None
+        body = self._rendered.get(key)
+        if body is not None:
+            self.stats['rendered_hits'] += 1
+            self._rendered.move_to_end(key)
+        return body
+
+    def put_rendered(self, products: List[Product], key: Tuple, body: bytes):
+        if products is not self._products:
+            return
+        self._rendered[key] = body
+        while len(self._rendered) > self.max_items:
+            self._rendered.popitem(last=False)
+
+    def invalidate(self, product_id: Optional[str] = None):
+        """Descarta el catálogo y, si se indica, la entrada de un producto concreto"""
+        self.stats['invalidations'] += 1
+        self._generation += 1
+        self._products = None
+        self._index = {}
+        self._views = {}
+        self._rendered.clear()
+        if product_id is None:
+            self._items.clear()
+        else:
+            self._items.pop(product_id, None)
+
+    async def _load(self, loader: CatalogLoader) -> List[Product]:
+        generation = self._generation
+        products = await loader()
+        if generation == self._generation:
+            self._products = products
+            self._index = {product.id: product for product in products}
+            self._views = {}
+            self._rendered.clear()
+            self._loaded_at = time.monotonic()
+        return products
+
+    def _schedule_refresh(self, loader: CatalogLoader):
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.create_task(self._refresh(loader))
+
+    async def _refresh(self, loader: CatalogLoader):
+        try:
+            await self._load(loader)
+            self.stats['refreshes'] += 1
+        except Exception as e:
+            self.stats['refresh_errors'] += 1
+            logger.error(f"Error refrescando el catálogo: {str(e)}")
+
+catalog_cache = CatalogCache(
+    ttl=settings.CATALOG_CACHE_TTL_SECONDS,
+    refresh_ahead=settings.CATALOG_CACHE_REFRESH_AHEAD_SECONDS,
+    stale_ttl=settings.CATALOG_CACHE_STALE_SECONDS,
+    max_items=settings.CATALOG_CACHE_MAX_ITEMS
+)
\ No newline at end of file
@@ -0,0 +1,79 @@
+from typing import Dict, List, Optional, Tuple
+
+# Tipos de operación que escriben sobre una clave de DynamoDB y se pueden compactar
+CART_PUT_TYPES = ('add_cart_item', 'update_cart_item')
+CART_REMOVE_TYPE = 'remove_cart_item'
+PRODUCT_PUT_TYPES = ('create_product',)
+
+def operation_key(operation: Dict) -> Optional[Tuple[str, str]]:
+    """Clave del elemento afectado por la operación, o None si no es compactable"""
+    op_type = operation['type']
+    data = operation.get('data') or {}
+    if op_type in CART_PUT_TYPES and data.get('id'):
+        return ('cart', data['id'])
+    if op_type == CART_REMOVE_TYPE and operation.get('item_id'):
+        return ('cart', operation['item_id'])
+    if op_type in PRODUCT_PUT_TYPES and data.get('id'):
+        return ('product', data['id'])
+    return None
+
+class CompactionResult:
+    def __init__(self, operations: List[Dict], dropped_ids: List[str], original_count: int):
+        # Cada operación lleva en 'superseded_ids' las que sustituye
+        self.operations = operations
+        self.dropped_ids = dropped_ids
+        self.original_count = original_count
+
+    @property
+    def compacted_count(self) -> int:
+        return len(self.operations)
+
+    @property
+    def ratio(self) -> float:
+        """Operaciones originales por cada operación a subir"""
+        if not self.operations:
+            return float(self.original_count) if self.original_count else 1.0
+        return self.original_count / len(self.operations)
+
+def _collapse(history: List[Dict]) -> Optional[Dict]:
+    """Reduce el historial de un elemento a su operación efectiva final"""
+    first, last = history[0], history[-1]
+    if last['type'] == CART_REMOVE_TYPE:
+        # Un elemento añadido y borrado dentro de la cola nunca llegó a AWS
+        return None if first['type'] == 'add_cart_item' else last
+    if first['type'] == 'add_cart_item' and last['type'] != first['type']:
+        return {**last, 'type': 'add_cart_item'}
+    return last
+
+def compact_operations(operations: List[Dict]) -> CompactionResult:
+    """Colapsa la historia de cada elemento a su operación final, conservando el orden"""
+    histories: Dict[Tuple[str, str], List[Dict]] = {}
+    last_index: Dict[Tuple[str, str], int] = {}
+    keys = []
+    for index, operation in enumerate(operations):
+        key = operation_key(operation)
+        keys.append(key)
+        if key is not None:
+            histories.setdefault(key, []).append(operation)
+            last_index[key] = index
+
+    compacted = []
+    dropped_ids = []
+    for index, (operation, key) in enumerate(zip(operations, keys)):
+        if key is None:
+            compacted.append({**operation, 'superseded_ids': []})
+            continue
+        # La operación resultante ocupa la posición de la última de su historial
+        if last_index[key] != index:
+            continue
+        history = histories[key]
+        final = _collapse(history)
+        if final is None:
+            dropped_ids.extend(op['id'] for op in history)
+            continue
+        compacted.append({
+            **final,
+            'superseded_ids': [op['id'] for op in history if op['id'] != final['id']]
+        })
+
+    return CompactionResult(compacted, dropped_ids, len(operations))
\ No newline at end of file
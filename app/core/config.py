@@ -1,3 +1,4 @@
+from typing import Dict
 from pydantic import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,17 +7,87 @@ class Settings(BaseSettings):
     
     # Database
     SQLALCHEMY_DATABASE_URI: str = "sqlite:///./burger_ecommerce.db"
+    DB_BOOTSTRAP_ON_STARTUP: bool = True  # en producción: False y python -m app.db.bootstrap al desplegar
+    LOCAL_DB_PATH: str = "local_burger.db"
+    LOCAL_DB_PROFILE: str = "performance"  # "performance" o "default"
+    DB_ACCESS_MODE: str = "sync"  # "sync" o "threadpool"
+    DB_THREADPOOL_SIZE: int = 8
+    DB_POOL_SIZE: int = 8
+    DB_MAX_OVERFLOW: int = 8
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # solo bases de servidor
+    DB_POOL_PRE_PING: bool = True  # solo bases de servidor
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
     
     # Auth
     SECRET_KEY: str = "secret-key"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    PASSWORD_HASH_ROUNDS: int = 12  # coste de bcrypt; los hashes con otro coste se rehacen al hacer login
+    PASSWORD_HASH_MODE: str = "thread"  # "thread" o "process"
+    PASSWORD_HASH_WORKERS: int = 4
     
     # AWS
+    AWS_BACKEND: str = "boto3"  # "boto3" o "memory" (app.utils.fake_aws, para desarrollo y benchmarks)
     AWS_ACCESS_KEY_ID: str = None
     AWS_SECRET_ACCESS_KEY: str = None
     AWS_REGION: str = "us-east-1"
-    
+    AWS_MAX_POOL_CONNECTIONS: int = 50
+    AWS_CONNECT_TIMEOUT_SECONDS: float = 2.0
+    AWS_READ_TIMEOUT_SECONDS: float = 5.0
+    AWS_EXECUTOR_MAX_WORKERS: int = 32
+    AWS_MAX_CONCURRENT_CALLS: int = 32
+    AWS_CALL_TIMEOUT_SECONDS: float = 5.0
+    AWS_OPERATION_TIMEOUTS: Dict[str, float] = {"scan": 15.0, "batch_write_item": 15.0}
+    AWS_BATCH_MAX_RETRIES: int = 5
+    AWS_BATCH_BACKOFF_SECONDS: float = 0.05
+    AWS_SCAN_SEGMENTS: int = 4
+    # Esquema de la tabla Cart (ver README): clave de partición y GSI por usuario
+    DYNAMODB_CART_KEY: str = "id"
+    DYNAMODB_CART_USER_INDEX: str = "user_id-index"
+    COGNITO_USER_POOL_ID: str = "your-user-pool-id"
+    COGNITO_APP_CLIENT_ID: str = "your-app-client-id"
+
+    # AWS en memoria (AWS_BACKEND="memory")
+    FAKE_AWS_LATENCY_SECONDS: float = 0.0
+    FAKE_AWS_JITTER_SECONDS: float = 0.0
+    FAKE_AWS_THROTTLE_RATE: float = 0.0
+    FAKE_AWS_UNPROCESSED_RATE: float = 0.0
+    FAKE_AWS_OUTAGE: bool = False
+
+    # Connectivity
+    CONNECTIVITY_PROBE_INTERVAL_SECONDS: float = 30.0
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 3
+    CIRCUIT_BREAKER_RESET_TIMEOUT_SECONDS: float = 30.0
+
+    # Sync
+    SYNC_IN_PROCESS: bool = True  # False si app/worker.py se despliega aparte: un solo proceso vacía la cola
+    SYNC_INTERVAL_SECONDS: float = 300.0
+    SYNC_BATCH_SIZE: int = 25
+    SYNC_CONCURRENCY: int = 8
+    SYNC_MAX_ATTEMPTS: int = 5  # rechazos de AWS (4xx) antes de mover una operación a failed_operations
+    OUTBOX_DURABILITY: str = "group"  # "sync", "group" o "async"
+    OUTBOX_FLUSH_INTERVAL_SECONDS: float = 0.001
+    OUTBOX_MAX_BATCH: int = 100
+
+    # Products
+    PRODUCTS_PAGE_SIZE: int = 50
+    PRODUCTS_MAX_PAGE_SIZE: int = 200
+
+    # Catalog cache
+    CATALOG_CACHE_TTL_SECONDS: float = 60.0
+    CATALOG_CACHE_REFRESH_AHEAD_SECONDS: float = 10.0
+    CATALOG_CACHE_STALE_SECONDS: float = 300.0
+    CATALOG_CACHE_MAX_ITEMS: int = 1000
+
+    # Cart cache
+    CART_CACHE_MAX_USERS: int = 10000
+    # La caché es de cada proceso: con varios workers, otro proceso puede servir un carrito con
+    # hasta este retraso. Solo conviene subirlo si la API corre en un único worker.
+    CART_CACHE_TTL_SECONDS: float = 2.0
+
     class Config:
         case_sensitive = True
         env_file = ".env"
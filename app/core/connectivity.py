@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class CircuitState:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+class ConnectivityMonitor:
+    """Mantiene en caché el estado de conexión con AWS (circuit breaker)"""
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        probe_interval: float = 30.0
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.probe_interval = probe_interval
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._recovery_listeners: List[Callable[[], None]] = []
+
+    def add_recovery_listener(self, listener: Callable[[], None]):
+        """Registra una función a la que se llama cada vez que el circuito vuelve a cerrarse"""
+        if listener not in self._recovery_listeners:
+            self._recovery_listeners.append(listener)
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def is_online(self) -> bool:
+        """Devuelve el estado cacheado sin hacer ninguna llamada a AWS"""
+        if self._state == CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # Tras el tiempo de espera dejamos pasar llamadas de prueba
+            self._state = CircuitState.HALF_OPEN
+        return True
+
+    def record_success(self):
+        """Registra una llamada exitosa y cierra el circuito"""
+        recovered = self._state != CircuitState.CLOSED
+        self._failures = 0
+        self._state = CircuitState.CLOSED
+        if recovered:
+            logger.info("Conexión con AWS restablecida")
+            for listener in self._recovery_listeners:
+                try:
+                    listener()
+                except Exception as e:
+                    logger.error(f"Error al notificar la reconexión: {str(e)}")
+
+    def record_failure(self):
+        """Registra una llamada fallida y abre el circuito si se supera el umbral"""
+        self._failures += 1
+        if self._state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != CircuitState.OPEN:
+                logger.warning(f"Circuito AWS abierto tras {self._failures} fallos")
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+
+    async def check(self, probe: Callable[[], Awaitable]):
+        """Ejecuta una sonda de conexión y actualiza el estado"""
+        try:
+            await probe()
+            self.record_success()
+        except Exception as e:
+            logger.warning(f"Sonda de conexión AWS fallida: {str(e)}")
+            self.record_failure()
+
+    def start(self, probe: Callable[[], Awaitable]):
+        """Inicia la sonda periódica en segundo plano"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(probe))
+
+    async def stop(self):
+        """Detiene la sonda en segundo plano"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self, probe: Callable[[], Awaitable]):
+        while True:
+            await self.check(probe)
+            await asyncio.sleep(self.probe_interval)
+
+connectivity_monitor = ConnectivityMonitor(
+    failure_threshold=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.CIRCUIT_BREAKER_RESET_TIMEOUT_SECONDS,
+    probe_interval=settings.CONNECTIVITY_PROBE_INTERVAL_SECONDS
+)
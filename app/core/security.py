@@ -1,23 +1,87 @@
+import asyncio
+from functools import lru_cache
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, Annotated
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from typing import TYPE_CHECKING, Optional, Annotated, Tuple
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.orm import Session
+from app.core.auth_cache import principal_cache
 from app.core.config import settings
-from app.schemas.user import TokenData
+from app.db.repositories.auth import AuthRepository
+from app.db.session import get_db
+from app.schemas.user import TokenData, UserInDB
+from app.utils.serialization import construct_from_orm
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# jose (con cryptography) y passlib se importan al usarse por primera vez, no al arrancar
+
+@lru_cache(maxsize=None)
+def get_pwd_context() -> "CryptContext":
+    from passlib.context import CryptContext
+    # min_rounds = max_rounds: cualquier hash con otro coste se considera desactualizado
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=settings.PASSWORD_HASH_ROUNDS,
+        bcrypt__min_rounds=settings.PASSWORD_HASH_ROUNDS,
+        bcrypt__max_rounds=settings.PASSWORD_HASH_ROUNDS
+    )
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """(válida, nuevo hash si el actual usa otro coste)"""
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
+
+class PasswordHasher:
+    """Ejecuta bcrypt fuera del event loop en un pool acotado de hilos ("thread") o procesos ("process")"""
+
+    MODES = ("thread", "process")
+
+    def __init__(self, mode: str = "thread", max_workers: int = 4):
+        if mode not in self.MODES:
+            raise ValueError(f"PASSWORD_HASH_MODE inválido: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        # bcrypt libera el GIL, así que los hilos ya reparten el trabajo entre núcleos
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def hash(self, password: str) -> str:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), get_password_hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), verify_and_update_password, plain_password, hashed_password
+        )
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+password_hasher = PasswordHasher(settings.PASSWORD_HASH_MODE, settings.PASSWORD_HASH_WORKERS)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    from jose import jwt
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -27,7 +91,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> UserInDB:
+    """Usuario autenticado; el token se verifica y se resuelve contra la base una vez hasta que caduca"""
+    user = principal_cache.get(token)
+    if user is not None:
+        return user
+
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -41,12 +112,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         token_data = TokenData(email=email)
     except JWTError:
         raise credentials_exception
-    
-    # Aquí deberías obtener el usuario de tu base de datos
-    # user = await get_user_from_db(token_data.email)
-    # if user is None:
-    #     raise credentials_exception
-    # return user
-    
-    # Por ahora devolvemos el email como placeholder
-    return token_data
\ No newline at end of file
+
+    db_user = await AuthRepository(db).get_user_by_email(token_data.email)
+    if db_user is None:
+        raise credentials_exception
+
+    user = construct_from_orm(UserInDB, db_user)
+    expires_at = payload.get("exp")
+    if expires_at is not None:
+        principal_cache.put(token, user, float(expires_at))
+    return user
\ No newline at end of file
@@ -1,42 +1,399 @@
+import asyncio
 import logging
-from typing import Optional
-from app.db.repositories.cart import CartRepository
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from app.core.compaction import compact_operations, operation_key
+from app.core.config import settings
+from app.core.connectivity import connectivity_monitor
 from app.db.local_db import LocalDB
-from app.utils.aws_client import AWSClient
+from app.db.outbox import Outbox
+from app.schemas.cart import CartItemInDB
+from app.schemas.product import Product
+from app.schemas.user import UserInDB
+from app.utils.aws_client import (
+    DYNAMODB_BATCH_WRITE_LIMIT,
+    AWSClient,
+    cart_item_to_dynamodb,
+    cart_key,
+    get_aws_client,
+    is_connectivity_error,
+    to_dynamodb_item
+)
+from app.utils.exceptions import AWSSyncException
 
 logger = logging.getLogger(__name__)
 
+def partition_key(operation: Dict) -> str:
+    """Partición de sincronización: el orden solo se garantiza dentro de cada una"""
+    op_type = operation['type']
+    user_id = (operation.get('data') or {}).get('user_id')
+    if op_type.endswith('_cart_item'):
+        if user_id:
+            return f"user:{user_id}"
+        key = operation_key(operation)
+        if key is not None:
+            return f"item:{key[1]}"
+    # Cada entidad va en su partición: un alta rechazada no bloquea las demás
+    if op_type == 'create_product':
+        return f"product:{operation['data']['id']}"
+    if op_type == 'create_user':
+        return f"user:{operation['data']['email']}"
+    return "global"
+
+def is_retryable(error: BaseException) -> bool:
+    """Si un fallo de sincronización puede resolverse reintentando más tarde
+
+    Los fallos de conexión, el throttling, los 5xx y los lotes que quedan a medias lo son;
+    el resto de rechazos de AWS (p.ej. ValidationException) se repetirían siempre.
+    AWSClient envuelve los ClientError, así que se revisa toda la cadena de excepciones.
+    """
+    while error is not None:
+        if isinstance(error, AWSSyncException) or is_connectivity_error(error):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
 class SyncManager:
-    def __init__(self):
-        self.aws_client = AWSClient()
-        self.local_db = LocalDB()
-        self.cart_repo = CartRepository()
+    """Subsistema de sincronización único por proceso"""
+
+    def __init__(self, aws_client: Optional[AWSClient] = None, local_db_path: str = settings.LOCAL_DB_PATH):
+        self._aws_client = aws_client
+        self.local_db_path = local_db_path
+        self._local_db: Optional[LocalDB] = None
+        self._outbox: Optional[Outbox] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._current_sync: Optional[asyncio.Future] = None
+        self.compaction_stats = {'operations_read': 0, 'operations_uploaded': 0}
+        self.partition_progress: Dict[str, Dict] = {}
+
+    @property
+    def aws_client(self) -> AWSClient:
+        return self._aws_client or get_aws_client()
+
+    @property
+    def local_db(self) -> LocalDB:
+        # La base local (y su esquema) se crea una sola vez por proceso
+        if self._local_db is None:
+            self._local_db = LocalDB(self.local_db_path, settings.LOCAL_DB_PROFILE)
+        return self._local_db
+
+    @property
+    def outbox(self) -> Outbox:
+        if self._outbox is None:
+            self._outbox = Outbox(
+                self.local_db,
+                durability=settings.OUTBOX_DURABILITY,
+                flush_interval=settings.OUTBOX_FLUSH_INTERVAL_SECONDS,
+                max_batch=settings.OUTBOX_MAX_BATCH,
+                on_flush=self.request_sync
+            )
+        return self._outbox
+
+    def start(self):
+        """Abre la base local y lanza el bucle de sincronización en segundo plano"""
+        self.local_db
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Detiene el bucle de sincronización y cierra la base local"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._outbox is not None:
+            self._outbox.flush()
+            self._outbox = None
+        if self._local_db is not None:
+            self._local_db.close()
+            self._local_db = None
+
+    async def enqueue(self, operation: Dict) -> bool:
+        """Registra una operación pendiente; el bucle de sincronización se despierta al guardarla"""
+        return await self.outbox.put(operation)
+
+    async def enqueue_many(self, operations: List[Dict]) -> bool:
+        """Registra varias operaciones pendientes en un único commit"""
+        return await self.outbox.put_many(operations)
+
+    async def has_pending_for_user(self, user_id: str) -> bool:
+        """Si el usuario tiene escrituras locales que aún no están en AWS"""
+        if self._outbox is not None and self._outbox.has_buffered_for_user(user_id):
+            return True
+        # La consulta a SQLite se hace fuera del event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.local_db.has_pending_operations_for_user, user_id)
+
+    def request_sync(self):
+        """Pide una sincronización sin esperarla; las peticiones se agrupan"""
+        if self._loop is None or self._wakeup is None or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def run(self, interval: float = settings.SYNC_INTERVAL_SECONDS):
+        """Sincroniza al recibir nuevas operaciones o cada `interval` segundos"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        # Lo que se encoló durante la caída se sube en cuanto se cierra el circuito
+        connectivity_monitor.add_recovery_listener(self.request_sync)
+        try:
+            while True:
+                try:
+                    logger.info("Iniciando sincronización...")
+                    await self.sync_data()
+                    logger.info("Sincronización completada")
+                except Exception as e:
+                    logger.error(f"Error en sincronización: {str(e)}")
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+                # Las peticiones que lleguen durante la siguiente ejecución
+                # vuelven a activar el evento y provocan una sola ejecución más
+                self._wakeup.clear()
+        finally:
+            self._loop = None
+            self._wakeup = None
 
     async def sync_data(self):
-        """Sincroniza datos locales con AWS cuando hay conexión"""
-        if not await self._is_online():
+        """Sincroniza datos locales con AWS; las llamadas concurrentes comparten una ejecución"""
+        if self._current_sync is None or self._current_sync.done():
+            self._current_sync = asyncio.ensure_future(self._sync_pending())
+        await asyncio.shield(self._current_sync)
+
+    async def _sync_pending(self):
+        """Reenvía a AWS las operaciones pendientes: en lotes y, las que no lo admiten, por particiones"""
+        if not self._is_online():
             return
 
-        pending_operations = self.local_db.get_pending_operations()
-        
-        for operation in pending_operations:
+        compaction = compact_operations(self.local_db.get_pending_operations())
+        if compaction.dropped_ids:
+            # Se anulan entre sí (p.ej. añadir y borrar el mismo item): no hay nada que subir
+            self.local_db.remove_pending_operations(compaction.dropped_ids)
+        self.compaction_stats['operations_read'] += compaction.original_count
+        self.compaction_stats['operations_uploaded'] += compaction.compacted_count
+        if compaction.original_count:
+            logger.info(
+                f"Compactación: {compaction.original_count} -> {compaction.compacted_count} "
+                f"operaciones (ratio {compaction.ratio:.2f})"
+            )
+
+        partitions: Dict[str, List[Dict]] = {}
+        for operation in compaction.operations:
+            partitions.setdefault(partition_key(operation), []).append(operation)
+        self.partition_progress = {
+            key: {'synced': 0, 'pending': len(operations), 'last_error': None, 'updated_at': None}
+            for key, operations in partitions.items()
+        }
+
+        # Tras compactar queda como mucho una escritura por clave de DynamoDB: las que admiten
+        # lote no dependen unas de otras y se agrupan en lotes completos aunque sean de distintas
+        # particiones. Las demás (p.ej. Cognito) se envían una a una, en orden, por partición.
+        batchable: List[Tuple[Dict, str, str, Dict]] = []
+        singles: Dict[str, List[Dict]] = {}
+        for key, operations in partitions.items():
+            for operation in operations:
+                try:
+                    request = self._to_write_request(operation)
+                except Exception as e:
+                    # Los datos ya no son válidos: reintentarlo daría el mismo error
+                    self._reject(operation, e, self.partition_progress[key])
+                    continue
+                if request is None:
+                    singles.setdefault(key, []).append(operation)
+                else:
+                    batchable.append((operation, *request))
+
+        limiter = asyncio.Semaphore(settings.SYNC_CONCURRENCY)
+
+        async def send_batch(batch: List[Tuple[Dict, str, str, Dict]]):
+            async with limiter:
+                await self._send_batch(batch)
+
+        async def sync_partition(key: str, operations: List[Dict]):
+            async with limiter:
+                await self._sync_partition(key, operations)
+
+        await asyncio.gather(
+            *(send_batch(batch) for batch in self._pack_batches(batchable)),
+            *(sync_partition(key, operations) for key, operations in singles.items())
+        )
+
+    @staticmethod
+    def _pack_batches(requests: List[Tuple[Dict, str, str, Dict]]) -> List[List[Tuple[Dict, str, str, Dict]]]:
+        """Reparte las peticiones en lotes de hasta SYNC_BATCH_SIZE sin claves repetidas en un lote"""
+        batch_size = min(settings.SYNC_BATCH_SIZE, DYNAMODB_BATCH_WRITE_LIMIT)
+        batches: List[List[Tuple[Dict, str, str, Dict]]] = []
+        batch: List[Tuple[Dict, str, str, Dict]] = []
+        batch_keys = set()
+        for request in requests:
+            _, table_name, item_key, _ = request
+            # DynamoDB rechaza dos peticiones sobre la misma clave en un mismo lote
+            if len(batch) >= batch_size or (table_name, item_key) in batch_keys:
+                batches.append(batch)
+                batch, batch_keys = [], set()
+            batch.append(request)
+            batch_keys.add((table_name, item_key))
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _progress(self, operation: Dict) -> Dict:
+        return self.partition_progress[partition_key(operation)]
+
+    async def _send_batch(self, batch: List[Tuple[Dict, str, str, Dict]]):
+        """Envía un lote; si AWS lo rechaza, aísla la operación culpable enviándolas una a una"""
+        try:
+            await self._flush_batch(batch)
+        except Exception as e:
+            if is_retryable(e):
+                logger.error(f"Error enviando un lote de {len(batch)} operaciones: {str(e)}")
+                for operation, *_ in batch:
+                    self._record_progress(self._progress(operation), 0, error=str(e))
+                return
+            # DynamoDB rechaza el lote entero sin decir qué petición falla
+            logger.warning(f"Lote rechazado, se reenvía operación a operación: {str(e)}")
             try:
-                if operation['type'] == 'add':
-                    await self.cart_repo.add_to_cart(operation['data'])
-                elif operation['type'] == 'update':
-                    await self.cart_repo.update_cart_item(operation['data'])
-                elif operation['type'] == 'remove':
-                    await self.cart_repo.remove_from_cart(operation['item_id'])
-                
-                self.local_db.remove_pending_operation(operation['id'])
+                for operation, *_ in batch:
+                    await self._send_single(operation, self._progress(operation))
             except Exception as e:
-                logger.error(f"Error syncing operation {operation['id']}: {str(e)}")
-                continue
+                logger.error(f"Error reenviando un lote rechazado: {str(e)}")
+            return
+        for operation, *_ in batch:
+            self._record_progress(self._progress(operation), 1)
 
-    async def _is_online(self) -> bool:
-        """Verifica si hay conexión a internet"""
+    async def _sync_partition(self, key: str, operations: List[Dict]):
+        """Reenvía en orden las operaciones sueltas de una partición; un fallo solo detiene esta partición"""
+        progress = self.partition_progress[key]
         try:
-            await self.aws_client.check_connection()
-            return True
-        except Exception:
-            return False
\ No newline at end of file
+            for operation in operations:
+                if not await self._send_single(operation, progress):
+                    return
+        except Exception as e:
+            logger.error(f"Error sincronizando la partición {key}: {str(e)}")
+            self._record_progress(progress, 0, error=str(e))
+
+    async def _send_single(self, operation: Dict, progress: Dict) -> bool:
+        """Reenvía una operación suelta; devuelve False si la partición debe detenerse"""
+        try:
+            await self._replay_single(operation)
+        except Exception as e:
+            if is_retryable(e):
+                raise
+            return self._reject(operation, e, progress)
+        self._record_progress(progress, 1)
+        return True
+
+    def _reject(self, operation: Dict, error: Exception, progress: Dict) -> bool:
+        """Cuenta un rechazo definitivo de AWS; devuelve True si la operación sale de la cola
+
+        Mientras no se descarta, la partición se detiene para no adelantar a la operación rechazada.
+        """
+        discarded = self.local_db.record_failed_attempt(
+            self._acknowledged_ids(operation), str(error), settings.SYNC_MAX_ATTEMPTS
+        )
+        if discarded:
+            logger.error(
+                f"Operación {operation['id']} ({operation['type']}) descartada tras "
+                f"{settings.SYNC_MAX_ATTEMPTS} intentos: {str(error)}"
+            )
+            self._record_progress(progress, 1, error=str(error))
+        else:
+            logger.error(f"Error syncing operation {operation['id']}: {str(error)}")
+            self._record_progress(progress, 0, error=str(error))
+        return discarded
+
+    @staticmethod
+    def _record_progress(progress: Dict, synced: int, error: Optional[str] = None):
+        progress['synced'] += synced
+        progress['pending'] -= synced
+        progress['updated_at'] = datetime.utcnow()
+        if error is not None:
+            progress['last_error'] = error
+
+    async def _flush_batch(self, batch: List[Tuple[Dict, str, str, Dict]]):
+        """Envía un lote a AWS y lo confirma localmente en una sola transacción"""
+        if not batch:
+            return
+        request_items: Dict[str, List[Dict]] = {}
+        for _, table_name, _, request in batch:
+            request_items.setdefault(table_name, []).append(request)
+
+        await self.aws_client.batch_write(request_items)
+        self.local_db.remove_pending_operations(
+            [op_id for operation, *_ in batch for op_id in self._acknowledged_ids(operation)]
+        )
+
+    async def _replay_single(self, operation: Dict):
+        await self._replay(operation)
+        self.local_db.remove_pending_operations(self._acknowledged_ids(operation))
+
+    @staticmethod
+    def _acknowledged_ids(operation: Dict) -> List[str]:
+        """La operación enviada más las que la compactación fusionó en ella"""
+        return [operation['id'], *operation.get('superseded_ids', [])]
+
+    @property
+    def compaction_ratio(self) -> float:
+        """Ratio acumulado de operaciones leídas por operación subida"""
+        uploaded = self.compaction_stats['operations_uploaded']
+        if not uploaded:
+            return 1.0
+        return self.compaction_stats['operations_read'] / uploaded
+
+    def _to_write_request(self, operation: Dict) -> Optional[Tuple[str, str, Dict]]:
+        """Traduce una operación a (tabla, clave, petición de batch_write_item), o None si no admite lote"""
+        op_type = operation['type']
+        if op_type in ('add_cart_item', 'update_cart_item'):
+            item = CartItemInDB(**operation['data']).dict()
+            return (
+                self.aws_client.cart_table.name,
+                item['id'],
+                {'PutRequest': {'Item': cart_item_to_dynamodb(item)}}
+            )
+        if op_type == 'remove_cart_item':
+            return (
+                self.aws_client.cart_table.name,
+                operation['item_id'],
+                {'DeleteRequest': {'Key': cart_key(operation['item_id'])}}
+            )
+        if op_type == 'create_product':
+            item = Product(**operation['data']).dict()
+            return (
+                self.aws_client.products_table.name,
+                item['id'],
+                {'PutRequest': {'Item': to_dynamodb_item(item)}}
+            )
+        return None
+
+    async def _replay(self, operation: Dict):
+        """Envía a AWS una operación pendiente"""
+        op_type = operation['type']
+        data = operation['data']
+        if op_type == 'add_cart_item':
+            await self.aws_client.add_to_cart(CartItemInDB(**data))
+        elif op_type == 'update_cart_item':
+            await self.aws_client.update_cart_item(CartItemInDB(**data))
+        elif op_type == 'remove_cart_item':
+            await self.aws_client.remove_from_cart(operation['item_id'])
+        elif op_type == 'create_product':
+            await self.aws_client.create_product(Product(**data))
+        elif op_type == 'create_user':
+            await self.aws_client.create_user(UserInDB(**data))
+        else:
+            raise ValueError(f"Tipo de operación desconocido: {op_type}")
+
+    def _is_online(self) -> bool:
+        """Consulta el estado de conexión cacheado por el monitor"""
+        return connectivity_monitor.is_online()
+
+sync_manager = SyncManager()
+
+def get_sync_manager() -> SyncManager:
+    return sync_manager
\ No newline at end of file
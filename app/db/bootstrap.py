@@ -0,0 +1,57 @@
+"""Preparación explícita del esquema de la base de datos.
+
+Es idempotente: solo crea lo que falta. En producción se ejecuta una vez por despliegue
+(python -m app.db.bootstrap) con DB_BOOTSTRAP_ON_STARTUP desactivado; en desarrollo
+la lanza el evento de arranque de la aplicación.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Set
+from sqlalchemy.engine import Engine
+from app.db.init_db import init_db
+from app.db.session import engine as default_engine
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_bootstrapped: Set[str] = set()
+
+@contextmanager
+def _interprocess_lock(engine: Engine) -> Iterator[None]:
+    """Serializa el DDL entre los workers que arrancan a la vez en el mismo host"""
+    if fcntl is None:
+        yield
+        return
+    name = hashlib.sha1(str(engine.url).encode()).hexdigest()[:16]
+    path = os.path.join(tempfile.gettempdir(), f"burger_ecommerce_bootstrap_{name}.lock")
+    with open(path, "w") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+def bootstrap(engine: Engine = default_engine) -> bool:
+    """Prepara el esquema una vez por proceso; devuelve False si ya estaba preparado"""
+    key = str(engine.url)
+    with _lock:
+        if key in _bootstrapped:
+            return False
+        with _interprocess_lock(engine):
+            init_db(engine)
+        _bootstrapped.add(key)
+    logger.info(f"Esquema preparado en {engine.url!r}")
+    return True
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    bootstrap()
\ No newline at end of file
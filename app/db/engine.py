@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool, StaticPool
+from app.core.config import settings
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))]
+
+class PoolMetrics:
+    """Métricas del pool: espera en cada checkout, agotamiento y edad de las conexiones"""
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self._ages = deque(maxlen=window)
+        self.counters = {
+            'checkouts': 0,
+            'exhausted': 0,
+            'timeouts': 0,
+            'connections_opened': 0,
+            'invalidated': 0,
+        }
+        self.max_wait = 0.0
+        self.max_age = 0.0
+        self._engine: Optional[Engine] = None
+
+    def attach(self, engine: Engine):
+        self._engine = engine
+
+        @event.listens_for(engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            connection_record.info['connected_at'] = time.monotonic()
+            with self._lock:
+                self.counters['connections_opened'] += 1
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            age = time.monotonic() - connection_record.info.get('connected_at', time.monotonic())
+            with self._lock:
+                self._ages.append(age)
+                self.max_age = max(self.max_age, age)
+
+        @event.listens_for(engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.counters['invalidated'] += 1
+
+    def record_checkout(self, wait: float, exhausted: bool, timed_out: bool = False):
+        with self._lock:
+            self.counters['checkouts'] += 1
+            self.counters['exhausted'] += exhausted
+            self.counters['timeouts'] += timed_out
+            self._waits.append(wait)
+            self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            waits_ms = [wait * 1000 for wait in self._waits]
+            ages = list(self._ages)
+            data = dict(self.counters)
+        pool = self._engine.pool if self._engine is not None else None
+        data.update({
+            'pool': type(pool).__name__ if pool is not None else None,
+            'status': pool.status() if pool is not None else None,
+            'checkout_wait_ms_p50': _percentile(waits_ms, 50),
+            'checkout_wait_ms_p99': _percentile(waits_ms, 99),
+            'checkout_wait_ms_max': self.max_wait * 1000,
+            'connection_age_seconds_avg': sum(ages) / len(ages) if ages else 0.0,
+            'connection_age_seconds_max': self.max_age,
+        })
+        return data
+
+pool_metrics = PoolMetrics()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool que mide cuánto espera cada checkout y cuándo se queda sin conexiones"""
+
+    def connect(self):
+        # Sin conexiones libres ni margen de overflow: el checkout tendrá que esperar
+        exhausted = (
+            self._max_overflow > -1
+            and self.checkedin() == 0
+            and self.overflow() >= self._max_overflow
+        )
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_metrics.record_checkout(time.perf_counter() - start, True, timed_out=True)
+            raise
+        pool_metrics.record_checkout(time.perf_counter() - start, exhausted)
+        return connection
+
+def _build_sqlite_engine(url) -> Engine:
+    connect_args = {"check_same_thread": False}
+    if url.database in (None, "", ":memory:"):
+        # Una base en memoria solo existe dentro de su conexión: se comparte una sola
+        return create_engine(url, connect_args=connect_args, poolclass=StaticPool)
+
+    # SQLite admite un único escritor, así que limitar conexiones no protege nada: el pool
+    # guarda DB_POOL_SIZE conexiones para reutilizarlas (1.4 usa NullPool y abre una por
+    # sesión) y no pone tope al overflow. WAL deja leer mientras se escribe y busy_timeout
+    # hace que los escritores concurrentes esperen su turno en lugar de fallar con
+    # "database is locked"
+    engine = create_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=-1
+    )
+
+    @event.listens_for(engine, "connect")
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        if settings.SQLITE_JOURNAL_MODE.upper() == "WAL":
+            cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout = {settings.SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+    return engine
+
+def build_engine(database_uri: Optional[str] = None) -> Engine:
+    """Crea el engine según la configuración, con el pool adecuado a cada backend"""
+    url = make_url(database_uri or settings.SQLALCHEMY_DATABASE_URI)
+    if url.get_backend_name() == "sqlite":
+        engine = _build_sqlite_engine(url)
+    else:
+        engine = create_engine(
+            url,
+            poolclass=InstrumentedQueuePool,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING
+        )
+    pool_metrics.attach(engine)
+    return engine
\ No newline at end of file
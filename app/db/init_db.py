@@ -0,0 +1,44 @@
+from sqlalchemy import Table, inspect, text
+from sqlalchemy.engine import Connection, Engine
+from app.db.search import init_product_search
+from app.db.session import Base
+import app.db.models  # noqa: F401  (registra los modelos en Base.metadata)
+
+def add_missing_columns(connection: Connection, table: Table):
+    """Añade a una tabla existente las columnas del modelo que le falten
+
+    create_all no modifica tablas que ya existen. Las filas previas reciben el valor
+    por defecto de la columna (p.ej. created_at = momento de la migración).
+    """
+    existing = {column['name'] for column in inspect(connection).get_columns(table.name)}
+    preparer = connection.dialect.identifier_preparer
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        if column.primary_key:
+            raise RuntimeError(f"No se puede añadir la clave primaria {table.name}.{column.name} a una tabla existente")
+        column_type = column.type.compile(dialect=connection.dialect)
+        connection.execute(text(
+            f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.quote(column.name)} {column_type}"
+        ))
+        default = column.default
+        if default is not None and (default.is_scalar or default.is_callable):
+            value = default.arg(None) if default.is_callable else default.arg
+            connection.execute(
+                table.update().where(table.c[column.name].is_(None)).values({column.name: value})
+            )
+
+def init_db(engine: Engine):
+    """Crea las tablas que falten, sus columnas e índices añadidos después y el índice de búsqueda
+
+    Es idempotente: se ejecuta en cada despliegue (python -m app.db.bootstrap).
+    """
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            add_missing_columns(connection, table)
+    # create_all no añade índices nuevos a tablas que ya existen
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    init_product_search(engine)
\ No newline at end of file
@@ -1,19 +1,66 @@
 import sqlite3
-from typing import List, Dict, Optional
-from datetime import datetime
+from typing import List, Dict, Optional, Tuple
+from datetime import datetime, timedelta
 import json
 import logging
+import os
+import threading
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+_stamp_lock = threading.Lock()
+_last_stamp: Optional[datetime] = None
+
+def next_operation_stamp() -> Tuple[str, str]:
+    """Devuelve (created_at, id) estrictamente crecientes dentro del proceso"""
+    global _last_stamp
+    with _stamp_lock:
+        stamp = datetime.now()
+        # Dos operaciones en el mismo microsegundo no deben compartir marca ni id
+        if _last_stamp is not None and stamp <= _last_stamp:
+            stamp = _last_stamp + timedelta(microseconds=1)
+        _last_stamp = stamp
+    created_at = stamp.isoformat(sep=' ', timespec='microseconds')
+    return created_at, f"{stamp:%Y%m%d%H%M%S%f}-{os.getpid()}"
+
+# Perfiles de PRAGMA aplicados al abrir la conexión
+PRAGMA_PROFILES = {
+    "default": {},
+    "performance": {
+        # WAL permite lecturas concurrentes con un escritor y agrupa los fsync
+        "journal_mode": "WAL",
+        # Con WAL, NORMAL sigue siendo seguro ante caídas del proceso
+        "synchronous": "NORMAL",
+        "cache_size": -20000,  # 20 MB
+        "mmap_size": 268435456,  # 256 MB
+        "temp_store": "MEMORY",
+    },
+}
+
+# Columnas de pending_operations en el orden en que las devuelve get_pending_operations
+PENDING_COLUMNS = 'id, type, data, item_id, created_at, attempts'
+
 class LocalDB:
-    def __init__(self, db_path: str = "local_burger.db"):
+    def __init__(self, db_path: str = "local_burger.db", profile: str = "performance"):
         # Asegurar que el directorio exista
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        self.conn = sqlite3.connect(db_path)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._apply_profile(profile)
         self._init_db()
+        # Conexiones de solo lectura para consultas que se hacen fuera del event loop, una por hilo
+        self._readers = threading.local()
+        self._reader_conns: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+
+    def _apply_profile(self, profile: str):
+        """Aplica los PRAGMA del perfil de rendimiento indicado"""
+        if profile not in PRAGMA_PROFILES:
+            raise ValueError(f"Perfil de SQLite desconocido: {profile}")
+        for pragma, value in PRAGMA_PROFILES[profile].items():
+            self.conn.execute(f"PRAGMA {pragma} = {value}")
 
     def _init_db(self):
         """Inicializa la base de datos local con las tablas necesarias"""
@@ -67,17 +114,60 @@ class LocalDB:
             type TEXT NOT NULL,
             data TEXT,
             item_id TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            user_id TEXT
+        )
+        ''')
+        # Bases creadas antes de contar los intentos o de guardar el usuario en su columna
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(pending_operations)')}
+        if 'attempts' not in columns:
+            cursor.execute('ALTER TABLE pending_operations ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0')
+        if 'user_id' not in columns:
+            cursor.execute('ALTER TABLE pending_operations ADD COLUMN user_id TEXT')
+            cursor.execute("UPDATE pending_operations SET user_id = json_extract(data, '$.user_id')")
+
+        # Operaciones que AWS rechazó SYNC_MAX_ATTEMPTS veces: ya no se reintentan
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS failed_operations (
+            id TEXT PRIMARY KEY,
+            type TEXT NOT NULL,
+            data TEXT,
+            item_id TEXT,
+            created_at TIMESTAMP,
+            attempts INTEGER NOT NULL,
+            error TEXT,
+            failed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
         ''')
+
+        # Índices para la cola ordenada y el carrito por usuario
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_pending_operations_created_at
+        ON pending_operations (created_at)
+        ''')
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_pending_operations_user_id
+        ON pending_operations (user_id)
+        ''')
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cart_items_user_id
+        ON cart_items (user_id)
+        ''')
         
         self.conn.commit()
 
-    def get_pending_operations(self) -> List[Dict]:
-        """Obtiene todas las operaciones pendientes de sincronización"""
+    def get_pending_operations(self, limit: Optional[int] = None) -> List[Dict]:
+        """Obtiene las operaciones pendientes de sincronización, las más antiguas primero"""
         cursor = self.conn.cursor()
         try:
-            cursor.execute('SELECT * FROM pending_operations ORDER BY created_at ASC')
+            if limit is None:
+                cursor.execute(f'SELECT {PENDING_COLUMNS} FROM pending_operations ORDER BY created_at ASC')
+            else:
+                cursor.execute(
+                    f'SELECT {PENDING_COLUMNS} FROM pending_operations ORDER BY created_at ASC LIMIT ?',
+                    (limit,)
+                )
             rows = cursor.fetchall()
             
             operations = []
@@ -88,7 +178,8 @@ class LocalDB:
                         'type': row[1],
                         'data': json.loads(row[2]) if row[2] else None,
                         'item_id': row[3],
-                        'created_at': row[4]
+                        'created_at': row[4],
+                        'attempts': row[5]
                     }
                     operations.append(operation)
                 except json.JSONDecodeError as e:
@@ -100,6 +191,92 @@ class LocalDB:
             logger.error(f"Error getting pending operations: {e}")
             return []
 
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._readers, 'conn', None)
+        if conn is None:
+            # close() las cierra desde otro hilo
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._readers.conn = conn
+            with self._readers_lock:
+                self._reader_conns.append(conn)
+        return conn
+
+    def has_pending_operations_for_user(self, user_id: str) -> bool:
+        """Si quedan operaciones pendientes de sincronizar de un usuario
+
+        Usa la conexión de lectura del hilo: se puede llamar desde un executor.
+        """
+        try:
+            row = self._reader().execute(
+                'SELECT 1 FROM pending_operations WHERE user_id = ? LIMIT 1',
+                (user_id,)
+            ).fetchone()
+            return row is not None
+        except sqlite3.Error as e:
+            logger.error(f"Error checking pending operations for user {user_id}: {e}")
+            # Ante la duda se asume que hay cambios locales sin subir
+            return True
+
+    def record_failed_attempt(self, operation_ids: List[str], error: str, max_attempts: int) -> bool:
+        """Cuenta un rechazo de AWS; al llegar a max_attempts las operaciones pasan a failed_operations
+
+        Devuelve True si se han retirado de la cola.
+        """
+        if not operation_ids:
+            return False
+        placeholders = ', '.join('?' * len(operation_ids))
+        try:
+            with self.conn:
+                self.conn.execute(
+                    f'UPDATE pending_operations SET attempts = attempts + 1 WHERE id IN ({placeholders})',
+                    operation_ids
+                )
+                # Una operación compactada y las que sustituye salen de la cola juntas
+                attempts = self.conn.execute(
+                    f'SELECT MAX(attempts) FROM pending_operations WHERE id IN ({placeholders})',
+                    operation_ids
+                ).fetchone()[0]
+                if attempts is None or attempts < max_attempts:
+                    return False
+                self.conn.execute(
+                    f'''
+                    INSERT OR REPLACE INTO failed_operations
+                    (id, type, data, item_id, created_at, attempts, error)
+                    SELECT id, type, data, item_id, created_at, attempts, ?
+                    FROM pending_operations WHERE id IN ({placeholders})
+                    ''',
+                    (error, *operation_ids)
+                )
+                self.conn.execute(f'DELETE FROM pending_operations WHERE id IN ({placeholders})', operation_ids)
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error recording failed attempt for {len(operation_ids)} operations: {e}")
+            return False
+
+    def get_failed_operations(self) -> List[Dict]:
+        """Operaciones descartadas por la sincronización, las más recientes primero"""
+        try:
+            rows = self.conn.execute(
+                'SELECT id, type, data, item_id, created_at, attempts, error, failed_at '
+                'FROM failed_operations ORDER BY failed_at DESC'
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Error getting failed operations: {e}")
+            return []
+        return [
+            {
+                'id': row[0],
+                'type': row[1],
+                'data': json.loads(row[2]) if row[2] else None,
+                'item_id': row[3],
+                'created_at': row[4],
+                'attempts': row[5],
+                'error': row[6],
+                'failed_at': row[7]
+            }
+            for row in rows
+        ]
+
     def remove_pending_operation(self, operation_id: str) -> bool:
         """Elimina una operación pendiente después de sincronizarla"""
         cursor = self.conn.cursor()
@@ -111,28 +288,49 @@ class LocalDB:
             logger.error(f"Error removing pending operation {operation_id}: {e}")
             return False
 
+    def remove_pending_operations(self, operation_ids: List[str]) -> bool:
+        """Elimina un lote de operaciones sincronizadas en una sola transacción"""
+        try:
+            with self.conn:
+                self.conn.executemany(
+                    'DELETE FROM pending_operations WHERE id = ?',
+                    [(operation_id,) for operation_id in operation_ids]
+                )
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error removing {len(operation_ids)} pending operations: {e}")
+            return False
+
     def add_pending_operation(self, operation: Dict) -> bool:
         """Añade una nueva operación pendiente de sincronización"""
-        cursor = self.conn.cursor()
+        return self.add_pending_operations([operation])
+
+    def add_pending_operations(self, operations: List[Dict]) -> bool:
+        """Añade varias operaciones pendientes en una sola transacción"""
+        rows = []
+        for operation in operations:
+            created_at, operation_id = next_operation_stamp()
+            rows.append((
+                operation.get('id') or operation_id,
+                operation['type'],
+                json.dumps(operation.get('data'), default=str) if operation.get('data') else None,
+                operation.get('item_id'),
+                operation.get('created_at') or created_at,
+                (operation.get('data') or {}).get('user_id')
+            ))
         try:
-            cursor.execute(
-                '''
-                INSERT INTO pending_operations 
-                (id, type, data, item_id, created_at)
-                VALUES (?, ?, ?, ?, ?)
-                ''',
-                (
-                    operation.get('id', str(datetime.now().timestamp())),
-                    operation['type'],
-                    json.dumps(operation.get('data')) if operation.get('data') else None,
-                    operation.get('item_id'),
-                    datetime.now()
+            with self.conn:
+                self.conn.executemany(
+                    '''
+                    INSERT INTO pending_operations 
+                    (id, type, data, item_id, created_at, user_id)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ''',
+                    rows
                 )
-            )
-            self.conn.commit()
             return True
         except sqlite3.Error as e:
-            logger.error(f"Error adding pending operation: {e}")
+            logger.error(f"Error adding {len(rows)} pending operations: {e}")
             return False
 
     def get_cart_items(self, user_id: str) -> List[Dict]:
@@ -299,8 +497,12 @@ class LocalDB:
             return False
 
     def close(self):
-        """Cierra la conexión con la base de datos"""
+        """Cierra la conexión con la base de datos y las de lectura"""
         try:
+            with self._readers_lock:
+                readers, self._reader_conns = self._reader_conns, []
+            for conn in readers:
+                conn.close()
             self.conn.close()
         except sqlite3.Error as e:
             logger.error(f"Error closing database: {e}")
@@ -1,14 +1,17 @@
-from sqlalchemy import Column, String, Integer, ForeignKey
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, ForeignKey, DateTime
 from sqlalchemy.orm import relationship
 from app.db.session import Base
 
 class CartItem(Base):
     __tablename__ = "cart_items"
 
-    id = Column(String, primary_key=True, index=True)
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"))
     product_id = Column(String, ForeignKey("products.id"))
     quantity = Column(Integer)
     options = Column(String)
+    created_at = Column(DateTime, default=datetime.utcnow)
     
     product = relationship("Product")
\ No newline at end of file
@@ -1,14 +1,17 @@
-from sqlalchemy import Column, String, Float, Boolean, Text
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Float, Boolean, Text, DateTime
 from app.db.session import Base
 
 class Product(Base):
     __tablename__ = "products"
 
-    id = Column(String, primary_key=True, index=True)
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     name = Column(String, index=True)
     description = Column(Text)
     price = Column(Float)
     image_url = Column(String)
-    category = Column(String)
+    category = Column(String, index=True)
     ingredients = Column(Text)
-    is_available = Column(Boolean, default=True)
\ No newline at end of file
+    is_available = Column(Boolean, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
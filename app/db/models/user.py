@@ -1,11 +1,14 @@
-from sqlalchemy import Column, String, Integer, Boolean
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Boolean, DateTime
 from app.db.session import Base
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(String, primary_key=True, index=True)
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     full_name = Column(String)
-    is_google_auth = Column(Boolean, default=False)
\ No newline at end of file
+    is_google_auth = Column(Boolean, default=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+from app.db.local_db import LocalDB
+
+logger = logging.getLogger(__name__)
+
+class Outbox:
+    """Cola durable de operaciones pendientes con commit agrupado.
+
+    Modos de durabilidad:
+    - "sync": cada operación se confirma en su propia transacción.
+    - "group": put() espera al commit del grupo en el que entra la operación.
+    - "async": put() vuelve sin esperar; una caída puede perder la última ventana.
+    """
+
+    DURABILITY_MODES = ("sync", "group", "async")
+
+    def __init__(
+        self,
+        local_db: LocalDB,
+        durability: str = "group",
+        flush_interval: float = 0.001,
+        max_batch: int = 100,
+        on_flush: Optional[Callable[[], None]] = None
+    ):
+        if durability not in self.DURABILITY_MODES:
+            raise ValueError(f"Durabilidad de la cola inválida: {durability}")
+        self.local_db = local_db
+        self.durability = durability
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.on_flush = on_flush
+
+        self._buffer: List[Dict] = []
+        self._waiters: List[asyncio.Future] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    async def put(self, operation: Dict) -> bool:
+        """Encola una operación; según la durabilidad espera o no a que esté en disco"""
+        if self.durability == "sync":
+            added = self.local_db.add_pending_operation(operation)
+            if added and self.on_flush:
+                self.on_flush()
+            return added
+
+        loop = asyncio.get_running_loop()
+        self._buffer.append(operation)
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+
+        if len(self._buffer) >= self.max_batch:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_interval, self.flush)
+
+        if self.durability == "async":
+            return True
+        return await waiter
+
+    async def put_many(self, operations: List[Dict]) -> bool:
+        """Encola varias operaciones; entran juntas en el mismo commit"""
+        if not operations:
+            return True
+        if self.durability == "sync":
+            added = self.local_db.add_pending_operations(operations)
+            if added and self.on_flush:
+                self.on_flush()
+            return added
+
+        loop = asyncio.get_running_loop()
+        self._buffer.extend(operations)
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        # Se escriben ya: no tiene sentido esperar a más operaciones para un lote que ya es grande
+        self.flush()
+
+        if self.durability == "async":
+            return True
+        return await waiter
+
+    def has_buffered_for_user(self, user_id: str) -> bool:
+        """Si hay operaciones de un usuario esperando al siguiente commit"""
+        return any((operation.get('data') or {}).get('user_id') == user_id for operation in self._buffer)
+
+    def flush(self) -> bool:
+        """Escribe en una sola transacción todas las operaciones acumuladas"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._buffer:
+            return True
+
+        operations, self._buffer = self._buffer, []
+        waiters, self._waiters = self._waiters, []
+        added = self.local_db.add_pending_operations(operations)
+        if not added:
+            logger.error(f"No se pudieron guardar {len(operations)} operaciones pendientes")
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(added)
+        if added and self.on_flush:
+            self.on_flush()
+        return added
\ No newline at end of file
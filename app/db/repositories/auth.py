@@ -1,28 +1,33 @@
+from typing import Optional
 from sqlalchemy.orm import Session
+from app.db.session import db_operation
 from app.db.models.user import User
-from app.schemas.user import UserCreate, UserInDB
-from app.core.security import get_password_hash
+from app.schemas.user import UserBase
 
 class AuthRepository:
     def __init__(self, db: Session):
         self.db = db
 
+    @db_operation
     def get_user_by_email(self, email: str):
         return self.db.query(User).filter(User.email == email).first()
 
-    def create_user(self, user: UserCreate):
-        hashed_password = get_password_hash(user.password)
+    @db_operation
+    def create_user(self, user: UserBase, hashed_password: Optional[str] = None, is_google_auth: bool = False):
+        # La contraseña llega ya hasheada: el hash se calcula una sola vez, en el servicio
         db_user = User(
             email=user.email,
             hashed_password=hashed_password,
             full_name=user.full_name,
-            is_google_auth=False
+            is_google_auth=is_google_auth
         )
         self.db.add(db_user)
         self.db.commit()
         self.db.refresh(db_user)
         return db_user
 
-    def add_pending_operation(self, operation: dict):
-        # Implementar según tu sistema de operaciones pendientes
-        pass
\ No newline at end of file
+    @db_operation
+    def update_password_hash(self, user: User, hashed_password: str):
+        user.hashed_password = hashed_password
+        self.db.commit()
+        return user
\ No newline at end of file
@@ -1,14 +1,22 @@
-from sqlalchemy.orm import Session
+from typing import Iterable, List
+from sqlalchemy import bindparam
+from sqlalchemy.orm import Session, joinedload
+from app.db.session import db_operation
 from app.db.models.cart import CartItem
-from app.schemas.cart import CartItemCreate, CartItemUpdate
+from app.schemas.cart import CartItemCreate, CartItemInDB, CartItemUpdate
 
 class CartRepository:
     def __init__(self, db: Session):
         self.db = db
 
+    @db_operation
     def get_cart_items(self, user_id: str):
-        return self.db.query(CartItem).filter(CartItem.user_id == user_id).all()
+        # El producto se carga en la misma consulta: acceder a item.product no lanza otra por item
+        return self.db.query(CartItem).options(
+            joinedload(CartItem.product)
+        ).filter(CartItem.user_id == user_id).all()
 
+    @db_operation
     def add_to_cart(self, user_id: str, item: CartItemCreate):
         db_item = CartItem(
             user_id=user_id,
@@ -21,8 +29,10 @@ class CartRepository:
         self.db.refresh(db_item)
         return db_item
 
-    def update_cart_item(self, item_id: str, item: CartItemUpdate):
-        db_item = self.db.query(CartItem).filter(CartItem.id == item_id).first()
+    @db_operation
+    def update_cart_item(self, user_id: str, item_id: str, item: CartItemUpdate):
+        # Solo el dueño del carrito puede modificar sus líneas
+        db_item = self.db.query(CartItem).filter(CartItem.id == item_id, CartItem.user_id == user_id).first()
         if not db_item:
             return None
         
@@ -35,14 +45,61 @@ class CartRepository:
         self.db.refresh(db_item)
         return db_item
 
-    def remove_from_cart(self, item_id: str):
-        db_item = self.db.query(CartItem).filter(CartItem.id == item_id).first()
+    @db_operation
+    def remove_from_cart(self, user_id: str, item_id: str):
+        db_item = self.db.query(CartItem).filter(CartItem.id == item_id, CartItem.user_id == user_id).first()
         if db_item:
             self.db.delete(db_item)
             self.db.commit()
             return True
         return False
 
-    def bulk_update_cart(self, user_id: str, items: list):
-        # Implementar actualización masiva según necesidades
-        pass
\ No newline at end of file
+    @db_operation
+    def bulk_update_cart(self, user_id: str, items: List[CartItemInDB], removed_ids: Iterable[str] = ()):
+        """Inserta o actualiza por id muchos items y borra `removed_ids`, todo en una transacción"""
+        table = CartItem.__table__
+        rows = {
+            item.id: {
+                'id': item.id,
+                'user_id': user_id,
+                'product_id': item.product_id,
+                'quantity': item.quantity,
+                'options': item.options,
+                'created_at': item.created_at
+            }
+            for item in items
+        }
+        removed_ids = list(removed_ids)
+        try:
+            existing = set()
+            if rows:
+                existing = {
+                    item_id for (item_id,) in
+                    self.db.query(CartItem.id).filter(CartItem.id.in_(list(rows)))
+                }
+            updates = [
+                {'b_id': row['id'], 'product_id': row['product_id'], 'quantity': row['quantity'], 'options': row['options']}
+                for item_id, row in rows.items() if item_id in existing
+            ]
+            inserts = [row for item_id, row in rows.items() if item_id not in existing]
+            # Una sentencia por tipo de cambio, ejecutada con executemany
+            if updates:
+                self.db.execute(
+                    table.update().where(table.c.id == bindparam('b_id')).values(
+                        product_id=bindparam('product_id'),
+                        quantity=bindparam('quantity'),
+                        options=bindparam('options')
+                    ),
+                    updates
+                )
+            if inserts:
+                self.db.execute(table.insert(), inserts)
+            if removed_ids:
+                self.db.execute(
+                    table.delete().where(table.c.user_id == user_id, table.c.id.in_(removed_ids))
+                )
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return len(inserts), len(updates), len(removed_ids)
\ No newline at end of file
@@ -1,4 +1,8 @@
+from typing import Any, Optional, Tuple
+from sqlalchemy import and_, or_, text
 from sqlalchemy.orm import Session
+from app.db.search import PRODUCT_SEARCH_RANKING, build_match_query, supports_full_text_search
+from app.db.session import db_operation
 from app.db.models.product import Product
 from app.schemas.product import ProductCreate
 
@@ -6,12 +10,74 @@ class ProductRepository:
     def __init__(self, db: Session):
         self.db = db
 
+    @db_operation
     def get_all_products(self):
         return self.db.query(Product).filter(Product.is_available == True).all()
 
+    @db_operation
+    def list_products(
+        self,
+        category: Optional[str] = None,
+        sort_field: str = "name",
+        descending: bool = False,
+        limit: int = 50,
+        after: Optional[Tuple[Any, str]] = None
+    ):
+        """Página de productos disponibles con paginación por clave (valor de orden, id)"""
+        column = getattr(Product, sort_field)
+        query = self.db.query(Product).filter(Product.is_available == True)
+        if category is not None:
+            query = query.filter(Product.category == category)
+        if after is not None:
+            value, last_id = after
+            if descending:
+                query = query.filter(or_(column < value, and_(column == value, Product.id < last_id)))
+            else:
+                query = query.filter(or_(column > value, and_(column == value, Product.id > last_id)))
+        if descending:
+            query = query.order_by(column.desc(), Product.id.desc())
+        else:
+            query = query.order_by(column.asc(), Product.id.asc())
+        return query.limit(limit).all()
+
+    @db_operation
+    def search_products(self, query: str, limit: int = 20):
+        """Productos disponibles que coinciden con el texto, los más relevantes primero"""
+        match = build_match_query(query)
+        if match is None:
+            return []
+        if not supports_full_text_search(self.db.get_bind()):
+            pattern = f"%{query}%"
+            return self.db.query(Product).filter(
+                Product.is_available == True,
+                or_(
+                    Product.name.ilike(pattern),
+                    Product.description.ilike(pattern),
+                    Product.ingredients.ilike(pattern)
+                )
+            ).order_by(Product.name).limit(limit).all()
+
+        statement = text(f'''
+            SELECT products.* FROM products_fts
+            JOIN products ON products.id = products_fts.id
+            WHERE products_fts MATCH :match AND products.is_available = 1
+            ORDER BY {PRODUCT_SEARCH_RANKING}
+            LIMIT :limit
+        ''')
+        return self.db.query(Product).from_statement(statement).params(match=match, limit=limit).all()
+
+    @db_operation
+    def get_products_by_ids(self, product_ids):
+        """Varios productos en una sola consulta"""
+        if not product_ids:
+            return []
+        return self.db.query(Product).filter(Product.id.in_(list(product_ids))).all()
+
+    @db_operation
     def get_product_by_id(self, product_id: str):
         return self.db.query(Product).filter(Product.id == product_id).first()
 
+    @db_operation
     def create_product(self, product: ProductCreate):
         db_product = Product(
             name=product.name,
@@ -0,0 +1,78 @@
+import re
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+# Índice FTS5 con su propia copia del texto, enlazado por `products.id`: el rowid de `products`
+# (clave TEXT) no es estable y VACUUM puede renumerarlo
+PRODUCT_SEARCH_DDL = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        id UNINDEXED, name, description, ingredients,
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    ''',
+    # Los triggers mantienen el índice al día en cada escritura sobre `products`
+    '''
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts (id, name, description, ingredients)
+        VALUES (new.id, new.name, new.description, new.ingredients);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        DELETE FROM products_fts WHERE id = old.id;
+    END
+    ''',
+    # Solo cuando cambia el texto indexado: los cambios de precio o disponibilidad no tocan el índice
+    '''
+    CREATE TRIGGER IF NOT EXISTS products_fts_au AFTER UPDATE OF id, name, description, ingredients ON products BEGIN
+        DELETE FROM products_fts WHERE id = old.id;
+        INSERT INTO products_fts (id, name, description, ingredients)
+        VALUES (new.id, new.name, new.description, new.ingredients);
+    END
+    ''',
+]
+
+PRODUCT_SEARCH_TRIGGERS = ('products_fts_ai', 'products_fts_ad', 'products_fts_au')
+
+# Pesos bm25 por columna (id, name, description, ingredients); id no se indexa
+PRODUCT_SEARCH_RANKING = "bm25(products_fts, 0.0, 10.0, 1.0, 3.0)"
+
+def supports_full_text_search(engine: Engine) -> bool:
+    return engine.dialect.name == "sqlite"
+
+def init_product_search(engine: Engine):
+    """Crea el índice de búsqueda y lo rellena si es nuevo (solo SQLite)
+
+    Un índice de una versión anterior (contenido externo enlazado por rowid) se descarta
+    y se reconstruye.
+    """
+    if not supports_full_text_search(engine):
+        return
+    with engine.begin() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+        ).first()
+        if exists:
+            columns = {row[1] for row in conn.execute(text("PRAGMA table_info(products_fts)"))}
+            if 'id' not in columns:
+                for trigger in PRODUCT_SEARCH_TRIGGERS:
+                    conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+                conn.execute(text("DROP TABLE products_fts"))
+                exists = None
+        for statement in PRODUCT_SEARCH_DDL:
+            conn.execute(text(statement))
+        if not exists:
+            conn.execute(text(
+                "INSERT INTO products_fts (id, name, description, ingredients) "
+                "SELECT id, name, description, ingredients FROM products"
+            ))
+
+def build_match_query(query: str) -> Optional[str]:
+    """Convierte el texto del usuario en una consulta FTS5 con prefijos: 'doble que' -> "doble"* "que"*"""
+    terms = re.findall(r"\w+", query, flags=re.UNICODE)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
\ No newline at end of file
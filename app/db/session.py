@@ -1,18 +1,54 @@
-from sqlalchemy import create_engine
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from typing import Any, Callable, Optional
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.engine import build_engine
 
-engine = create_engine(
-    settings.SQLALCHEMY_DATABASE_URI, connect_args={"check_same_thread": False}
-)
+engine = build_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-def get_db():
+class SessionRunner:
+    """Ejecuta el trabajo de sesión en línea ("sync") o en un pool de hilos ("threadpool")"""
+
+    MODES = ("sync", "threadpool")
+
+    def __init__(self, mode: str = "sync", max_workers: int = 8):
+        if mode not in self.MODES:
+            raise ValueError(f"DB_ACCESS_MODE inválido: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        if self.mode == "sync":
+            return func(*args, **kwargs)
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="db")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+session_runner = SessionRunner(settings.DB_ACCESS_MODE, settings.DB_THREADPOOL_SIZE)
+
+def db_operation(func: Callable) -> Callable:
+    """Convierte un método síncrono de repositorio en awaitable según DB_ACCESS_MODE"""
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await session_runner.run(func, *args, **kwargs)
+    return wrapper
+
+async def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        await session_runner.run(db.close)
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, conint
+from typing import List, Optional
 from datetime import datetime
 
 class CartItemBase(BaseModel):
@@ -8,16 +8,33 @@ class CartItemBase(BaseModel):
     options: Optional[str] = None
 
 class CartItemCreate(CartItemBase):
-    pass
+    # El precio se calcula en el servidor: una cantidad negativa restaría del subtotal
+    quantity: conint(gt=0)
 
 class CartItemUpdate(BaseModel):
-    quantity: Optional[int] = None
+    quantity: Optional[conint(gt=0)] = None
     options: Optional[str] = None
 
+class CartBulkUpdate(BaseModel):
+    items: List[CartItemCreate]
+    replace: bool = False  # True: los items que no aparezcan se eliminan
+
 class CartItemInDB(CartItemBase):
     id: str
     user_id: str
     created_at: datetime
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class PricedCartItem(CartItemInDB):
+    product_name: Optional[str] = None
+    image_url: Optional[str] = None
+    unit_price: float = 0.0
+    line_total: float = 0.0
+    is_available: bool = False
+
+class PricedCart(BaseModel):
+    items: List[PricedCartItem]
+    item_count: int = 0
+    subtotal: float = 0.0
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class ProductBase(BaseModel):
@@ -19,4 +19,8 @@ class Product(ProductBase):
     created_at: datetime
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class ProductPage(BaseModel):
+    items: List[Product]
+    next_cursor: Optional[str] = None
\ No newline at end of file
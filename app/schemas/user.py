@@ -11,7 +11,7 @@ class UserCreate(UserBase):
 
 class UserInDB(UserBase):
     id: str
-    hashed_password: str
+    hashed_password: Optional[str] = None
     is_google_auth: bool = False
     created_at: datetime
 
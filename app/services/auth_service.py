@@ -1,35 +1,41 @@
 from fastapi import HTTPException, status
 from app.db.repositories.auth import AuthRepository
 from app.schemas.user import UserCreate, UserInDB
-from app.core.security import get_password_hash, verify_password
+from app.core.auth_cache import principal_cache
+from app.core.security import password_hasher
+from app.utils.serialization import construct_from_orm
 from app.utils.aws_client import AWSClient
+from app.core.connectivity import connectivity_monitor
+from app.core.sync_manager import SyncManager
 
 class AuthService:
-    def __init__(self, db):
+    def __init__(self, db, aws_client: AWSClient, sync_manager: SyncManager):
         self.repo = AuthRepository(db)
-        self.aws_client = AWSClient()
+        self.aws_client = aws_client
+        self.sync_manager = sync_manager
 
     async def register_user(self, user_create: UserCreate):
-        existing_user = self.repo.get_user_by_email(user_create.email)
+        existing_user = await self.repo.get_user_by_email(user_create.email)
         if existing_user:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
         
-        hashed_password = get_password_hash(user_create.password)
-        db_user = UserInDB(
-            **user_create.dict(),
-            hashed_password=hashed_password
+        # Único cálculo de bcrypt del registro, fuera del event loop
+        hashed_password = await password_hasher.hash(user_create.password)
+        created_user = construct_from_orm(
+            UserInDB,
+            await self.repo.create_user(user_create, hashed_password=hashed_password)
         )
-        
-        created_user = self.repo.create_user(db_user)
+        # Cualquier escritura del usuario invalida los tokens que lo tengan en caché
+        principal_cache.invalidate_user(created_user.email)
         
         try:
-            if await self.aws_client.is_online():
+            if connectivity_monitor.is_online():
                 await self.aws_client.create_user(created_user)
         except Exception as e:
-            self.repo.add_pending_operation({
+            await self.sync_manager.enqueue({
                 'type': 'create_user',
                 'data': created_user.dict()
             })
@@ -37,13 +43,20 @@ class AuthService:
         return created_user
 
     async def authenticate_user(self, email: str, password: str):
-        user = self.repo.get_user_by_email(email)
-        if not user or not verify_password(password, user.hashed_password):
+        user = await self.repo.get_user_by_email(email)
+        valid, new_hash = False, None
+        if user and user.hashed_password:
+            valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
+        if new_hash:
+            # El hash usaba otro coste: se rehace con el de PASSWORD_HASH_ROUNDS
+            await self.repo.update_password_hash(user, new_hash)
+            principal_cache.invalidate_user(user.email)
         return user
 
     async def authenticate_google(self, token: str):
@@ -54,19 +67,19 @@ class AuthService:
                 detail="Invalid Google token"
             )
         
-        user = self.repo.get_user_by_email(google_user.email)
+        user = await self.repo.get_user_by_email(google_user.email)
         if not user:
-            user = self.repo.create_user(UserInDB(
-                email=google_user.email,
-                full_name=google_user.full_name,
-                is_google_auth=True
-            ))
+            user = construct_from_orm(
+                UserInDB,
+                await self.repo.create_user(google_user, is_google_auth=True)
+            )
+            principal_cache.invalidate_user(user.email)
             
             try:
-                if await self.aws_client.is_online():
+                if connectivity_monitor.is_online():
                     await self.aws_client.create_user(user)
             except Exception:
-                self.repo.add_pending_operation({
+                await self.sync_manager.enqueue({
                     'type': 'create_user',
                     'data': user.dict()
                 })
@@ -1,79 +1,189 @@
-from typing import List
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 from app.db.repositories.cart import CartRepository
-from app.schemas.cart import CartItemCreate, CartItemInDB, CartItemUpdate
+from app.db.repositories.product import ProductRepository
+from app.schemas.cart import (
+    CartBulkUpdate,
+    CartItemCreate,
+    CartItemInDB,
+    CartItemUpdate,
+    PricedCart,
+    PricedCartItem
+)
+from app.schemas.product import Product
 from app.utils.aws_client import AWSClient
+from app.utils.serialization import construct_from_orm
+from app.core.cart_cache import CartLine, cart_cache
+from app.core.connectivity import connectivity_monitor
 from app.core.sync_manager import SyncManager
 
+logger = logging.getLogger(__name__)
+
+def price_cart(lines: Iterable[Tuple[Any, Optional[Any]]]) -> PricedCart:
+    """Calcula en una pasada los totales de pares (item, producto); los importes se suman en céntimos"""
+    items = []
+    item_count = 0
+    subtotal_cents = 0
+    for item, product in lines:
+        available = product is not None and bool(product.is_available)
+        unit_cents = round(product.price * 100) if available else 0
+        line_cents = unit_cents * item.quantity
+        item_count += item.quantity
+        subtotal_cents += line_cents
+        items.append(PricedCartItem.construct(
+            id=item.id,
+            user_id=item.user_id,
+            product_id=item.product_id,
+            quantity=item.quantity,
+            options=item.options,
+            created_at=item.created_at,
+            product_name=product.name if product is not None else None,
+            image_url=product.image_url if product is not None else None,
+            unit_price=unit_cents / 100,
+            line_total=line_cents / 100,
+            is_available=available
+        ))
+    return PricedCart.construct(items=items, item_count=item_count, subtotal=subtotal_cents / 100)
+
 class CartService:
-    def __init__(self, db):
+    def __init__(self, db, aws_client: AWSClient, sync_manager: SyncManager):
         self.repo = CartRepository(db)
-        self.aws_client = AWSClient()
-        self.sync_manager = SyncManager()
+        self.product_repo = ProductRepository(db)
+        self.aws_client = aws_client
+        self.sync_manager = sync_manager
+
+    async def get_priced_cart(self, user_id: str) -> PricedCart:
+        """Carrito con precio por línea, subtotal y número de unidades; se sirve desde caché si está"""
+        lines = cart_cache.get(user_id)
+        if lines is None:
+            generation = cart_cache.generation(user_id)
+            lines = await self._load_cart_lines(user_id)
+            cart_cache.put(user_id, lines, generation)
+        return price_cart(lines)
 
-    async def get_cart_items(self, user_id: str) -> List[CartItemInDB]:
-        await self.sync_manager.sync_data()
-        
-        if await self.aws_client.is_online():
+    async def _load_cart_lines(self, user_id: str) -> List[CartLine]:
+        # Con escrituras locales aún sin subir, AWS no tiene el carrito actual: manda la base local
+        if connectivity_monitor.is_online() and not await self.sync_manager.has_pending_for_user(user_id):
             try:
                 items = await self.aws_client.get_cart_items(user_id)
                 await self.repo.bulk_update_cart(user_id, items)
-                return items
-            except Exception:
-                return self.repo.get_cart_items(user_id)
-        else:
-            return self.repo.get_cart_items(user_id)
+                products = await self.product_repo.get_products_by_ids({item.product_id for item in items})
+                by_id = {product.id: construct_from_orm(Product, product) for product in products}
+                return [(item, by_id.get(item.product_id)) for item in items]
+            except Exception as e:
+                logger.warning(f"No se pudo leer el carrito de {user_id} desde AWS, se usa la base local: {str(e)}")
+        return self._lines_from_rows(await self.repo.get_cart_items(user_id))
 
-    async def add_to_cart(self, user_id: str, cart_item: CartItemCreate):
-        created_item = self.repo.add_to_cart(user_id, cart_item)
-        
-        if await self.aws_client.is_online():
+    @staticmethod
+    def _lines_from_rows(rows) -> List[CartLine]:
+        # Copias desacopladas de la sesión: la caché las sirve en peticiones posteriores
+        return [
+            (
+                construct_from_orm(CartItemInDB, row),
+                construct_from_orm(Product, row.product) if row.product is not None else None
+            )
+            for row in rows
+        ]
+
+    async def _cache_item(self, item: CartItemInDB):
+        """Write-through: actualiza la línea en el carrito cacheado del usuario, si lo hay"""
+        product = None
+        if cart_cache.contains(item.user_id):
+            db_product = await self.product_repo.get_product_by_id(item.product_id)
+            product = construct_from_orm(Product, db_product) if db_product is not None else None
+        cart_cache.upsert(item.user_id, item, product)
+
+    async def bulk_update_cart(self, user_id: str, bulk: CartBulkUpdate) -> PricedCart:
+        """Añade o actualiza (por producto) muchos items a la vez; con replace, el resto se elimina"""
+        rows = await self.repo.get_cart_items(user_id)
+        # Puede haber varias líneas del mismo producto (p.ej. con distintas opciones): se reutiliza la primera
+        existing = {}
+        for row in rows:
+            existing.setdefault(row.product_id, row)
+        now = datetime.utcnow()
+        merged: Dict[str, CartItemInDB] = {}
+        for entry in bulk.items:
+            current = existing.get(entry.product_id)
+            merged[entry.product_id] = CartItemInDB.construct(
+                id=current.id if current else str(uuid.uuid4()),
+                user_id=user_id,
+                product_id=entry.product_id,
+                quantity=entry.quantity,
+                options=entry.options,
+                created_at=current.created_at if current else now
+            )
+        items = list(merged.values())
+        kept_ids = {item.id for item in items}
+        removed_ids = [row.id for row in rows if row.id not in kept_ids] if bulk.replace else []
+
+        await self.repo.bulk_update_cart(user_id, items, removed_ids)
+        cart_cache.invalidate(user_id)
+        generation = cart_cache.generation(user_id)
+        lines = self._lines_from_rows(await self.repo.get_cart_items(user_id))
+        cart_cache.put(user_id, lines, generation)
+
+        await self._push(
+            user_id,
+            lambda: self.aws_client.bulk_update_cart(items, removed_ids),
+            [{'type': 'update_cart_item', 'data': item.dict()} for item in items] + [
+                {'type': 'remove_cart_item', 'item_id': item_id, 'data': {'user_id': user_id}}
+                for item_id in removed_ids
+            ]
+        )
+        return price_cart(lines)
+
+    async def _push(self, user_id: str, send: Callable[[], Awaitable], operations: List[Dict]):
+        """Escribe la mutación en AWS o, sin conexión, la deja en la cola
+
+        Si el usuario ya tiene operaciones en cola, la nueva también se encola: escrita
+        directamente, el reenvío posterior de las antiguas la pisaría.
+        """
+        if not operations:
+            return
+        if connectivity_monitor.is_online() and not await self.sync_manager.has_pending_for_user(user_id):
             try:
-                await self.aws_client.add_to_cart(created_item)
+                await send()
+                return
             except Exception:
-                self.repo.add_pending_operation({
-                    'type': 'add_cart_item',
-                    'data': created_item.dict()
-                })
+                pass
+        if len(operations) == 1:
+            await self.sync_manager.enqueue(operations[0])
         else:
-            self.repo.add_pending_operation({
-                'type': 'add_cart_item',
-                'data': created_item.dict()
-            })
-        
+            await self.sync_manager.enqueue_many(operations)
+
+    async def add_to_cart(self, user_id: str, cart_item: CartItemCreate):
+        created_item = construct_from_orm(CartItemInDB, await self.repo.add_to_cart(user_id, cart_item))
+        await self._cache_item(created_item)
+        await self._push(
+            user_id,
+            lambda: self.aws_client.add_to_cart(created_item),
+            [{'type': 'add_cart_item', 'data': created_item.dict()}]
+        )
         return created_item
 
-    async def update_cart_item(self, item_id: str, cart_item: CartItemUpdate):
-        updated_item = self.repo.update_cart_item(item_id, cart_item)
-        
-        if await self.aws_client.is_online():
-            try:
-                await self.aws_client.update_cart_item(updated_item)
-            except Exception:
-                self.repo.add_pending_operation({
-                    'type': 'update_cart_item',
-                    'data': updated_item.dict()
-                })
-        else:
-            self.repo.add_pending_operation({
-                'type': 'update_cart_item',
-                'data': updated_item.dict()
-            })
-        
+    async def update_cart_item(self, user_id: str, item_id: str, cart_item: CartItemUpdate) -> Optional[CartItemInDB]:
+        db_item = await self.repo.update_cart_item(user_id, item_id, cart_item)
+        if db_item is None:
+            return None
+        updated_item = construct_from_orm(CartItemInDB, db_item)
+        await self._cache_item(updated_item)
+        await self._push(
+            updated_item.user_id,
+            lambda: self.aws_client.update_cart_item(updated_item),
+            [{'type': 'update_cart_item', 'data': updated_item.dict()}]
+        )
         return updated_item
 
-    async def remove_from_cart(self, item_id: str):
-        self.repo.remove_from_cart(item_id)
-        
-        if await self.aws_client.is_online():
-            try:
-                await self.aws_client.remove_from_cart(item_id)
-            except Exception:
-                self.repo.add_pending_operation({
-                    'type': 'remove_cart_item',
-                    'item_id': item_id
-                })
-        else:
-            self.repo.add_pending_operation({
-                'type': 'remove_cart_item',
-                'item_id': item_id
-            })
\ No newline at end of file
+    async def remove_from_cart(self, user_id: str, item_id: str) -> bool:
+        """Elimina una línea del carrito del usuario; False si no existe"""
+        if not await self.repo.remove_from_cart(user_id, item_id):
+            return False
+        cart_cache.remove(user_id, item_id)
+        await self._push(
+            user_id,
+            lambda: self.aws_client.remove_from_cart(item_id),
+            [{'type': 'remove_cart_item', 'item_id': item_id, 'data': {'user_id': user_id}}]
+        )
+        return True
\ No newline at end of file
@@ -1,46 +1,153 @@
-from typing import List
+from bisect import bisect_left, bisect_right
+from typing import List, Optional
+from fastapi import HTTPException, status
 from app.db.repositories.product import ProductRepository
-from app.schemas.product import Product, ProductCreate
+from app.db.session import SessionLocal, session_runner
+from app.schemas.product import Product, ProductCreate, ProductPage
 from app.utils.aws_client import AWSClient
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.serialization import construct_from_orm, dumps
+from app.core.catalog_cache import catalog_cache
+from app.core.connectivity import connectivity_monitor
+from app.core.sync_manager import SyncManager
 
 class ProductService:
-    def __init__(self, db):
+    def __init__(self, db, aws_client: AWSClient, sync_manager: SyncManager):
         self.repo = ProductRepository(db)
-        self.aws_client = AWSClient()
+        self.aws_client = aws_client
+        self.sync_manager = sync_manager
 
     async def get_all_products(self) -> List[Product]:
-        if await self.aws_client.is_online():
+        return await catalog_cache.get_all(
+            lambda: self._fetch_all_products(self.repo),
+            background_loader=self._refresh_all_products
+        )
+
+    async def list_products(
+        self,
+        category: Optional[str] = None,
+        sort: str = "name",
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> ProductPage:
+        after = self._decode_cursor(sort, cursor)
+        if connectivity_monitor.is_online():
+            return self._page_from_catalog(await self.get_all_products(), category, sort, limit, after)
+
+        # Se pide un elemento de más para saber si hay página siguiente
+        rows = await self.repo.list_products(category, sort.lstrip('-'), sort.startswith('-'), limit + 1, after)
+        return self._build_page([construct_from_orm(Product, product) for product in rows], sort, limit)
+
+    async def list_products_json(
+        self,
+        category: Optional[str] = None,
+        sort: str = "name",
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> bytes:
+        """Como list_products, pero ya serializado; las páginas del catálogo en memoria se reutilizan"""
+        if not connectivity_monitor.is_online():
+            return dumps(await self.list_products(category, sort, limit, cursor))
+
+        products = await self.get_all_products()
+        key = ('list', category, sort, limit, cursor)
+        body = catalog_cache.get_rendered(products, key)
+        if body is None:
+            page = self._page_from_catalog(products, category, sort, limit, self._decode_cursor(sort, cursor))
+            body = dumps(page)
+            catalog_cache.put_rendered(products, key, body)
+        return body
+
+    @staticmethod
+    def _decode_cursor(sort: str, cursor: Optional[str]) -> Optional[tuple]:
+        if not cursor:
+            return None
+        after = decode_cursor(cursor, sort)
+        if after is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        return tuple(after)
+
+    def _page_from_catalog(
+        self,
+        products: List[Product],
+        category: Optional[str],
+        sort: str,
+        limit: int,
+        after: Optional[tuple]
+    ) -> ProductPage:
+        keys, items = catalog_cache.sorted_view(products, category, sort.lstrip('-'))
+        # Se toma un elemento de más para saber si hay página siguiente
+        if sort.startswith('-'):
+            end = bisect_left(keys, after) if after else len(items)
+            page = items[max(0, end - limit - 1):end][::-1]
+        else:
+            start = bisect_right(keys, after) if after else 0
+            page = items[start:start + limit + 1]
+        return self._build_page(page, sort, limit)
+
+    @staticmethod
+    def _build_page(page: List[Product], sort: str, limit: int) -> ProductPage:
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            last = page[-1]
+            next_cursor = encode_cursor(sort, getattr(last, sort.lstrip('-')), last.id)
+        # Los productos ya son modelos válidos: no se vuelven a validar
+        return ProductPage.construct(items=page, next_cursor=next_cursor)
+
+    async def search_products(self, query: str, limit: int = 20) -> List[Product]:
+        # El índice de búsqueda es local: refleja los productos guardados en la base SQL
+        return [construct_from_orm(Product, product) for product in await self.repo.search_products(query, limit)]
+
+    async def get_product_by_id(self, product_id: str) -> Product:
+        return await catalog_cache.get_by_id(product_id, self._fetch_product_by_id)
+
+    async def _fetch_all_products(self, repo: ProductRepository) -> List[Product]:
+        if connectivity_monitor.is_online():
             try:
                 return await self.aws_client.get_all_products()
             except Exception:
-                return self.repo.get_all_products()
-        else:
-            return self.repo.get_all_products()
+                pass
+        return [construct_from_orm(Product, product) for product in await repo.get_all_products()]
 
-    async def get_product_by_id(self, product_id: str) -> Product:
-        if await self.aws_client.is_online():
+    async def _refresh_all_products(self) -> List[Product]:
+        # El refresco en segundo plano sobrevive a la petición: usa su propia sesión
+        db = SessionLocal()
+        try:
+            return await self._fetch_all_products(ProductRepository(db))
+        finally:
+            await session_runner.run(db.close)
+
+    async def _fetch_product_by_id(self, product_id: str) -> Optional[Product]:
+        if connectivity_monitor.is_online():
             try:
                 return await self.aws_client.get_product_by_id(product_id)
             except Exception:
-                return self.repo.get_product_by_id(product_id)
-        else:
-            return self.repo.get_product_by_id(product_id)
+                pass
+        product = await self.repo.get_product_by_id(product_id)
+        return construct_from_orm(Product, product) if product else None
 
     async def create_product(self, product: ProductCreate) -> Product:
-        created_product = self.repo.create_product(product)
-        
-        if await self.aws_client.is_online():
+        created_product = construct_from_orm(Product, await self.repo.create_product(product))
+        catalog_cache.invalidate(created_product.id)
+
+        if connectivity_monitor.is_online():
             try:
                 await self.aws_client.create_product(created_product)
             except Exception:
-                self.repo.add_pending_operation({
+                await self.sync_manager.enqueue({
                     'type': 'create_product',
                     'data': created_product.dict()
                 })
         else:
-            self.repo.add_pending_operation({
+            await self.sync_manager.enqueue({
                 'type': 'create_product',
                 'data': created_product.dict()
             })
-        
+        # Una lectura concurrente puede haber recargado desde AWS sin el producto mientras se escribía
+        catalog_cache.invalidate(created_product.id)
+
         return created_product
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""Backends de AWSClient: boto3 contra AWS real o en memoria (app.utils.fake_aws)."""
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Optional
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import boto3
+    from botocore.config import Config
+
+AWS_BACKENDS = ("boto3", "memory")
+
+class AWSBackend(ABC):
+    """Proporciona el recurso DynamoDB y el cliente cognito-idp que usa AWSClient"""
+
+    name = "base"
+
+    @abstractmethod
+    def dynamodb(self) -> Any:
+        """Recurso con Table(nombre) y batch_write_item"""
+
+    @abstractmethod
+    def cognito(self) -> Any:
+        """Cliente con list_users y admin_create_user"""
+
+class Boto3Backend(AWSBackend):
+    name = "boto3"
+
+    def __init__(self, session: Optional["boto3.session.Session"] = None, config: Optional["Config"] = None):
+        if session is None:
+            import boto3
+            session = boto3.session.Session(region_name=settings.AWS_REGION)
+        self.session = session
+        self.config = config
+
+    def dynamodb(self) -> Any:
+        return self.session.resource('dynamodb', config=self.config)
+
+    def cognito(self) -> Any:
+        return self.session.client('cognito-idp', config=self.config)
+
+def build_backend(name: str = settings.AWS_BACKEND) -> AWSBackend:
+    """Backend indicado en AWS_BACKEND, con la configuración del proceso"""
+    if name == "memory":
+        from app.utils.fake_aws import InMemoryBackend
+        return InMemoryBackend.from_settings()
+    if name != "boto3":
+        raise ValueError(f"AWS_BACKEND inválido: {name}")
+
+    # boto3 tarda en importarse: se carga al crear el primer cliente, no al arrancar
+    import boto3
+    from botocore.config import Config
+
+    session = boto3.session.Session(
+        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+        region_name=settings.AWS_REGION
+    )
+    config = Config(
+        max_pool_connections=settings.AWS_MAX_POOL_CONNECTIONS,
+        connect_timeout=settings.AWS_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=settings.AWS_READ_TIMEOUT_SECONDS
+    )
+    return Boto3Backend(session, config)
\ No newline at end of file
@@ -1,35 +1,161 @@
-import boto3
-from botocore.exceptions import ClientError
-from typing import Optional, List
+import asyncio
+import os
+import threading
+import weakref
+from datetime import date, datetime
+from decimal import Decimal
+from botocore.exceptions import ClientError, ConnectionError as BotoConnectionError, HTTPClientError
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, Optional, List
+from app.core.config import settings
+from app.core.connectivity import connectivity_monitor
+from app.utils.aws_backends import AWSBackend, Boto3Backend, build_backend
+from app.utils.exceptions import AWSSyncException
 from app.schemas.cart import CartItemInDB
 from app.schemas.user import UserInDB
 from app.schemas.product import Product
 
+if TYPE_CHECKING:
+    import boto3
+    from botocore.config import Config
+
+# Límite de peticiones por llamada a batch_write_item impuesto por DynamoDB
+DYNAMODB_BATCH_WRITE_LIMIT = 25
+
+# Códigos de error con los que AWS indica que está limitando las peticiones
+THROTTLING_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'RequestLimitExceeded',
+    'ThrottlingException',
+    'Throttling',
+    'TooManyRequestsException',
+}
+
+def is_connectivity_error(error: BaseException) -> bool:
+    """Si el error indica que AWS no está disponible (y debe contar para el circuit breaker)
+
+    Timeouts, errores de conexión, throttling y errores 5xx cuentan; el resto de errores
+    de cliente (p.ej. UsernameExistsException o ValidationException) son respuestas válidas.
+    """
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError, BotoConnectionError, HTTPClientError)):
+        return True
+    if isinstance(error, ClientError):
+        code = error.response.get('Error', {}).get('Code')
+        status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode') or 0
+        return code in THROTTLING_ERROR_CODES or status >= 500
+    return False
+
+def to_dynamodb_item(value: Any) -> Any:
+    """Convierte floats a Decimal y fechas a ISO 8601, que es lo que acepta DynamoDB"""
+    if isinstance(value, dict):
+        return {k: to_dynamodb_item(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_dynamodb_item(v) for v in value]
+    if isinstance(value, float):
+        return Decimal(str(value))
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def cart_key(item_id: str) -> Dict[str, str]:
+    """Clave de un item en la tabla Cart"""
+    return {settings.DYNAMODB_CART_KEY: item_id}
+
+def cart_item_to_dynamodb(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Item de la tabla Cart, con el id también en el atributo clave si se llama distinto"""
+    return {**to_dynamodb_item(item), **cart_key(item['id'])}
+
+def product_from_item(item: Dict[str, Any]) -> Product:
+    """Product desde un item escrito por create_product, sin volver a validarlo con pydantic"""
+    try:
+        values = {name: item[name] for name in Product.__fields__ if name in item}
+        values['price'] = float(values['price'])
+        values['is_available'] = bool(values['is_available'])
+        if not isinstance(values['created_at'], datetime):
+            values['created_at'] = datetime.fromisoformat(values['created_at'])
+        if not isinstance(values['id'], str) or not isinstance(values['name'], str):
+            raise TypeError
+    except (KeyError, TypeError, ValueError):
+        # Items antiguos o escritos por otros: se validan de la forma habitual
+        return Product(**item)
+    return Product.construct(**values)
+
 class AWSClient:
-    def __init__(self):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.cognito = boto3.client('cognito-idp')
-        self.user_pool_id = 'your-user-pool-id'
-        self.app_client_id = 'your-app-client-id'
+    def __init__(
+        self,
+        session: Optional["boto3.session.Session"] = None,
+        config: Optional["Config"] = None,
+        backend: Optional[AWSBackend] = None
+    ):
+        self.backend = backend or Boto3Backend(session, config)
+        self.dynamodb = self.backend.dynamodb()
+        self.cognito = self.backend.cognito()
+        self.user_pool_id = settings.COGNITO_USER_POOL_ID
+        self.app_client_id = settings.COGNITO_APP_CLIENT_ID
         
         self.users_table = self.dynamodb.Table('Users')
         self.products_table = self.dynamodb.Table('Products')
         self.cart_table = self.dynamodb.Table('Cart')
 
-    async def is_online(self) -> bool:
+        # Las llamadas boto3 son bloqueantes: se ejecutan en un pool acotado
+        self._executor = ThreadPoolExecutor(
+            max_workers=settings.AWS_EXECUTOR_MAX_WORKERS,
+            thread_name_prefix="aws"
+        )
+        self._limiters = weakref.WeakKeyDictionary()
+
+    def close(self):
+        """Libera el pool de hilos del cliente"""
+        self._executor.shutdown(wait=False)
+
+    def _get_limiter(self) -> asyncio.Semaphore:
+        # Un semáforo por event loop, ya que asyncio.Semaphore queda ligado al loop
+        loop = asyncio.get_running_loop()
+        limiter = self._limiters.get(loop)
+        if limiter is None:
+            limiter = asyncio.Semaphore(settings.AWS_MAX_CONCURRENT_CALLS)
+            self._limiters[loop] = limiter
+        return limiter
+
+    async def _run(self, operation: str, func: Callable, *args, **kwargs) -> Any:
+        """Ejecuta una llamada boto3 fuera del event loop con timeout y límite de concurrencia"""
+        timeout = settings.AWS_OPERATION_TIMEOUTS.get(operation, settings.AWS_CALL_TIMEOUT_SECONDS)
+        async with self._get_limiter():
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+            return await asyncio.wait_for(future, timeout)
+
+    async def _call(self, operation: str, func: Callable, *args, **kwargs) -> Any:
+        """Igual que _run, pero actualiza el monitor de conexión con el resultado"""
         try:
-            self.cognito.list_users(UserPoolId=self.user_pool_id, Limit=1)
-            return True
-        except ClientError:
-            return False
+            result = await self._run(operation, func, *args, **kwargs)
+        except Exception as e:
+            # Los errores de cliente no cambian el estado del circuito
+            if is_connectivity_error(e):
+                connectivity_monitor.record_failure()
+            raise
+        connectivity_monitor.record_success()
+        return result
+
+    async def is_online(self) -> bool:
+        """Estado de conexión cacheado por el monitor, sin llamada a AWS"""
+        return connectivity_monitor.is_online()
 
     async def check_connection(self):
         """Verifica la conexión con AWS"""
-        self.cognito.list_users(UserPoolId=self.user_pool_id, Limit=1)
+        await self._run(
+            'list_users',
+            self.cognito.list_users,
+            UserPoolId=self.user_pool_id,
+            Limit=1
+        )
 
     async def create_user(self, user: UserInDB):
         try:
-            response = self.cognito.admin_create_user(
+            response = await self._call(
+                'admin_create_user',
+                self.cognito.admin_create_user,
                 UserPoolId=self.user_pool_id,
                 Username=user.email,
                 UserAttributes=[
@@ -41,7 +167,7 @@ class AWSClient:
                 MessageAction='SUPPRESS'
             )
             
-            self.users_table.put_item(Item=user.dict())
+            await self._call('put_item', self.users_table.put_item, Item=to_dynamodb_item(user.dict()))
             return response
         except ClientError as e:
             raise Exception(f"AWS Error: {e.response['Error']['Message']}")
@@ -59,9 +185,12 @@ class AWSClient:
 
     async def get_cart_items(self, user_id: str) -> List[CartItemInDB]:
         try:
-            response = self.cart_table.query(
-                KeyConditionExpression='userId = :userId',
-                ExpressionAttributeValues={':userId': user_id}
+            response = await self._call(
+                'query',
+                self.cart_table.query,
+                IndexName=settings.DYNAMODB_CART_USER_INDEX,
+                KeyConditionExpression='user_id = :user_id',
+                ExpressionAttributeValues={':user_id': user_id}
             )
             return [CartItemInDB(**item) for item in response.get('Items', [])]
         except ClientError as e:
@@ -69,41 +198,176 @@ class AWSClient:
 
     async def add_to_cart(self, cart_item: CartItemInDB):
         try:
-            self.cart_table.put_item(Item=cart_item.dict())
+            await self._call('put_item', self.cart_table.put_item, Item=cart_item_to_dynamodb(cart_item.dict()))
             return cart_item
         except ClientError as e:
             raise Exception(f"AWS Error: {e.response['Error']['Message']}")
 
     async def remove_from_cart(self, item_id: str):
         try:
-            self.cart_table.delete_item(Key={'itemId': item_id})
+            await self._call('delete_item', self.cart_table.delete_item, Key=cart_key(item_id))
         except ClientError as e:
             raise Exception(f"AWS Error: {e.response['Error']['Message']}")
 
     async def update_cart_item(self, cart_item: CartItemInDB):
         try:
-            self.cart_table.put_item(Item=cart_item.dict())
+            await self._call('put_item', self.cart_table.put_item, Item=cart_item_to_dynamodb(cart_item.dict()))
             return cart_item
         except ClientError as e:
             raise Exception(f"AWS Error: {e.response['Error']['Message']}")
 
+    async def bulk_update_cart(self, items: List[CartItemInDB], removed_ids: List[str] = ()):
+        """Refleja muchos cambios del carrito con batch_write_item, en lotes de 25 en paralelo"""
+        requests = [
+            {'PutRequest': {'Item': cart_item_to_dynamodb(item.dict())}} for item in items
+        ] + [
+            {'DeleteRequest': {'Key': cart_key(item_id)}} for item_id in removed_ids
+        ]
+        await asyncio.gather(*(
+            self.batch_write({self.cart_table.name: requests[start:start + DYNAMODB_BATCH_WRITE_LIMIT]})
+            for start in range(0, len(requests), DYNAMODB_BATCH_WRITE_LIMIT)
+        ))
+
     async def get_all_products(self) -> List[Product]:
+        return [product async for product in self.iter_products(settings.AWS_SCAN_SEGMENTS)]
+
+    async def iter_products(self, total_segments: int = 1, page_size: Optional[int] = None) -> AsyncIterator[Product]:
+        """Recorre la tabla de productos página a página; con total_segments > 1 escanea en paralelo"""
+        pages: asyncio.Queue = asyncio.Queue(maxsize=total_segments * 2)
+        tasks = [
+            asyncio.create_task(self._scan_segment(pages, segment, total_segments, page_size))
+            for segment in range(total_segments)
+        ]
         try:
-            response = self.products_table.scan()
-            return [Product(**item) for item in response.get('Items', [])]
+            finished = 0
+            while finished < total_segments:
+                items, error = await pages.get()
+                if error is not None:
+                    raise error
+                if items is None:
+                    finished += 1
+                    continue
+                for item in items:
+                    yield product_from_item(item)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _scan_segment(self, pages: asyncio.Queue, segment: int, total_segments: int, page_size: Optional[int]):
+        """Escanea un segmento siguiendo LastEvaluatedKey y publica cada página en la cola"""
+        kwargs = {}
+        if total_segments > 1:
+            kwargs.update(Segment=segment, TotalSegments=total_segments)
+        if page_size:
+            kwargs['Limit'] = page_size
+        try:
+            while True:
+                response = await self._call('scan', self.products_table.scan, **kwargs)
+                await pages.put((response.get('Items', []), None))
+                last_key = response.get('LastEvaluatedKey')
+                if not last_key:
+                    break
+                kwargs['ExclusiveStartKey'] = last_key
         except ClientError as e:
-            raise Exception(f"AWS Error: {e.response['Error']['Message']}")
+            await pages.put((None, Exception(f"AWS Error: {e.response['Error']['Message']}")))
+            return
+        except Exception as e:
+            await pages.put((None, e))
+            return
+        # Fin del segmento
+        await pages.put((None, None))
 
     async def get_product_by_id(self, product_id: str) -> Product:
         try:
-            response = self.products_table.get_item(Key={'id': product_id})
-            return Product(**response['Item'])
+            response = await self._call('get_item', self.products_table.get_item, Key={'id': product_id})
+            return product_from_item(response['Item'])
         except ClientError as e:
             raise Exception(f"AWS Error: {e.response['Error']['Message']}")
 
     async def create_product(self, product: Product):
         try:
-            self.products_table.put_item(Item=product.dict())
+            await self._call('put_item', self.products_table.put_item, Item=to_dynamodb_item(product.dict()))
             return product
         except ClientError as e:
-            raise Exception(f"AWS Error: {e.response['Error']['Message']}")
\ No newline at end of file
+            raise Exception(f"AWS Error: {e.response['Error']['Message']}")
+
+    async def batch_write(self, request_items: Dict[str, List[Dict]]):
+        """Escribe un lote (máx. 25 peticiones) reintentando con backoff los elementos no procesados"""
+        pending = request_items
+        for attempt in range(settings.AWS_BATCH_MAX_RETRIES + 1):
+            if attempt:
+                await asyncio.sleep(settings.AWS_BATCH_BACKOFF_SECONDS * 2 ** (attempt - 1))
+            try:
+                response = await self._call(
+                    'batch_write_item',
+                    self.dynamodb.batch_write_item,
+                    RequestItems=pending
+                )
+            except ClientError as e:
+                raise Exception(f"AWS Error: {e.response['Error']['Message']}")
+            pending = response.get('UnprocessedItems') or {}
+            if not pending:
+                return
+        unprocessed = sum(len(requests) for requests in pending.values())
+        raise AWSSyncException(f"{unprocessed} elementos sin procesar tras {settings.AWS_BATCH_MAX_RETRIES} reintentos")
+
+class AWSClientRegistry:
+    """Mantiene una única sesión boto3 y un AWSClient por proceso"""
+
+    def __init__(self):
+        self._client: Optional[AWSClient] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get_client(self) -> AWSClient:
+        """Devuelve el cliente del proceso actual, creándolo la primera vez"""
+        # Se comprueba el pid para no heredar conexiones a través de un fork
+        pid = os.getpid()
+        if self._client is None or self._pid != pid:
+            with self._lock:
+                if self._client is None or self._pid != pid:
+                    self._client = self._build_client()
+                    self._pid = pid
+        return self._client
+
+    def install(self, client: AWSClient):
+        """Fija el cliente del proceso actual, p.ej. un doble de AWS en los benchmarks"""
+        with self._lock:
+            self._client = client
+            self._pid = os.getpid()
+
+    def reset(self):
+        """Descarta el cliente actual; el siguiente acceso crea uno nuevo"""
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+
+    def _build_client(self) -> AWSClient:
+        return AWSClient(backend=build_backend(settings.AWS_BACKEND))
+
+class LazyAWSClient:
+    """Delega en el cliente del registro, que se crea con la primera llamada a AWS"""
+
+    def __init__(self, registry: AWSClientRegistry):
+        self._registry = registry
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._registry.get_client(), name)
+
+aws_client_registry = AWSClientRegistry()
+lazy_aws_client = LazyAWSClient(aws_client_registry)
+
+def get_aws_client() -> AWSClient:
+    return aws_client_registry.get_client()
+
+async def probe_aws():
+    """Sonda del monitor de conexión; el primer acceso importa boto3 y crea el cliente, fuera del event loop"""
+    client = await asyncio.get_running_loop().run_in_executor(None, get_aws_client)
+    await client.check_connection()
+
+def get_lazy_aws_client() -> AWSClient:
+    """Para las dependencias de las peticiones: las que no llegan a AWS no crean el cliente"""
+    return lazy_aws_client
\ No newline at end of file
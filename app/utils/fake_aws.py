@@ -0,0 +1,348 @@
+"""AWS en memoria para desarrollo y benchmarks.
+
+Implementa las tablas Users, Products y Cart de DynamoDB y las llamadas de Cognito que usa
+AWSClient, con latencia, throttling y caídas inyectables. Los errores usan los tipos de
+botocore, así que los servicios, el circuit breaker y SyncManager siguen los mismos caminos
+que contra AWS real.
+"""
+import copy
+import random
+import re
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from botocore.exceptions import ClientError, EndpointConnectionError
+from app.core.config import settings
+from app.utils.aws_backends import AWSBackend
+
+# Límite de peticiones por llamada a batch_write_item
+BATCH_WRITE_LIMIT = 25
+
+# Código de error que devuelve cada servicio al limitar las peticiones
+THROTTLING_CODES = {
+    'dynamodb': 'ProvisionedThroughputExceededException',
+    'cognito-idp': 'TooManyRequestsException',
+}
+
+# Tabla -> (clave de partición, índices secundarios: nombre -> su clave de partición)
+TABLES = {
+    'Users': ('id', {}),
+    'Products': ('id', {}),
+    'Cart': (settings.DYNAMODB_CART_KEY, {settings.DYNAMODB_CART_USER_INDEX: 'user_id'}),
+}
+
+# Única forma de KeyConditionExpression que se interpreta: igualdad sobre la clave de partición
+KEY_CONDITION = re.compile(r'^\s*(\w+)\s*=\s*(:\w+)\s*$')
+
+def client_error(code: str, message: str, operation: str) -> ClientError:
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+def _check_value(value: Any):
+    # Igual que el serializador de boto3: DynamoDB no admite float
+    if isinstance(value, float):
+        raise TypeError("Float types are not supported. Use Decimal types instead.")
+    if isinstance(value, dict):
+        for item in value.values():
+            _check_value(item)
+    elif isinstance(value, (list, tuple, set)):
+        for item in value:
+            _check_value(item)
+
+class FaultInjector:
+    """Latencia, throttling y caídas aplicadas antes de cada llamada"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle_rate: float = 0.0,
+        unprocessed_rate: float = 0.0,
+        outage: bool = False,
+        seed: Optional[int] = None
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.unprocessed_rate = unprocessed_rate
+        self.outage = outage
+        self._flap: Optional[Tuple[float, float, float]] = None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'throttled': 0, 'outage_errors': 0, 'unprocessed': 0}
+        self.calls_by_operation: Dict[str, int] = {}
+
+    def set_outage(self, outage: bool):
+        """Activa o desactiva una caída; anula la alternancia programada"""
+        self.outage = outage
+        self._flap = None
+
+    def flap(self, up_seconds: float, down_seconds: float):
+        """Alterna periodos con servicio y sin él, empezando con servicio"""
+        self._flap = (time.monotonic(), up_seconds, down_seconds)
+
+    def is_down(self) -> bool:
+        if self._flap is None:
+            return self.outage
+        start, up, down = self._flap
+        return (time.monotonic() - start) % (up + down) >= up
+
+    def before_call(self, service: str, operation: str):
+        """Espera la latencia simulada y lanza el error inyectado, si toca"""
+        with self._lock:
+            self.stats['calls'] += 1
+            self.calls_by_operation[operation] = self.calls_by_operation.get(operation, 0) + 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            throttled = self._rng.random() < self.throttle_rate
+        # Las llamadas de boto3 bloquean el hilo: aquí también
+        if delay:
+            time.sleep(delay)
+        if self.is_down():
+            with self._lock:
+                self.stats['outage_errors'] += 1
+            raise EndpointConnectionError(endpoint_url=f"https://{service}.{settings.AWS_REGION}.amazonaws.com")
+        if throttled:
+            with self._lock:
+                self.stats['throttled'] += 1
+            raise client_error(THROTTLING_CODES[service], "Rate exceeded", operation)
+
+    def unprocessed(self) -> bool:
+        """Si un elemento de batch_write_item se devuelve sin procesar"""
+        with self._lock:
+            if self._rng.random() < self.unprocessed_rate:
+                self.stats['unprocessed'] += 1
+                return True
+            return False
+
+class FakeTable:
+    """Tabla con clave de partición simple.
+
+    Como DynamoDB, rechaza las claves que no coinciden con el esquema. query solo admite
+    igualdad sobre la clave de la tabla o de uno de sus índices (IndexName).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key: str,
+        faults: FaultInjector,
+        indexes: Optional[Dict[str, str]] = None,
+        page_size: int = 100
+    ):
+        self.name = name
+        self.key = key
+        self.indexes = indexes or {}
+        # Elementos por página de scan cuando no se pasa Limit (hace las veces del límite de 1 MB)
+        self.page_size = page_size
+        self.faults = faults
+        self.items: Dict[Any, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _key_value(self, key: Dict, operation: str) -> Any:
+        if set(key) != {self.key}:
+            raise client_error('ValidationException', "The provided key element does not match the schema", operation)
+        return key[self.key]
+
+    def put(self, item: Dict, operation: str = 'put_item'):
+        _check_value(item)
+        if self.key not in item:
+            raise client_error(
+                'ValidationException',
+                f"One or more parameter values were invalid: Missing the key {self.key} in the item",
+                operation
+            )
+        with self._lock:
+            self.items[item[self.key]] = copy.deepcopy(item)
+
+    def delete(self, key: Dict, operation: str = 'delete_item'):
+        value = self._key_value(key, operation)
+        with self._lock:
+            self.items.pop(value, None)
+
+    def put_item(self, Item: Dict, **kwargs) -> Dict:
+        self.faults.before_call('dynamodb', 'put_item')
+        self.put(Item)
+        return {}
+
+    def delete_item(self, Key: Dict, **kwargs) -> Dict:
+        self.faults.before_call('dynamodb', 'delete_item')
+        self.delete(Key)
+        return {}
+
+    def get_item(self, Key: Dict, **kwargs) -> Dict:
+        self.faults.before_call('dynamodb', 'get_item')
+        value = self._key_value(Key, 'get_item')
+        with self._lock:
+            item = self.items.get(value)
+            return {'Item': copy.deepcopy(item)} if item is not None else {}
+
+    def scan(
+        self,
+        Limit: Optional[int] = None,
+        ExclusiveStartKey: Optional[Dict] = None,
+        Segment: int = 0,
+        TotalSegments: int = 1,
+        **kwargs
+    ) -> Dict:
+        self.faults.before_call('dynamodb', 'scan')
+        with self._lock:
+            keys = sorted(
+                k for k in self.items if zlib.crc32(str(k).encode()) % TotalSegments == Segment
+            )
+            if ExclusiveStartKey:
+                start = ExclusiveStartKey[self.key]
+                keys = [k for k in keys if k > start]
+            page = keys[:Limit or self.page_size]
+            response = {
+                'Items': [copy.deepcopy(self.items[k]) for k in page],
+                'Count': len(page),
+                'ScannedCount': len(page),
+            }
+        if len(keys) > len(page):
+            response['LastEvaluatedKey'] = {self.key: page[-1]}
+        return response
+
+    def query(
+        self,
+        KeyConditionExpression: Any = None,
+        ExpressionAttributeValues: Optional[Dict] = None,
+        IndexName: Optional[str] = None,
+        **kwargs
+    ) -> Dict:
+        self.faults.before_call('dynamodb', 'query')
+        if IndexName is not None and IndexName not in self.indexes:
+            raise client_error(
+                'ValidationException',
+                f"The table does not have the specified index: {IndexName}",
+                'query'
+            )
+        key = self.indexes[IndexName] if IndexName is not None else self.key
+        match = KEY_CONDITION.match(KeyConditionExpression) if isinstance(KeyConditionExpression, str) else None
+        if match is None:
+            raise client_error('ValidationException', f"Unsupported KeyConditionExpression: {KeyConditionExpression}", 'query')
+        attribute, placeholder = match.groups()
+        if attribute != key:
+            raise client_error('ValidationException', f"Query condition missed key schema element: {key}", 'query')
+        if placeholder not in (ExpressionAttributeValues or {}):
+            raise client_error(
+                'ValidationException',
+                f"An expression attribute value used in expression is not defined; attribute value: {placeholder}",
+                'query'
+            )
+        value = ExpressionAttributeValues[placeholder]
+        with self._lock:
+            items = [copy.deepcopy(item) for item in self.items.values() if item.get(attribute) == value]
+        return {'Items': items, 'Count': len(items), 'ScannedCount': len(items)}
+
+class FakeDynamoDB:
+    """Recurso DynamoDB con las tablas de la aplicación y batch_write_item"""
+
+    def __init__(self, faults: FaultInjector):
+        self.faults = faults
+        self.tables = {
+            name: FakeTable(name, key, faults, indexes)
+            for name, (key, indexes) in TABLES.items()
+        }
+
+    def Table(self, name: str) -> FakeTable:
+        if name not in self.tables:
+            raise client_error('ResourceNotFoundException', f"Requested resource not found: Table: {name} not found", 'describe_table')
+        return self.tables[name]
+
+    def batch_write_item(self, RequestItems: Dict[str, List[Dict]], **kwargs) -> Dict:
+        self.faults.before_call('dynamodb', 'batch_write_item')
+        if sum(len(requests) for requests in RequestItems.values()) > BATCH_WRITE_LIMIT:
+            raise client_error(
+                'ValidationException',
+                f"Too many items requested for the BatchWriteItem call (max {BATCH_WRITE_LIMIT})",
+                'batch_write_item'
+            )
+        for table_name, requests in RequestItems.items():
+            table = self.Table(table_name)
+            keys = [
+                request['PutRequest']['Item'].get(table.key) if 'PutRequest' in request
+                else table._key_value(request['DeleteRequest']['Key'], 'batch_write_item')
+                for request in requests
+            ]
+            if len(set(keys)) != len(keys):
+                raise client_error('ValidationException', "Provided list of item keys contains duplicates", 'batch_write_item')
+
+        unprocessed: Dict[str, List[Dict]] = {}
+        for table_name, requests in RequestItems.items():
+            table = self.tables[table_name]
+            for request in requests:
+                if self.faults.unprocessed():
+                    unprocessed.setdefault(table_name, []).append(request)
+                elif 'PutRequest' in request:
+                    table.put(request['PutRequest']['Item'], 'batch_write_item')
+                else:
+                    table.delete(request['DeleteRequest']['Key'], 'batch_write_item')
+        return {'UnprocessedItems': unprocessed}
+
+class FakeCognito:
+    """Cliente cognito-idp con list_users y admin_create_user"""
+
+    def __init__(self, faults: FaultInjector):
+        self.faults = faults
+        self.pools: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def list_users(self, UserPoolId: str, Limit: int = 60, PaginationToken: Optional[str] = None, **kwargs) -> Dict:
+        self.faults.before_call('cognito-idp', 'list_users')
+        with self._lock:
+            users = list(self.pools.get(UserPoolId, {}).values())
+        start = int(PaginationToken or 0)
+        response = {'Users': copy.deepcopy(users[start:start + Limit])}
+        if start + Limit < len(users):
+            response['PaginationToken'] = str(start + Limit)
+        return response
+
+    def admin_create_user(self, UserPoolId: str, Username: str, UserAttributes: List[Dict] = (), **kwargs) -> Dict:
+        self.faults.before_call('cognito-idp', 'admin_create_user')
+        for attribute in UserAttributes:
+            if not isinstance(attribute.get('Value'), str):
+                raise client_error(
+                    'InvalidParameterException',
+                    f"Invalid value for attribute {attribute.get('Name')}",
+                    'admin_create_user'
+                )
+        user = {
+            'Username': Username,
+            'Attributes': copy.deepcopy(list(UserAttributes)),
+            'UserCreateDate': datetime.utcnow(),
+            'Enabled': True,
+            'UserStatus': 'FORCE_CHANGE_PASSWORD',
+        }
+        with self._lock:
+            pool = self.pools.setdefault(UserPoolId, {})
+            if Username in pool:
+                raise client_error('UsernameExistsException', "User account already exists.", 'admin_create_user')
+            pool[Username] = user
+        return {'User': copy.deepcopy(user)}
+
+class InMemoryBackend(AWSBackend):
+    """Backend en memoria; los datos duran lo que el proceso"""
+
+    name = "memory"
+
+    def __init__(self, faults: Optional[FaultInjector] = None):
+        self.faults = faults or FaultInjector()
+        self._dynamodb = FakeDynamoDB(self.faults)
+        self._cognito = FakeCognito(self.faults)
+
+    @classmethod
+    def from_settings(cls) -> "InMemoryBackend":
+        return cls(FaultInjector(
+            latency=settings.FAKE_AWS_LATENCY_SECONDS,
+            jitter=settings.FAKE_AWS_JITTER_SECONDS,
+            throttle_rate=settings.FAKE_AWS_THROTTLE_RATE,
+            unprocessed_rate=settings.FAKE_AWS_UNPROCESSED_RATE,
+            outage=settings.FAKE_AWS_OUTAGE
+        ))
+
+    def dynamodb(self) -> FakeDynamoDB:
+        return self._dynamodb
+
+    def cognito(self) -> FakeCognito:
+        return self._cognito
\ No newline at end of file
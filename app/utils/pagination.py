@@ -0,0 +1,31 @@
+import base64
+import json
+from typing import Any, Optional, Tuple
+
+# Tipo del valor de orden de cada campo; un cursor con otro tipo no se puede comparar
+SORT_VALUE_TYPES = {
+    'name': (str,),
+    'price': (int, float),
+}
+
+def encode_cursor(sort: str, value: Any, item_id: str) -> str:
+    """Cursor opaco con la clave (valor de orden, id) del último elemento devuelto"""
+    payload = json.dumps({'s': sort, 'v': value, 'id': item_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor: str, sort: str) -> Optional[Tuple[Any, str]]:
+    """Devuelve (valor, id) o None si el cursor no es válido para este orden"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload['s'] != sort:
+            return None
+        value, item_id = payload['v'], payload['id']
+        expected = SORT_VALUE_TYPES.get(sort.lstrip('-'))
+        if expected and (isinstance(value, bool) or not isinstance(value, expected)):
+            return None
+        if not isinstance(item_id, str):
+            return None
+        return value, item_id
+    except (ValueError, KeyError, TypeError):
+        return None
\ No newline at end of file
@@ -0,0 +1,43 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Type, TypeVar
+from pydantic import BaseModel
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el json de la librería estándar
+    orjson = None
+
+ModelT = TypeVar('ModelT', bound=BaseModel)
+
+def construct_from_orm(model: Type[ModelT], obj: Any) -> ModelT:
+    """Como model.from_orm, pero sin validar: para filas cuyos tipos ya garantiza la base de datos"""
+    return model.construct(**{name: getattr(obj, name) for name in model.__fields__})
+
+def _default(value: Any) -> Any:
+    """Tipos que el codificador JSON no conoce por sí mismo"""
+    if isinstance(value, BaseModel):
+        # Los campos viven en __dict__; evita el recorrido recursivo de .dict()
+        return value.__dict__
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+def dumps(value: Any) -> bytes:
+    """Serializa a JSON (bytes) sin pasar por jsonable_encoder ni volver a validar los modelos"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, default=_default, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+class FastJSONResponse(Response):
+    """Respuesta JSON que acepta modelos, listas de modelos o bytes ya serializados"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
\ No newline at end of file
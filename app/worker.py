@@ -1,23 +1,30 @@
+"""Worker de sincronización independiente de la API.
+
+Se despliega junto con SYNC_IN_PROCESS=false en los procesos de la API, para que solo este
+proceso vacíe la cola de operaciones pendientes. No recibe los avisos de las escrituras de la
+API: revisa la cola cada SYNC_INTERVAL_SECONDS.
+"""
 import asyncio
 import logging
-from app.core.sync_manager import SyncManager
+from app.core.config import settings
+from app.core.connectivity import connectivity_monitor
+from app.core.sync_manager import sync_manager
+from app.utils.aws_client import probe_aws
 from app.utils.logger import setup_logging
 
 async def sync_worker():
     setup_logging()
     logger = logging.getLogger(__name__)
-    sync_manager = SyncManager()
-    
-    while True:
-        try:
-            logger.info("Iniciando sincronización...")
-            await sync_manager.sync_data()
-            logger.info("Sincronización completada")
-        except Exception as e:
-            logger.error(f"Error en sincronización: {str(e)}")
-        
-        # Esperar 5 minutos antes de la próxima sincronización
-        await asyncio.sleep(300)
+    logger.info("Iniciando worker de sincronización")
+    if settings.SYNC_IN_PROCESS:
+        logger.warning("SYNC_IN_PROCESS está activado: los procesos de la API también vacían la cola")
+
+    connectivity_monitor.start(probe_aws)
+    try:
+        await sync_manager.run(interval=settings.SYNC_INTERVAL_SECONDS)
+    finally:
+        await sync_manager.stop()
+        await connectivity_monitor.stop()
 
 if __name__ == "__main__":
     asyncio.run(sync_worker())
\ No newline at end of file
@@ -0,0 +1,306 @@
+"""Carga mixta contra la API completa: peticiones por segundo y latencias por endpoint.
+
+La aplicación se ejecuta con AWS sustituido por los dobles de benchmarks.stubs, sobre una
+base de datos temporal. El tráfico se genera en el mismo proceso, por ASGI (--transport asgi)
+o por HTTP contra un uvicorn local (--transport uvicorn).
+
+Uso:
+    python -m benchmarks.bench_api_load [--workload mixed] [--concurrency 16] [--duration 10]
+    python -m benchmarks.bench_api_load --save benchmarks/baselines/api_load_mixed.json
+    python -m benchmarks.bench_api_load --compare benchmarks/baselines/api_load_mixed.json
+
+Con --compare, el proceso termina con código 1 si algún endpoint empeora su p99 o sus
+peticiones por segundo más allá de --tolerance respecto a la línea base.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import sys
+import tempfile
+import threading
+from typing import Callable, Dict, List
+
+# Base de datos temporal para no tocar la del proyecto
+_db_dir = tempfile.mkdtemp(prefix="bench_api_load_")
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{_db_dir}/bench.db"
+os.environ["LOCAL_DB_PATH"] = f"{_db_dir}/local.db"
+
+import httpx
+from benchmarks.common import percentile
+
+API = "/api/v1"
+WORDS = ["classic", "bacon", "cheese", "veggie", "spicy", "double", "chicken", "smoky", "bbq", "truffle"]
+CATEGORIES = ["burgers", "sides", "drinks", "desserts"]
+
+class LoadState:
+    """Datos sembrados antes de medir: productos y usuarios con token"""
+
+    def __init__(self):
+        self.product_ids: List[str] = []
+        self.users: List[Dict] = []
+
+def _auth(user: Dict) -> Dict:
+    return {"Authorization": f"Bearer {user['token']}"}
+
+async def products_list(client: httpx.AsyncClient, state: LoadState, rng: random.Random):
+    params = {"limit": 20}
+    if rng.random() < 0.5:
+        params["category"] = rng.choice(CATEGORIES)
+    return await client.get(f"{API}/products/", params=params)
+
+async def product_get(client: httpx.AsyncClient, state: LoadState, rng: random.Random):
+    return await client.get(f"{API}/products/{rng.choice(state.product_ids)}")
+
+async def products_search(client: httpx.AsyncClient, state: LoadState, rng: random.Random):
+    return await client.get(f"{API}/products/search", params={"q": rng.choice(WORDS)[:rng.randint(3, 5)]})
+
+async def product_create(client: httpx.AsyncClient, state: LoadState, rng: random.Random):
+    return await client.post(f"{API}/products/", json=_product_payload(rng))
+
+async def cart_get(client: httpx.AsyncClient, state: LoadState, rng: random.Random):
+    return await client.get(f"{API}/cart/", headers=_auth(rng.choice(state.users)))
+
+async def cart_add(client: httpx.AsyncClient, state: LoadState, rng: random.Random):
+    item = {"product_id": rng.choice(state.product_ids), "quantity": rng.randint(1, 3)}
+    return await client.post(f"{API}/cart/", json=item, headers=_auth(rng.choice(state.users)))
+
+async def cart_replace(client: httpx.AsyncClient, state: LoadState, rng: random.Random):
+    # replace=True mantiene acotado el tamaño de los carritos durante la prueba
+    items = [
+        {"product_id": product_id, "quantity": rng.randint(1, 3)}
+        for product_id in rng.sample(state.product_ids, 5)
+    ]
+    return await client.put(
+        f"{API}/cart/", json={"items": items, "replace": True}, headers=_auth(rng.choice(state.users))
+    )
+
+async def auth_login(client: httpx.AsyncClient, state: LoadState, rng: random.Random):
+    user = rng.choice(state.users)
+    return await client.post(f"{API}/auth/login", data={"username": user["email"], "password": user["password"]})
+
+SCENARIOS: Dict[str, Callable] = {
+    "GET /products": products_list,
+    "GET /products/{id}": product_get,
+    "GET /products/search": products_search,
+    "POST /products": product_create,
+    "GET /cart": cart_get,
+    "POST /cart": cart_add,
+    "PUT /cart": cart_replace,
+    "POST /auth/login": auth_login,
+}
+
+# Peso relativo de cada escenario en cada tipo de carga
+WORKLOADS: Dict[str, Dict[str, int]] = {
+    "read": {
+        "GET /products": 40, "GET /products/{id}": 25, "GET /products/search": 15, "GET /cart": 20,
+    },
+    "mixed": {
+        "GET /products": 30, "GET /products/{id}": 20, "GET /products/search": 10, "GET /cart": 20,
+        "POST /cart": 10, "PUT /cart": 5, "POST /products": 3, "POST /auth/login": 2,
+    },
+    "write": {
+        "POST /cart": 40, "PUT /cart": 30, "POST /products": 20, "POST /auth/login": 10,
+    },
+}
+
+def _product_payload(rng: random.Random) -> Dict:
+    words = rng.sample(WORDS, 2)
+    return {
+        "name": f"{words[0].title()} {words[1]} burger",
+        "description": " ".join(rng.sample(WORDS, 4)),
+        "price": round(rng.uniform(2, 20), 2),
+        "category": rng.choice(CATEGORIES),
+        "ingredients": ", ".join(rng.sample(WORDS, 3)),
+    }
+
+async def seed(client: httpx.AsyncClient, products: int, users: int) -> LoadState:
+    """Crea productos y usuarios a través de la propia API"""
+    state = LoadState()
+    rng = random.Random(0)
+    for _ in range(products):
+        response = await client.post(f"{API}/products/", json=_product_payload(rng))
+        response.raise_for_status()
+        state.product_ids.append(response.json()["id"])
+
+    async def register(index: int):
+        user = {"email": f"load{index}@example.com", "password": f"secreto-{index}", "full_name": f"Load {index}"}
+        (await client.post(f"{API}/auth/register", json=user)).raise_for_status()
+        response = await client.post(f"{API}/auth/login", data={"username": user["email"], "password": user["password"]})
+        response.raise_for_status()
+        user["token"] = response.json()["access_token"]
+        state.users.append(user)
+
+    await asyncio.gather(*(register(index) for index in range(users)))
+    return state
+
+async def drive(
+    client: httpx.AsyncClient,
+    state: LoadState,
+    weights: Dict[str, int],
+    concurrency: int,
+    warmup: float,
+    duration: float
+) -> Dict[str, Dict]:
+    """Lanza `concurrency` clientes en bucle cerrado; solo se registra lo que acaba dentro de la ventana"""
+    names = list(weights)
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    deadline = measure_from + duration
+
+    async def worker(seed: int):
+        rng = random.Random(seed)
+        while loop.time() < deadline:
+            name = rng.choices(names, weights=[weights[n] for n in names])[0]
+            start = loop.time()
+            try:
+                response = await SCENARIOS[name](client, state, rng)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            end = loop.time()
+            if start < measure_from or end > deadline:
+                continue
+            if failed:
+                errors[name] += 1
+            else:
+                latencies[name].append((end - start) * 1000)
+
+    await asyncio.gather(*(worker(seed) for seed in range(concurrency)))
+    return {
+        name: {
+            "requests": len(latencies[name]),
+            "errors": errors[name],
+            "rps": len(latencies[name]) / duration,
+            "p50_ms": percentile(latencies[name], 50),
+            "p99_ms": percentile(latencies[name], 99),
+            "max_ms": max(latencies[name], default=0.0),
+        }
+        for name in names
+    }
+
+async def run_asgi(app, args) -> Dict[str, Dict]:
+    # ASGITransport no ejecuta los eventos de arranque: se lanzan a mano
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            state = await seed(client, args.products, args.users)
+            return await drive(client, state, WORKLOADS[args.workload], args.concurrency, args.warmup, args.duration)
+    finally:
+        await app.router.shutdown()
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def run_uvicorn(app, args) -> Dict[str, Dict]:
+    import uvicorn
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    # El servidor tiene su propio hilo y event loop; el generador de carga usa este
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        await asyncio.sleep(0.01)
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+            state = await seed(client, args.products, args.users)
+            return await drive(client, state, WORKLOADS[args.workload], args.concurrency, args.warmup, args.duration)
+    finally:
+        server.should_exit = True
+        thread.join()
+
+def report(results: Dict[str, Dict], baseline: Dict = None):
+    print(f"{'endpoint':<22} {'reqs':>7} {'err':>5} {'rps':>9} {'p50':>9} {'p99':>9} {'max':>9}")
+    for name, row in results.items():
+        line = (
+            f"{name:<22} {row['requests']:>7} {row['errors']:>5} {row['rps']:>9.1f} "
+            f"{row['p50_ms']:>7.2f}ms {row['p99_ms']:>7.2f}ms {row['max_ms']:>7.2f}ms"
+        )
+        previous = (baseline or {}).get(name)
+        if previous:
+            line += f"   (base rps {previous['rps']:.1f}, p99 {previous['p99_ms']:.2f}ms)"
+        print(line)
+    total = sum(row["rps"] for row in results.values())
+    print(f"{'total':<22} {sum(r['requests'] for r in results.values()):>7} "
+          f"{sum(r['errors'] for r in results.values()):>5} {total:>9.1f}")
+
+def regressions(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    found = []
+    for name, row in results.items():
+        previous = baseline.get(name)
+        if not previous or not previous["requests"]:
+            continue
+        if row["p99_ms"] > previous["p99_ms"] * (1 + tolerance):
+            found.append(f"{name}: p99 {previous['p99_ms']:.2f}ms -> {row['p99_ms']:.2f}ms")
+        if row["rps"] < previous["rps"] * (1 - tolerance):
+            found.append(f"{name}: rps {previous['rps']:.1f} -> {row['rps']:.1f}")
+        if row["errors"] > previous["errors"]:
+            found.append(f"{name}: errores {previous['errors']} -> {row['errors']}")
+    return found
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="mixed")
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--products", type=int, default=200)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--hash-rounds", type=int, help="coste de bcrypt; por defecto, el de la configuración")
+    parser.add_argument("--aws-latency-ms", type=float, default=2.0)
+    parser.add_argument("--save", help="guarda los resultados como línea base (JSON)")
+    parser.add_argument("--compare", help="línea base (JSON) con la que comparar")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.hash_rounds is not None:
+        os.environ["PASSWORD_HASH_ROUNDS"] = str(args.hash_rounds)
+    # La configuración se lee al importar la aplicación
+    from app.utils.aws_client import aws_client_registry
+    from benchmarks.stubs import build_stub_client
+    import main as app_main
+
+    aws_client_registry.install(build_stub_client(args.aws_latency_ms / 1000))
+    runner = run_uvicorn if args.transport == "uvicorn" else run_asgi
+    results = asyncio.run(runner(app_main.app, args))
+
+    config = {key: value for key, value in vars(args).items() if key not in ("save", "compare", "tolerance")}
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            saved = json.load(handle)
+        baseline = saved["results"]
+        changed = sorted(key for key, value in config.items() if saved["config"].get(key) != value)
+        if changed:
+            print(f"aviso: la línea base se tomó con otra configuración ({', '.join(changed)})")
+    print(f"carga={args.workload} transporte={args.transport} concurrencia={args.concurrency} "
+          f"duración={args.duration:.0f}s latencia AWS={args.aws_latency_ms:.1f}ms")
+    report(results, baseline)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        meta = {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+        with open(args.save, "w") as handle:
+            json.dump({"config": config, "meta": meta, "results": results}, handle, indent=2, sort_keys=True)
+        print(f"línea base guardada en {args.save}")
+
+    if baseline is not None:
+        found = regressions(results, baseline, args.tolerance)
+        for line in found:
+            print(f"REGRESIÓN {line}")
+        if found:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""Mide el retraso del event loop mientras AWS responde lentamente.
+
+Uso: python -m benchmarks.bench_aws_event_loop [--latency 0.2] [--requests 50]
+"""
+import argparse
+import asyncio
+import time
+from benchmarks.common import LagMonitor, format_lag
+from benchmarks.stubs import build_stub_client
+
+async def run_scenario(name: str, call, requests: int):
+    async with LagMonitor() as lag:
+        start = time.perf_counter()
+        await asyncio.gather(*(call() for _ in range(requests)))
+        elapsed = time.perf_counter() - start
+    print(f"{name:<10} total={elapsed:6.2f}s  {format_lag(lag.samples)}")
+
+async def main(latency: float, requests: int):
+    client = build_stub_client(latency)
+
+    async def blocking_call():
+        # Comportamiento anterior: boto3 llamado directamente dentro del coroutine
+        client.products_table.scan()
+
+    async def adapter_call():
+        await client.get_all_products()
+
+    print(f"Latencia AWS simulada: {latency * 1000:.0f}ms, peticiones concurrentes: {requests}")
+    await run_scenario("bloqueante", blocking_call, requests)
+    await run_scenario("adaptador", adapter_call, requests)
+    client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.requests))
\ No newline at end of file
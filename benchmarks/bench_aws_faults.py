@@ -0,0 +1,163 @@
+"""La API con AWS en línea, caído, intermitente o limitando peticiones.
+
+Cada escenario se ejecuta en un proceso nuevo con AWS_BACKEND=memory: se siembran datos con
+AWS disponible, se inyecta el fallo y se lanza la carga mixta de bench_api_load. Después se
+retira el fallo y se mide cuánto tarda SyncManager en vaciar las operaciones pendientes.
+
+El circuit breaker y la sonda usan tiempos cortos (--reset-timeout, --probe-interval) para que
+los cambios de estado se vean en pocos segundos.
+
+Uso: python -m benchmarks.bench_aws_faults [--scenarios online,offline,flapping,throttled] [--duration 8]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+# Fallos inyectados en cada escenario, una vez sembrados los datos
+SCENARIOS: Dict[str, Dict] = {
+    "online": {},
+    "offline": {"outage": True},
+    "flapping": {"flap": (2.0, 2.0)},
+    "throttled": {"throttle_rate": 0.2},
+}
+
+def run_scenario(args) -> Dict:
+    """Se ejecuta en el proceso hijo: la configuración se fija antes de importar la aplicación"""
+    import benchmarks.bench_api_load as load  # fija la base de datos temporal
+
+    os.environ.update({
+        "AWS_BACKEND": "memory",
+        "FAKE_AWS_LATENCY_SECONDS": str(args.aws_latency_ms / 1000),
+        "CIRCUIT_BREAKER_RESET_TIMEOUT_SECONDS": str(args.reset_timeout),
+        "CONNECTIVITY_PROBE_INTERVAL_SECONDS": str(args.probe_interval),
+        "SYNC_INTERVAL_SECONDS": str(args.probe_interval),
+        "PASSWORD_HASH_ROUNDS": str(args.hash_rounds),
+    })
+    import asyncio
+    import time
+    import httpx
+    import main as app_main
+    from app.core.connectivity import CircuitState, connectivity_monitor
+    from app.core.sync_manager import sync_manager
+    from app.utils.aws_client import get_aws_client
+
+    faults = get_aws_client().backend.faults
+
+    async def sample_circuit(samples: List[str], stop: asyncio.Event):
+        while not stop.is_set():
+            samples.append(connectivity_monitor.state)
+            await asyncio.sleep(0.05)
+
+    async def drain_pending(timeout: float) -> float:
+        start = time.perf_counter()
+        while sync_manager.local_db.get_pending_operations(limit=1):
+            if time.perf_counter() - start > timeout:
+                break
+            if connectivity_monitor.is_online():
+                await sync_manager.sync_data()
+            else:
+                await asyncio.sleep(0.05)
+        return time.perf_counter() - start
+
+    async def run() -> Dict:
+        await app_main.app.router.startup()
+        try:
+            transport = httpx.ASGITransport(app=app_main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                state = await load.seed(client, args.products, args.users)
+
+                injected = SCENARIOS[args.run]
+                if "flap" in injected:
+                    faults.flap(*injected["flap"])
+                faults.outage = injected.get("outage", False)
+                faults.throttle_rate = injected.get("throttle_rate", 0.0)
+                calls_before = dict(faults.stats)
+
+                samples: List[str] = []
+                stop = asyncio.Event()
+                sampler = asyncio.create_task(sample_circuit(samples, stop))
+                results = await load.drive(
+                    client, state, load.WORKLOADS["mixed"], args.concurrency, args.warmup, args.duration
+                )
+                stop.set()
+                await sampler
+
+                faults.set_outage(False)
+                faults.throttle_rate = 0.0
+                pending = len(sync_manager.local_db.get_pending_operations())
+                drain_seconds = await drain_pending(args.drain_timeout)
+                remaining = len(sync_manager.local_db.get_pending_operations())
+        finally:
+            await app_main.app.router.shutdown()
+
+        return {
+            "results": results,
+            "circuit_open": sum(1 for s in samples if s == CircuitState.OPEN) / max(len(samples), 1),
+            "aws_calls": faults.stats["calls"] - calls_before["calls"],
+            "injected_failures": (
+                faults.stats["outage_errors"] - calls_before["outage_errors"]
+                + faults.stats["throttled"] - calls_before["throttled"]
+            ),
+            "pending": pending,
+            "drain_seconds": drain_seconds,
+            "remaining": remaining,
+        }
+
+    return asyncio.run(run())
+
+def summarize(name: str, outcome: Dict, duration: float) -> str:
+    rows = outcome["results"].values()
+    ok = sum(row["requests"] for row in rows)
+    errors = sum(row["errors"] for row in rows)
+    # Latencias del endpoint más lento; el desglose completo sale con --details
+    p50 = max((row["p50_ms"] for row in rows), default=0.0)
+    p99 = max((row["p99_ms"] for row in rows), default=0.0)
+    return (
+        f"{name:<10} {ok / duration:>7.1f} {errors:>5} {p50:>8.1f}ms {p99:>8.1f}ms "
+        f"{outcome['circuit_open'] * 100:>8.0f}% {outcome['aws_calls']:>7} {outcome['injected_failures']:>7} "
+        f"{outcome['pending']:>6} {outcome['drain_seconds']:>7.2f}s {outcome['remaining']:>6}"
+    )
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--duration", type=float, default=8.0)
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--aws-latency-ms", type=float, default=5.0)
+    parser.add_argument("--reset-timeout", type=float, default=1.0)
+    parser.add_argument("--probe-interval", type=float, default=0.5)
+    parser.add_argument("--drain-timeout", type=float, default=30.0)
+    # bcrypt no es lo que se mide aquí: coste bajo para que no domine la carga
+    parser.add_argument("--hash-rounds", type=int, default=4)
+    parser.add_argument("--details", action="store_true", help="muestra también el desglose por endpoint")
+    parser.add_argument("--run", choices=sorted(SCENARIOS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_scenario(args)))
+        return
+
+    forwarded = [arg for arg in sys.argv[1:] if arg != "--details"]
+    print(f"carga mixta, concurrencia={args.concurrency} duración={args.duration:.0f}s "
+          f"latencia AWS={args.aws_latency_ms:.1f}ms")
+    print(f"{'escenario':<10} {'ok/s':>7} {'err':>5} {'p50 peor':>10} {'p99 peor':>10} "
+          f"{'circuito':>9} {'AWS':>7} {'fallos':>7} {'cola':>6} {'drenado':>8} {'resto':>6}")
+    for name in args.scenarios.split(","):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_aws_faults", *forwarded, "--run", name],
+            capture_output=True, text=True, check=True
+        ).stdout
+        outcome = json.loads(output.strip().splitlines()[-1])
+        print(summarize(name, outcome, args.duration))
+        if args.details:
+            from benchmarks.bench_api_load import report
+            report(outcome["results"])
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,53 @@
+"""Restaurar un carrito: un add_to_cart por item frente a un único bulk_update_cart.
+
+Uso: python -m benchmarks.bench_cart_bulk [--items 10,100,500]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+# Base de datos temporal para no tocar la del proyecto
+_db_dir = tempfile.mkdtemp(prefix="bench_cart_bulk_")
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{_db_dir}/bench.db"
+
+from app.db.init_db import init_db
+from app.db.repositories.cart import CartRepository
+from app.db.session import SessionLocal, engine
+from app.schemas.cart import CartItemCreate, CartItemInDB
+
+async def one_by_one(user_id: str, entries):
+    db = SessionLocal()
+    repo = CartRepository(db)
+    for entry in entries:
+        await repo.add_to_cart(user_id, entry)
+    db.close()
+
+async def bulk(user_id: str, entries):
+    db = SessionLocal()
+    now = datetime.utcnow()
+    items = [
+        CartItemInDB.construct(id=str(uuid.uuid4()), user_id=user_id, created_at=now, **entry.dict())
+        for entry in entries
+    ]
+    await CartRepository(db).bulk_update_cart(user_id, items)
+    db.close()
+
+async def main(sizes):
+    init_db(engine)
+    for size in sizes:
+        entries = [CartItemCreate(product_id=f"product-{i}", quantity=1 + i % 3) for i in range(size)]
+        for label, restore in (("uno a uno", one_by_one), ("bulk", bulk)):
+            start = time.perf_counter()
+            await restore(f"{label}-{size}", entries)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"items={size:<5} {label:<10} {elapsed:9.2f}ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", default="10,100,500")
+    args = parser.parse_args()
+    asyncio.run(main([int(n) for n in args.items.split(",")]))
\ No newline at end of file
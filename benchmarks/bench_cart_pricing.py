@@ -0,0 +1,82 @@
+"""Carrito con precios: carga perezosa (una consulta por producto) frente a joinedload.
+
+Uso: python -m benchmarks.bench_cart_pricing [--items 10,100,1000] [--repeat 20]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+# Base de datos temporal para no tocar la del proyecto
+_db_dir = tempfile.mkdtemp(prefix="bench_cart_")
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{_db_dir}/bench.db"
+
+from sqlalchemy import event
+from app.db.init_db import init_db
+from app.db.models.cart import CartItem
+from app.db.models.product import Product
+from app.db.repositories.cart import CartRepository
+from app.db.session import SessionLocal, engine
+from app.services.cart_service import price_cart
+
+def seed(user_id: str, items: int):
+    db = SessionLocal()
+    products = [Product(name=f"Burger {i}", price=5.49 + i % 10, is_available=True) for i in range(items)]
+    db.add_all(products)
+    db.flush()
+    db.add_all(CartItem(user_id=user_id, product_id=p.id, quantity=1 + i % 3) for i, p in enumerate(products))
+    db.commit()
+    db.close()
+
+def lazy_cart(user_id: str):
+    # Lo que ocurría antes: filas sueltas y una consulta por cada item.product
+    db = SessionLocal()
+    rows = db.query(CartItem).filter(CartItem.user_id == user_id).all()
+    cart = price_cart((row, row.product) for row in rows)
+    db.close()
+    return cart
+
+async def eager_cart(user_id: str):
+    db = SessionLocal()
+    rows = await CartRepository(db).get_cart_items(user_id)
+    cart = price_cart((row, row.product) for row in rows)
+    db.close()
+    return cart
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", default="10,100,1000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    init_db(engine)
+
+    queries = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_queries(*_):
+        nonlocal queries
+        queries += 1
+
+    for size in (int(n) for n in args.items.split(",")):
+        user_id = f"user-{size}"
+        seed(user_id, size)
+        results = {}
+        for label, build in (
+            ("lazy", lambda: lazy_cart(user_id)),
+            ("joinedload", lambda: asyncio.run(eager_cart(user_id))),
+        ):
+            queries = 0
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                cart = build()
+            elapsed = (time.perf_counter() - start) / args.repeat * 1000
+            results[label] = cart.subtotal
+            print(
+                f"items={size:<5} {label:<11} {elapsed:8.2f}ms  "
+                f"consultas={queries // args.repeat:<5} subtotal={cart.subtotal}"
+            )
+        assert results["lazy"] == results["joinedload"]
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""Compara el rendimiento de DB_ACCESS_MODE "sync" y "threadpool".
+
+Uso: python -m benchmarks.bench_db_access [--clients 20] [--ops 50] [--write-ratio 0.2]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+# Base de datos temporal para no tocar la del proyecto
+_db_dir = tempfile.mkdtemp(prefix="bench_db_")
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{_db_dir}/bench.db"
+
+from app.db.session import Base, SessionLocal, engine, session_runner
+from app.db.repositories.product import ProductRepository
+from app.schemas.product import ProductCreate
+from benchmarks.common import LagMonitor, format_lag
+
+def seed(products: int):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    repo = ProductRepository(db)
+    session_runner.mode = "sync"
+    for i in range(products):
+        asyncio.run(repo.create_product(ProductCreate(name=f"Burger {i}", price=5 + i % 10)))
+    db.close()
+
+async def client(ops: int, write_ratio: float):
+    for i in range(ops):
+        db = SessionLocal()
+        try:
+            repo = ProductRepository(db)
+            if random.random() < write_ratio:
+                await repo.create_product(ProductCreate(name=f"Nueva {i}", price=9.99))
+            else:
+                await repo.get_all_products()
+        finally:
+            await session_runner.run(db.close)
+
+async def run_mode(mode: str, clients: int, ops: int, write_ratio: float):
+    session_runner.mode = mode
+    async with LagMonitor() as lag:
+        start = time.perf_counter()
+        await asyncio.gather(*(client(ops, write_ratio) for _ in range(clients)))
+        elapsed = time.perf_counter() - start
+    total = clients * ops
+    print(f"{mode:<10} {total / elapsed:8.1f} ops/s  total={elapsed:6.2f}s  {format_lag(lag.samples)}")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--ops", type=int, default=50)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--products", type=int, default=200)
+    args = parser.parse_args()
+
+    seed(args.products)
+    print(f"Clientes: {args.clients}, operaciones por cliente: {args.ops}, escrituras: {args.write_ratio:.0%}")
+    for mode in session_runner.MODES:
+        asyncio.run(run_mode(mode, args.clients, args.ops, args.write_ratio))
+    session_runner.shutdown()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
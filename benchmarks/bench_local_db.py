@@ -0,0 +1,72 @@
+"""Micro-benchmark de LocalDB: perfil "default" sin índices frente a "performance".
+
+Uso: python -m benchmarks.bench_local_db [--rows 100000]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from app.db.local_db import LocalDB
+
+def load_rows(db: LocalDB, rows: int, users: int, products: int):
+    """Carga masiva de tablas de 'rows' filas para los benchmarks de lectura"""
+    with db.conn:
+        db.conn.executemany(
+            'INSERT INTO products (id, name, price) VALUES (?, ?, ?)',
+            [(f"product-{i}", f"Burger {i}", 9.99) for i in range(products)]
+        )
+        db.conn.executemany(
+            'INSERT INTO cart_items (id, user_id, product_id, quantity) VALUES (?, ?, ?, ?)',
+            [(f"item-{i}", f"user-{i % users}", f"product-{i % products}", 1) for i in range(rows)]
+        )
+        db.conn.executemany(
+            'INSERT INTO pending_operations (id, type, data, item_id, created_at) VALUES (?, ?, ?, ?, ?)',
+            [
+                (f"op-{i}", 'remove_cart_item', None, f"item-{i}", f"2024-01-01 00:{i // 6000 % 60:02d}:{i % 60:02d}.{i:06d}")
+                for i in range(rows)
+            ]
+        )
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def run(profile: str, indexes: bool, rows: int, inserts: int):
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_local_"), "local.db")
+    db = LocalDB(path, profile)
+    if not indexes:
+        db.conn.execute('DROP INDEX idx_pending_operations_created_at')
+        db.conn.execute('DROP INDEX idx_cart_items_user_id')
+
+    start = time.perf_counter()
+    for i in range(inserts):
+        db.add_pending_operation({'id': f"new-{i}", 'type': 'remove_cart_item', 'item_id': f"item-{i}"})
+    insert_rate = inserts / (time.perf_counter() - start)
+
+    users = rows // 10
+    load_rows(db, rows, users, 1000)
+    cart_ms = timed(lambda: db.get_cart_items(f"user-{random.randrange(users)}"), 200)
+    queue_ms = timed(lambda: db.get_pending_operations(limit=100), 50)
+
+    label = f"{profile}{'' if indexes else ' sin índices'}"
+    print(
+        f"{label:<20} inserciones={insert_rate:9.1f}/s  "
+        f"get_cart_items={cart_ms:7.3f}ms  get_pending_operations(100)={queue_ms:7.3f}ms"
+    )
+    db.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--inserts", type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"Filas por tabla: {args.rows}, inserciones con commit individual: {args.inserts}")
+    run("default", False, args.rows, args.inserts)
+    run("performance", True, args.rows, args.inserts)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""Throughput de encolado offline según la durabilidad de la cola.
+
+Uso: python -m benchmarks.bench_outbox [--writers 50] [--ops 100]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from app.core.config import settings
+from app.db.local_db import LocalDB
+from app.db.outbox import Outbox
+
+async def writer(outbox: Outbox, writer_id: int, ops: int):
+    for i in range(ops):
+        await outbox.put({
+            'type': 'update_cart_item',
+            'data': {'id': f"item-{writer_id}-{i}", 'user_id': f"user-{writer_id}", 'quantity': i}
+        })
+
+async def run(profile: str, durability: str, writers: int, ops: int, interval: float):
+    db = LocalDB(os.path.join(tempfile.mkdtemp(prefix="bench_outbox_"), "local.db"), profile)
+    outbox = Outbox(db, durability=durability, flush_interval=interval)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(writer(outbox, w, ops) for w in range(writers)))
+    outbox.flush()
+    elapsed = time.perf_counter() - start
+
+    total = writers * ops
+    stored = len(db.get_pending_operations())
+    print(f"{profile:<12} {durability:<6} {total / elapsed:10.1f} ops/s  guardadas={stored}")
+    db.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=50)
+    parser.add_argument("--ops", type=int, default=100)
+    parser.add_argument("--interval", type=float, default=settings.OUTBOX_FLUSH_INTERVAL_SECONDS)
+    args = parser.parse_args()
+
+    print(f"Escritores concurrentes: {args.writers}, operaciones por escritor: {args.ops}")
+    for profile in ("default", "performance"):
+        for durability in Outbox.DURABILITY_MODES:
+            asyncio.run(run(profile, durability, args.writers, args.ops, args.interval))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
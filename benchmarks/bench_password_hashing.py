@@ -0,0 +1,60 @@
+"""Rendimiento de login: bcrypt en el event loop frente a PasswordHasher con hilos o procesos.
+
+Cada "login" es un verify_and_update de bcrypt; se lanzan --logins a la vez y se mide
+el throughput y el retraso que sufre el event loop mientras tanto.
+
+Uso: python -m benchmarks.bench_password_hashing [--logins 64] [--rounds 10] [--workers 1,2,4]
+"""
+import argparse
+import asyncio
+import os
+import time
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--workers", default=f"1,2,4,{os.cpu_count()}")
+    return parser.parse_args()
+
+async def run_inline(hashed: str, logins: int):
+    from app.core.security import verify_and_update_password
+
+    async def login():
+        # Lo que hacía authenticate_user: bcrypt directamente en el handler
+        verify_and_update_password("secreto", hashed)
+        await asyncio.sleep(0)
+
+    await run("en el loop", [login() for _ in range(logins)])
+
+async def run_pool(hashed: str, logins: int, mode: str, workers: int):
+    from app.core.security import PasswordHasher
+    hasher = PasswordHasher(mode, workers)
+    # Arranque del pool fuera de la medición
+    await hasher.verify_and_update("secreto", hashed)
+    await run(f"{mode} x{workers}", [hasher.verify_and_update("secreto", hashed) for _ in range(logins)])
+    hasher.shutdown()
+
+async def run(label: str, logins):
+    from benchmarks.common import LagMonitor, format_lag
+    async with LagMonitor() as lag:
+        start = time.perf_counter()
+        await asyncio.gather(*logins)
+        elapsed = time.perf_counter() - start
+    print(f"{label:<14} {len(logins) / elapsed:8.1f} logins/s  {format_lag(lag.samples)}")
+
+def main():
+    args = parse_args()
+    # El coste se fija antes de importar la configuración
+    os.environ["PASSWORD_HASH_ROUNDS"] = str(args.rounds)
+    from app.core.security import get_password_hash
+
+    hashed = get_password_hash("secreto")
+    print(f"bcrypt rounds={args.rounds}  logins concurrentes={args.logins}  núcleos={os.cpu_count()}")
+    asyncio.run(run_inline(hashed, args.logins))
+    for mode in ("thread", "process"):
+        for workers in sorted({int(w) for w in args.workers.split(",")}):
+            asyncio.run(run_pool(hashed, args.logins, mode, workers))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""Benchmark de GET /products/search: índice FTS5 frente a LIKE sobre un catálogo grande.
+
+Uso: python -m benchmarks.bench_product_search [--products 50000] [--queries 500]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.db.init_db import init_db
+from app.db.repositories.product import ProductRepository
+from app.schemas.product import ProductCreate
+from benchmarks.common import percentile
+
+WORDS = [
+    "doble", "queso", "bacon", "pollo", "crujiente", "vegana", "picante", "barbacoa", "cebolla",
+    "pepinillo", "lechuga", "tomate", "cheddar", "jalapeño", "aguacate", "champiñones", "trufa",
+    "clásica", "ahumada", "especial", "mostaza", "ketchup", "brioche", "costilla", "ternera",
+]
+SYLLABLES = [consonant + vowel for consonant in "bcdfglmnprstvz" for vowel in "aeiou"]
+
+def vocabulary(size: int, rng: random.Random):
+    """Palabras reales más palabras sintéticas hasta `size`, como en una carta con muchas referencias"""
+    words = list(WORDS)
+    while len(words) < size:
+        words.append("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return words
+
+def load_products(engine, products: int, words):
+    """Carga masiva a través de los triggers, como haría create_product fila a fila"""
+    rng = random.Random(1)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO products (id, name, description, price, category, ingredients, is_available) "
+                "VALUES (:id, :name, :description, :price, :category, :ingredients, 1)"
+            ),
+            [
+                {
+                    'id': f"product-{i}",
+                    'name': f"Burger {' '.join(rng.sample(words, 2))} {i}",
+                    'description': " ".join(rng.sample(words, 8)),
+                    'price': 9.99,
+                    'category': rng.choice(["burgers", "sides", "drinks"]),
+                    'ingredients': ", ".join(rng.sample(words, 5)),
+                }
+                for i in range(products)
+            ]
+        )
+
+def like_search(session, query: str, limit: int):
+    pattern = f"%{query}%"
+    return session.execute(
+        text(
+            "SELECT * FROM products WHERE is_available = 1 AND "
+            "(name LIKE :p OR description LIKE :p OR ingredients LIKE :p) ORDER BY name LIMIT :limit"
+        ),
+        {'p': pattern, 'limit': limit}
+    ).fetchall()
+
+async def main(products: int, vocabulary_size: int, queries: int, limit: int):
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_search_"), "products.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    init_db(engine)
+
+    words = vocabulary(vocabulary_size, random.Random(2))
+    # Consultas de autocompletado: prefijos de una o dos palabras del vocabulario
+    rng = random.Random(3)
+    samples = [
+        " ".join(word[:rng.randint(3, len(word))] for word in rng.sample(words, rng.randint(1, 2)))
+        for _ in range(queries)
+    ]
+
+    start = time.perf_counter()
+    load_products(engine, products, words)
+    print(f"carga de {products} productos (índice incluido): {time.perf_counter() - start:.2f}s")
+
+    session = sessionmaker(bind=engine)()
+    repo = ProductRepository(session)
+
+    for label, search in (
+        ("fts5", lambda q: repo.search_products(q, limit)),
+        ("like", lambda q: like_search(session, q, limit)),
+    ):
+        latencies = []
+        for i in range(queries):
+            query = samples[i]
+            start = time.perf_counter()
+            result = search(query)
+            if asyncio.iscoroutine(result):
+                await result
+            latencies.append((time.perf_counter() - start) * 1000)
+        print(
+            f"{label:<5} p50={percentile(latencies, 50):8.3f}ms  "
+            f"p99={percentile(latencies, 99):8.3f}ms  max={max(latencies):8.3f}ms"
+        )
+
+    # Actualización incremental: un producto nuevo aparece en la siguiente búsqueda
+    start = time.perf_counter()
+    await repo.create_product(ProductCreate(
+        name="Burger zanahoria morada", description="Edición limitada", price=11.5,
+        category="burgers", ingredients="zanahoria"
+    ))
+    insert_ms = (time.perf_counter() - start) * 1000
+    found = await repo.search_products("zanaho", limit)
+    print(f"create_product + índice: {insert_ms:.3f}ms  encontrado={bool(found)}")
+    session.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--vocabulary", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.products, args.vocabulary, args.queries, args.limit))
\ No newline at end of file
@@ -0,0 +1,90 @@
+"""Benchmark de la ruta de respuesta del catálogo con un menú de 1.000 productos.
+
+Compara, en peticiones por segundo a través de ASGI:
+  - response_model: FastAPI revalida list[Product] y usa jsonable_encoder + json estándar
+  - fast:           FastJSONResponse serializa los modelos una vez, sin revalidar
+  - bytes:          cuerpo ya serializado y cacheado, como hace list_products_json
+
+y el coste de construir los productos a partir de los items de DynamoDB.
+
+Uso: python -m benchmarks.bench_serialization [--products 1000] [--requests 300]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from typing import List
+import httpx
+from fastapi import FastAPI
+from app.schemas.product import Product
+from app.utils.aws_client import product_from_item, to_dynamodb_item
+from app.utils.serialization import FastJSONResponse, dumps, orjson
+
+def build_items(products: int) -> List[dict]:
+    """Items tal y como los devuelve DynamoDB (Decimal y fechas ISO)"""
+    return [
+        to_dynamodb_item({
+            'id': f"product-{i}",
+            'name': f"Burger {i}",
+            'description': "Carne de ternera, queso cheddar y pan brioche",
+            'price': 9.99 + i % 7,
+            'image_url': f"https://cdn.example.com/products/{i}.jpg",
+            'category': "burgers" if i % 3 else "sides",
+            'ingredients': "ternera, cheddar, lechuga, tomate",
+            'is_available': True,
+            'created_at': datetime(2024, 1, 1, 12, 0, i % 60),
+        })
+        for i in range(products)
+    ]
+
+def build_app(products: List[Product]) -> FastAPI:
+    app = FastAPI()
+    body = dumps(products)
+
+    @app.get("/response_model", response_model=list[Product])
+    async def with_response_model():
+        return products
+
+    @app.get("/fast", response_model=list[Product])
+    async def with_fast_response():
+        return FastJSONResponse(products)
+
+    @app.get("/bytes", response_model=list[Product])
+    async def with_cached_bytes():
+        return FastJSONResponse(body)
+
+    return app
+
+def timed(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat * 1000
+
+async def main(products: int, requests: int):
+    items = build_items(products)
+    print(f"codificador: {'orjson' if orjson is not None else 'json'}  productos: {products}")
+    print(f"Product(**item)        {timed(lambda: [Product(**item) for item in items], 20):8.2f}ms por catálogo")
+    print(f"product_from_item      {timed(lambda: [product_from_item(item) for item in items], 20):8.2f}ms por catálogo")
+
+    catalog = [product_from_item(item) for item in items]
+    transport = httpx.ASGITransport(app=build_app(catalog))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        reference = None
+        for path in ("/response_model", "/fast", "/bytes"):
+            await client.get(path)
+            start = time.perf_counter()
+            for _ in range(requests):
+                response = await client.get(path)
+            elapsed = time.perf_counter() - start
+            # Las tres rutas deben devolver el mismo JSON
+            reference = reference or response.json()
+            assert response.json() == reference, path
+            print(f"{path:<16} {requests / elapsed:8.1f} req/s  {elapsed / requests * 1000:7.2f}ms/req  {len(response.content)} bytes")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+    asyncio.run(main(args.products, args.requests))
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""Tiempo de arranque en frío: importar main y atender la primera petición.
+
+Cada medida se toma en un proceso nuevo (como un worker recién lanzado), contra una base
+de datos temporal ya preparada con python -m app.db.bootstrap.
+
+Uso: python -m benchmarks.bench_startup [--runs 5]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from benchmarks.common import percentile
+
+PROBE = r'''
+import json, sys, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+heavy = sorted(name for name in ("boto3", "botocore.client") if name in sys.modules)
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    response = client.get("/api/v1/products/search", params={"q": "burger"})
+    first = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_request_ms": (first - start) * 1000,
+    "status": response.status_code,
+    "heavy_modules": heavy,
+}))
+'''
+
+def run_probe(env) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    env = dict(
+        os.environ,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{workdir}/app.db",
+        LOCAL_DB_PATH=f"{workdir}/local.db",
+        # Sin credenciales ni metadatos de EC2: la sonda de AWS falla rápido y en segundo plano
+        AWS_EC2_METADATA_DISABLED="true",
+        PYTHONPATH=os.getcwd(),
+    )
+    # Esquema preparado una vez, como en un despliegue
+    subprocess.run([sys.executable, "-m", "app.db.bootstrap"], env=env, check=False, capture_output=True)
+
+    samples = [run_probe(env) for _ in range(args.runs)]
+    imports = [sample["import_ms"] for sample in samples]
+    firsts = [sample["first_request_ms"] for sample in samples]
+    print(f"procesos: {args.runs}  módulos pesados tras importar main: {samples[-1]['heavy_modules'] or 'ninguno'}")
+    print(f"import main          p50={percentile(imports, 50):7.1f}ms  max={max(imports):7.1f}ms")
+    print(f"primera petición     p50={percentile(firsts, 50):7.1f}ms  max={max(firsts):7.1f}ms  (status {samples[-1]['status']})")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
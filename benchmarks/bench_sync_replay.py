@@ -0,0 +1,97 @@
+"""Compara el vaciado de la cola de operaciones pendientes: una a una vs. en lotes.
+
+Con --users igual a --operations cada usuario tiene una sola operación: es el caso en que los
+lotes tienen que juntar operaciones de particiones distintas.
+
+Uso: python -m benchmarks.bench_sync_replay [--operations 10000] [--latency 0.02] [--users 100]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from app.core.config import settings
+from app.core.sync_manager import SyncManager
+from benchmarks.stubs import build_stub_client
+
+def fill_backlog(manager: SyncManager, operations: int, updates_per_item: int = 0, users: int = 100):
+    """Cola con `operations` operaciones de `users` usuarios; cada item recibe `updates_per_item` actualizaciones"""
+    history = updates_per_item + 1
+    for i in range(operations):
+        item = i // history
+        user = f"user-{item % users}"
+        manager.local_db.add_pending_operation({
+            'id': f"op-{i:08d}",
+            'type': 'add_cart_item' if i % history == 0 else 'update_cart_item',
+            'data': {
+                'id': f"{user}_item-{item}",
+                'user_id': user,
+                'product_id': f"product-{item % 50}",
+                'quantity': 1 + i % history,
+                'created_at': '2024-01-01T00:00:00'
+            }
+        })
+
+async def drain_one_by_one(manager: SyncManager):
+    # Comportamiento anterior: una llamada a AWS y un DELETE con commit por operación
+    for operation in manager.local_db.get_pending_operations():
+        await manager._replay(operation)
+        manager.local_db.remove_pending_operation(operation['id'])
+
+async def drain_batched(manager: SyncManager):
+    await manager.sync_data()
+
+async def run(
+    name: str,
+    drain,
+    operations: int,
+    latency: float,
+    unprocessed_ratio: float,
+    updates_per_item: int,
+    users: int
+):
+    client = build_stub_client(latency, unprocessed_ratio)
+    manager = SyncManager(aws_client=client, local_db_path=os.path.join(tempfile.mkdtemp(), "bench_local.db"))
+    fill_backlog(manager, operations, updates_per_item, users)
+
+    start = time.perf_counter()
+    await drain(manager)
+    elapsed = time.perf_counter() - start
+
+    remaining = len(manager.local_db.get_pending_operations())
+    calls = client.backend.faults.stats['calls']
+    batches = client.backend.faults.calls_by_operation.get('batch_write_item', 0)
+    print(
+        f"{name:<12} {elapsed:8.2f}s  {operations / elapsed:9.1f} ops/s  "
+        f"llamadas AWS={calls:<6} lotes={batches:<6} pendientes={remaining}  "
+        f"compactación={manager.compaction_ratio:.2f}x"
+    )
+    await manager.stop()
+    client.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--operations", type=int, default=10000)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--unprocessed", type=float, default=0.01)
+    parser.add_argument("--updates-per-item", type=int, default=0)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=settings.SYNC_CONCURRENCY)
+    parser.add_argument("--skip-one-by-one", action="store_true")
+    args = parser.parse_args()
+
+    settings.SYNC_CONCURRENCY = args.concurrency
+    print(
+        f"Operaciones: {args.operations}, latencia AWS simulada: {args.latency * 1000:.0f}ms, "
+        f"particiones concurrentes: {args.concurrency}"
+    )
+    if not args.skip_one_by_one:
+        asyncio.run(run(
+            "una a una", drain_one_by_one, args.operations, args.latency, 0.0, args.updates_per_item, args.users
+        ))
+    asyncio.run(run(
+        "en lotes", drain_batched, args.operations, args.latency, args.unprocessed, args.updates_per_item, args.users
+    ))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""Utilidades compartidas por los benchmarks."""
+import asyncio
+import time
+from typing import List, Optional
+
+def percentile(values: List[float], pct: float) -> float:
+    """Percentil por rango más cercano sobre una lista ordenada o no"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def format_lag(samples: List[float]) -> str:
+    lags_ms = [lag * 1000 for lag in samples]
+    return (
+        f"lag p50={percentile(lags_ms, 50):7.2f}ms  "
+        f"p99={percentile(lags_ms, 99):7.2f}ms  max={max(lags_ms, default=0.0):7.2f}ms"
+    )
+
+class LagMonitor:
+    """Mide cuánto se retrasa un temporizador periódico del event loop"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._stop = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while not self._stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(time.perf_counter() - start - self.interval)
+
+    async def __aenter__(self):
+        self._task = asyncio.create_task(self._run())
+        await asyncio.sleep(self.interval * 5)
+        return self
+
+    async def __aexit__(self, *exc):
+        self._stop.set()
+        await self._task
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""Cliente AWS en memoria con latencia simulada para los benchmarks."""
+from app.utils.aws_client import AWSClient
+from app.utils.fake_aws import FaultInjector, InMemoryBackend
+
+def build_stub_client(latency: float = 0.0, unprocessed_ratio: float = 0.0, **faults) -> AWSClient:
+    """AWSClient sobre el backend en memoria; `faults` se pasa a FaultInjector"""
+    injector = FaultInjector(latency=latency, unprocessed_rate=unprocessed_ratio, **faults)
+    return AWSClient(backend=InMemoryBackend(injector))
\ No newline at end of file
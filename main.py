@@ -1,16 +1,50 @@
 from fastapi import FastAPI
 from app.api.main import api_router
 from app.core.config import settings
-from app.db.session import engine, Base
+from app.core.connectivity import connectivity_monitor
+from app.core.security import password_hasher
+from app.core.sync_manager import sync_manager
+from app.db.bootstrap import bootstrap
+from app.db.session import session_runner
+from app.utils.aws_client import probe_aws
 
 app = FastAPI(title=settings.PROJECT_NAME)
 
-# Crear tablas de la base de datos
-Base.metadata.create_all(bind=engine)
-
 # Incluir routers
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
+@app.on_event("startup")
+def bootstrap_database():
+    # Importar la aplicación no toca la base; el esquema se prepara aquí o al desplegar
+    if settings.DB_BOOTSTRAP_ON_STARTUP:
+        bootstrap()
+
+@app.on_event("startup")
+async def start_connectivity_monitor():
+    connectivity_monitor.start(probe_aws)
+
+@app.on_event("startup")
+async def start_sync_manager():
+    # Con SYNC_IN_PROCESS desactivado, la cola la vacía app/worker.py y aquí solo se encola
+    if settings.SYNC_IN_PROCESS:
+        sync_manager.start()
+
+@app.on_event("shutdown")
+async def stop_sync_manager():
+    await sync_manager.stop()
+
+@app.on_event("shutdown")
+async def stop_connectivity_monitor():
+    await connectivity_monitor.stop()
+
+@app.on_event("shutdown")
+def stop_session_runner():
+    session_runner.shutdown()
+
+@app.on_event("shutdown")
+def stop_password_hasher():
+    password_hasher.shutdown()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
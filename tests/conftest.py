@@ -0,0 +1,65 @@
+"""Fixtures comunes: AWS en memoria y bases de datos temporales.
+
+La configuración se lee al importar app.core.config, así que el entorno se fija antes de
+importar nada de la aplicación.
+"""
+import asyncio
+import os
+import tempfile
+
+_data_dir = tempfile.mkdtemp(prefix="burger-tests-")
+os.environ.update({
+    "AWS_BACKEND": "memory",
+    "SQLALCHEMY_DATABASE_URI": f"sqlite:///{_data_dir}/test.db",
+    "LOCAL_DB_PATH": f"{_data_dir}/local_test.db",
+    "SYNC_IN_PROCESS": "false",
+    "PASSWORD_HASH_ROUNDS": "4",
+})
+
+import pytest
+from app.core.auth_cache import principal_cache
+from app.core.cart_cache import cart_cache
+from app.core.catalog_cache import catalog_cache
+from app.core.connectivity import connectivity_monitor
+from app.core.sync_manager import SyncManager
+from app.db.bootstrap import bootstrap
+from app.db.local_db import LocalDB
+from app.db.session import SessionLocal
+from app.utils.aws_client import AWSClient
+from app.utils.fake_aws import InMemoryBackend
+
+@pytest.fixture(autouse=True)
+def reset_state():
+    # Los singletons del proceso no deben arrastrar estado de una prueba a otra
+    connectivity_monitor.record_success()
+    cart_cache.invalidate()
+    catalog_cache.invalidate()
+    principal_cache.clear()
+
+@pytest.fixture
+def local_db(tmp_path):
+    db = LocalDB(str(tmp_path / "local.db"))
+    yield db
+    db.close()
+
+@pytest.fixture
+def aws_client():
+    client = AWSClient(backend=InMemoryBackend())
+    yield client
+    client.close()
+
+@pytest.fixture
+def sync_manager(aws_client, tmp_path):
+    manager = SyncManager(aws_client, str(tmp_path / "sync.db"))
+    yield manager
+    asyncio.run(manager.stop())
+
+@pytest.fixture(scope="session")
+def schema():
+    bootstrap()
+
+@pytest.fixture
+def db(schema):
+    session = SessionLocal()
+    yield session
+    session.close()
\ No newline at end of file
@@ -0,0 +1,82 @@
+import uuid
+from datetime import datetime, timedelta
+import pytest
+from app.core import auth_cache
+from app.core.auth_cache import PrincipalCache, principal_cache
+from app.core.security import create_access_token, get_current_user
+from app.db.repositories import auth
+from app.db.repositories.auth import AuthRepository
+from app.schemas.user import UserCreate, UserInDB
+
+def user(email):
+    return UserInDB(id=email, email=email, created_at=datetime(2024, 1, 1))
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(auth_cache.time, 'time', clock)
+    return clock
+
+def test_entries_expire_with_their_token(clock):
+    cache = PrincipalCache()
+    cache.put('t1', user('a@example.com'), expires_at=1010.0)
+    assert cache.get('t1').email == 'a@example.com'
+
+    clock.now = 1010.0
+    assert cache.get('t1') is None
+    assert cache.stats['misses'] == 1
+
+def test_invalidating_a_user_forgets_all_their_tokens(clock):
+    cache = PrincipalCache()
+    cache.put('t1', user('a@example.com'), expires_at=2000.0)
+    cache.put('t2', user('a@example.com'), expires_at=2000.0)
+    cache.put('t3', user('b@example.com'), expires_at=2000.0)
+
+    cache.invalidate_user('a@example.com')
+
+    assert cache.get('t1') is None and cache.get('t2') is None
+    assert cache.get('t3').email == 'b@example.com'
+
+def test_least_recently_used_token_is_evicted(clock):
+    cache = PrincipalCache(max_entries=2)
+    cache.put('t1', user('a@example.com'), expires_at=2000.0)
+    cache.put('t2', user('b@example.com'), expires_at=2000.0)
+    cache.get('t1')
+    cache.put('t3', user('c@example.com'), expires_at=2000.0)
+
+    assert cache.get('t2') is None
+    assert cache.get('t1') is not None and cache.get('t3') is not None
+    assert cache.stats['evictions'] == 1
+    # Al expulsar un token también se olvida del índice por usuario
+    cache.invalidate_user('b@example.com')
+    assert cache.get('t1') is not None
+
+@pytest.mark.asyncio
+async def test_token_is_resolved_against_the_database_once(db, monkeypatch):
+    email = f"{uuid.uuid4()}@example.com"
+    await AuthRepository(db).create_user(UserCreate(email=email, password="secreta"), hashed_password="x")
+    token = create_access_token({"sub": email}, timedelta(minutes=5))
+
+    lookups = []
+    get_user_by_email = AuthRepository.get_user_by_email
+
+    async def counting_lookup(self, email):
+        lookups.append(email)
+        return await get_user_by_email(self, email)
+
+    monkeypatch.setattr(auth.AuthRepository, 'get_user_by_email', counting_lookup)
+    first = await get_current_user(token, db)
+    second = await get_current_user(token, db)
+    assert first.email == second.email == email
+    assert lookups == [email]
+
+    principal_cache.invalidate_user(email)
+    await get_current_user(token, db)
+    assert lookups == [email, email]
\ No newline at end of file
@@ -0,0 +1,54 @@
+import uuid
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from passlib.hash import bcrypt
+from app.core.auth_cache import principal_cache
+from app.db.repositories.auth import AuthRepository
+from app.schemas.user import UserCreate, UserInDB
+from app.services.auth_service import AuthService
+
+@pytest.fixture
+def auth_service(db, aws_client, sync_manager):
+    return AuthService(db, aws_client, sync_manager)
+
+@pytest.fixture
+def email():
+    return f"{uuid.uuid4()}@example.com"
+
+def rounds(hashed_password):
+    return int(hashed_password.split('$')[2])
+
+@pytest.mark.asyncio
+async def test_registration_hashes_with_the_configured_cost(auth_service, email):
+    user = await auth_service.register_user(UserCreate(email=email, password="secreta"))
+    assert rounds(user.hashed_password) == 4
+
+@pytest.mark.asyncio
+async def test_login_rehashes_a_password_with_another_cost(auth_service, db, email, monkeypatch):
+    old_hash = bcrypt.using(rounds=5).hash("secreta")
+    await AuthRepository(db).create_user(UserCreate(email=email, password="secreta"), hashed_password=old_hash)
+    principal_cache.put('token', UserInDB(id=email, email=email, created_at=datetime(2024, 1, 1)), 2e9)
+
+    user = await auth_service.authenticate_user(email, "secreta")
+    assert rounds(user.hashed_password) == 4
+    assert bcrypt.verify("secreta", user.hashed_password)
+    assert rounds((await AuthRepository(db).get_user_by_email(email)).hashed_password) == 4
+    # El registro del usuario cambió: sus tokens en caché se olvidan
+    assert principal_cache.get('token') is None
+
+    # Con el coste ya al día no se vuelve a escribir
+    updates = []
+    monkeypatch.setattr(AuthRepository, 'update_password_hash', lambda *args: updates.append(args))
+    await auth_service.authenticate_user(email, "secreta")
+    assert updates == []
+
+@pytest.mark.asyncio
+async def test_wrong_password_is_rejected_without_rehashing(auth_service, db, email):
+    old_hash = bcrypt.using(rounds=5).hash("secreta")
+    await AuthRepository(db).create_user(UserCreate(email=email, password="secreta"), hashed_password=old_hash)
+
+    with pytest.raises(HTTPException) as error:
+        await auth_service.authenticate_user(email, "otra")
+    assert error.value.status_code == 401
+    assert (await AuthRepository(db).get_user_by_email(email)).hashed_password == old_hash
\ No newline at end of file
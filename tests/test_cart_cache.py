@@ -0,0 +1,71 @@
+import uuid
+from datetime import datetime
+import pytest
+from app.core.cart_cache import CartCache, cart_cache
+from app.db.repositories.product import ProductRepository
+from app.schemas.cart import CartItemCreate, CartItemInDB, CartItemUpdate
+from app.schemas.product import ProductCreate
+from app.services.cart_service import CartService
+
+def item(item_id, user_id, quantity=1):
+    return CartItemInDB(
+        id=item_id,
+        user_id=user_id,
+        product_id='p1',
+        quantity=quantity,
+        created_at=datetime(2024, 1, 1)
+    )
+
+def test_read_is_only_discarded_by_its_own_users_mutations():
+    cache = CartCache()
+    started_u1 = cache.generation('u1')
+    started_u2 = cache.generation('u2')
+
+    cache.upsert('u2', item('i2', 'u2'), None)
+
+    cache.put('u1', [(item('i1', 'u1'), None)], started_u1)
+    cache.put('u2', [], started_u2)
+    assert [line[0].id for line in cache.get('u1')] == ['i1']
+    assert cache.get('u2') is None
+
+def test_global_invalidation_discards_every_read_in_flight():
+    cache = CartCache()
+    started = cache.generation('u1')
+
+    cache.invalidate()
+
+    cache.put('u1', [], started)
+    assert cache.get('u1') is None
+
+def test_forgotten_mutations_discard_older_reads():
+    cache = CartCache(max_users=1)
+    started = cache.generation('u1')
+
+    cache.remove('u1', 'i1')
+    # Solo se recuerda u2: de u1 ya no se sabe si cambió después de empezar la lectura
+    cache.remove('u2', 'i2')
+
+    cache.put('u1', [], started)
+    assert cache.get('u1') is None
+    cache.put('u1', [], cache.generation('u1'))
+    assert cache.get('u1') == []
+
+@pytest.mark.asyncio
+async def test_mutations_write_through_to_the_cached_cart(db, aws_client, sync_manager):
+    service = CartService(db, aws_client, sync_manager)
+    user_id = str(uuid.uuid4())
+    product = await ProductRepository(db).create_product(ProductCreate(name="Doble", price=11.0))
+
+    assert (await service.get_priced_cart(user_id)).items == []
+    misses = cart_cache.stats['misses']
+
+    added = await service.add_to_cart(user_id, CartItemCreate(product_id=product.id, quantity=1))
+    await service.update_cart_item(user_id, added.id, CartItemUpdate(quantity=3))
+    cart = await service.get_priced_cart(user_id)
+    assert [(line.id, line.quantity) for line in cart.items] == [(added.id, 3)]
+    assert cart.subtotal == 33.0
+
+    await service.remove_from_cart(user_id, added.id)
+    assert (await service.get_priced_cart(user_id)).items == []
+    # Las lecturas se sirvieron del carrito cacheado, sin volver a cargarlo
+    assert cart_cache.stats['misses'] == misses
\ No newline at end of file
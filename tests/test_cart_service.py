@@ -0,0 +1,136 @@
+import uuid
+import pytest
+from pydantic import ValidationError
+from app.core.cart_cache import cart_cache
+from app.db.repositories.product import ProductRepository
+from app.schemas.cart import CartBulkUpdate, CartItemCreate, CartItemUpdate
+from app.schemas.product import ProductCreate
+from app.services.cart_service import CartService
+
+async def create_products(db, count):
+    repo = ProductRepository(db)
+    return [
+        (await repo.create_product(ProductCreate(name=f"Producto {index}", price=5.0 + index))).id
+        for index in range(count)
+    ]
+
+def bulk(*items, replace=False):
+    return CartBulkUpdate(
+        items=[CartItemCreate(product_id=product_id, quantity=quantity) for product_id, quantity in items],
+        replace=replace
+    )
+
+@pytest.fixture
+def cart_service(db, aws_client, sync_manager):
+    return CartService(db, aws_client, sync_manager)
+
+@pytest.fixture
+def user_id():
+    return str(uuid.uuid4())
+
+@pytest.mark.asyncio
+async def test_replace_removes_every_other_line(cart_service, db, aws_client, user_id):
+    p0, p1 = await create_products(db, 2)
+    # Dos líneas del mismo producto, p.ej. con distintas opciones
+    await cart_service.add_to_cart(user_id, CartItemCreate(product_id=p0, quantity=1, options="sin cebolla"))
+    await cart_service.add_to_cart(user_id, CartItemCreate(product_id=p0, quantity=1))
+    await cart_service.add_to_cart(user_id, CartItemCreate(product_id=p1, quantity=1))
+
+    cart = await cart_service.bulk_update_cart(user_id, bulk((p0, 3), replace=True))
+
+    assert [(item.product_id, item.quantity) for item in cart.items] == [(p0, 3)]
+    assert [(row.product_id, row.quantity) for row in await cart_service.repo.get_cart_items(user_id)] == [(p0, 3)]
+    assert [(item.product_id, item.quantity) for item in await aws_client.get_cart_items(user_id)] == [(p0, 3)]
+
+@pytest.mark.asyncio
+async def test_merge_updates_in_place_and_keeps_other_lines(cart_service, db, user_id):
+    p0, p1, p2 = await create_products(db, 3)
+    first = await cart_service.add_to_cart(user_id, CartItemCreate(product_id=p0, quantity=1))
+    await cart_service.add_to_cart(user_id, CartItemCreate(product_id=p1, quantity=1))
+
+    cart = await cart_service.bulk_update_cart(user_id, bulk((p0, 2), (p2, 4)))
+
+    lines = {item.product_id: item for item in cart.items}
+    assert {product_id: item.quantity for product_id, item in lines.items()} == {p0: 2, p1: 1, p2: 4}
+    assert lines[p0].id == first.id
+    assert cart.item_count == 7
+    assert cart.subtotal == 2 * 5.0 + 1 * 6.0 + 4 * 7.0
+
+@pytest.mark.asyncio
+async def test_offline_bulk_update_is_queued_and_served_locally(cart_service, db, aws_client, sync_manager, user_id):
+    p0, p1 = await create_products(db, 2)
+    await cart_service.add_to_cart(user_id, CartItemCreate(product_id=p0, quantity=1))
+
+    aws_client.backend.faults.set_outage(True)
+    await cart_service.bulk_update_cart(user_id, bulk((p1, 2), replace=True))
+    queued = sorted(operation['type'] for operation in sync_manager.local_db.get_pending_operations())
+    assert queued == ['remove_cart_item', 'update_cart_item']
+
+    # AWS vuelve, pero hasta sincronizar el carrito vigente es el local
+    aws_client.backend.faults.set_outage(False)
+    cart_cache.invalidate(user_id)  # como si la lectura llegara a otro worker
+    cart = await cart_service.get_priced_cart(user_id)
+    assert [(item.product_id, item.quantity) for item in cart.items] == [(p1, 2)]
+
+    await sync_manager.sync_data()
+    assert sync_manager.local_db.get_pending_operations() == []
+    assert [(item.product_id, item.quantity) for item in await aws_client.get_cart_items(user_id)] == [(p1, 2)]
+
+@pytest.mark.asyncio
+async def test_mutations_queue_behind_pending_operations(cart_service, db, aws_client, sync_manager, user_id):
+    [p0] = await create_products(db, 1)
+    aws_client.backend.faults.set_outage(True)
+    item = await cart_service.add_to_cart(user_id, CartItemCreate(product_id=p0, quantity=1))
+    aws_client.backend.faults.set_outage(False)
+
+    # El alta sigue en cola: la actualización no puede adelantarla escribiendo directamente en AWS
+    await cart_service.update_cart_item(user_id, item.id, CartItemUpdate(quantity=3))
+    assert await aws_client.get_cart_items(user_id) == []
+
+    await sync_manager.sync_data()
+    assert [(line.id, line.quantity) for line in await aws_client.get_cart_items(user_id)] == [(item.id, 3)]
+    cart_cache.invalidate(user_id)
+    cart = await cart_service.get_priced_cart(user_id)
+    assert [line.quantity for line in cart.items] == [3]
+
+@pytest.mark.asyncio
+async def test_update_of_missing_item_returns_none(cart_service, user_id):
+    assert await cart_service.update_cart_item(user_id, 'missing', CartItemUpdate(quantity=2)) is None
+
+@pytest.mark.asyncio
+async def test_other_users_cannot_change_a_line(cart_service, db, aws_client, user_id):
+    [p0] = await create_products(db, 1)
+    item = await cart_service.add_to_cart(user_id, CartItemCreate(product_id=p0, quantity=1))
+    other_user = str(uuid.uuid4())
+
+    assert await cart_service.update_cart_item(other_user, item.id, CartItemUpdate(quantity=9)) is None
+    assert not await cart_service.remove_from_cart(other_user, item.id)
+    cart = await cart_service.get_priced_cart(user_id)
+    assert [(line.id, line.quantity) for line in cart.items] == [(item.id, 1)]
+    assert [line.id for line in await aws_client.get_cart_items(user_id)] == [item.id]
+
+    assert await cart_service.remove_from_cart(user_id, item.id)
+    assert (await cart_service.get_priced_cart(user_id)).items == []
+
+@pytest.mark.parametrize('quantity', [0, -5])
+def test_quantities_must_be_positive(quantity):
+    with pytest.raises(ValidationError):
+        CartItemCreate(product_id='p1', quantity=quantity)
+    with pytest.raises(ValidationError):
+        CartItemUpdate(quantity=quantity)
+    with pytest.raises(ValidationError):
+        CartBulkUpdate(items=[{'product_id': 'p1', 'quantity': quantity}])
+@pytest.mark.asyncio
+async def test_failed_aws_read_is_logged_and_served_locally(cart_service, db, aws_client, user_id, monkeypatch, caplog):
+    (p0,) = await create_products(db, 1)
+    await cart_service.add_to_cart(user_id, CartItemCreate(product_id=p0, quantity=2))
+    cart_cache.invalidate(user_id)
+
+    async def failing_read(user_id):
+        raise Exception("AWS Error: Requested resource not found")
+
+    monkeypatch.setattr(aws_client, 'get_cart_items', failing_read)
+    cart = await cart_service.get_priced_cart(user_id)
+
+    assert [(item.product_id, item.quantity) for item in cart.items] == [(p0, 2)]
+    assert "Requested resource not found" in caplog.text
\ No newline at end of file
@@ -0,0 +1,91 @@
+import asyncio
+from datetime import datetime
+import pytest
+from app.core.catalog_cache import CatalogCache
+from app.schemas.product import Product, ProductCreate
+from app.services.product_service import ProductService
+
+def product(product_id):
+    return Product(id=product_id, name=product_id, price=1.0, is_available=True, created_at=datetime(2024, 1, 1))
+
+class CountingLoader:
+    def __init__(self, *catalogs, delay=0.0):
+        self.catalogs = list(catalogs)
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return self.catalogs[min(self.calls, len(self.catalogs)) - 1]
+
+@pytest.mark.asyncio
+async def test_catalog_is_served_from_memory_within_ttl():
+    cache = CatalogCache(ttl=60, refresh_ahead=0)
+    loader = CountingLoader([product('p1')])
+    first = await cache.get_all(loader)
+    assert await cache.get_all(loader) is first
+    assert loader.calls == 1
+    assert cache.stats['hits'] == 1
+
+@pytest.mark.asyncio
+async def test_expired_catalog_is_served_stale_while_refreshing():
+    cache = CatalogCache(ttl=0.01, refresh_ahead=0, stale_ttl=60)
+    loader = CountingLoader([product('p1')], [product('p1'), product('p2')])
+    await cache.get_all(loader)
+    await asyncio.sleep(0.02)
+
+    assert [p.id for p in await cache.get_all(loader)] == ['p1']
+    assert cache.stats['stale_hits'] == 1
+    await cache._refresh_task
+    assert [p.id for p in await cache.get_all(loader)] == ['p1', 'p2']
+
+@pytest.mark.asyncio
+async def test_invalidation_discards_loads_already_in_flight():
+    cache = CatalogCache(ttl=60, refresh_ahead=0)
+    loader = CountingLoader([product('p1')], [product('p1'), product('p2')], delay=0.01)
+    in_flight = asyncio.ensure_future(cache.get_all(loader))
+    while not loader.calls:
+        await asyncio.sleep(0)
+    cache.invalidate()
+    await in_flight
+
+    # La carga empezó antes de invalidar: no se guarda
+    assert [p.id for p in await cache.get_all(loader)] == ['p1', 'p2']
+    assert loader.calls == 2
+
+@pytest.mark.asyncio
+async def test_invalidate_product_drops_its_entry():
+    cache = CatalogCache(ttl=60)
+
+    async def load_product(product_id):
+        return product(product_id)
+
+    await cache.get_by_id('p1', load_product)
+    assert cache.stats['misses'] == 1
+    await cache.get_by_id('p1', load_product)
+    assert cache.stats['hits'] == 1
+    cache.invalidate('p1')
+    await cache.get_by_id('p1', load_product)
+    assert cache.stats['misses'] == 2
+
+@pytest.mark.asyncio
+async def test_created_product_is_visible_after_concurrent_catalog_read(db, aws_client, sync_manager, monkeypatch):
+    service = ProductService(db, aws_client, sync_manager)
+    create_in_aws = aws_client.create_product
+    written = asyncio.Event()
+
+    async def slow_create(product):
+        await written.wait()
+        await create_in_aws(product)
+
+    monkeypatch.setattr(aws_client, 'create_product', slow_create)
+    creating = asyncio.ensure_future(service.create_product(ProductCreate(name="Nueva", price=9.0)))
+    await asyncio.sleep(0.01)
+    # Esta lectura recarga desde AWS mientras el alta todavía no ha llegado
+    await service.get_all_products()
+    written.set()
+    created = await creating
+
+    assert created.id in {p.id for p in await service.get_all_products()}
\ No newline at end of file
@@ -0,0 +1,58 @@
+from app.core.compaction import compact_operations
+
+def cart_op(op_id, op_type, item_id, **data):
+    if op_type == 'remove_cart_item':
+        return {'id': op_id, 'type': op_type, 'item_id': item_id, 'data': {'user_id': 'u1'}}
+    return {'id': op_id, 'type': op_type, 'item_id': None, 'data': {'id': item_id, 'user_id': 'u1', **data}}
+
+def test_add_then_remove_uploads_nothing():
+    result = compact_operations([
+        cart_op('1', 'add_cart_item', 'a', quantity=1),
+        cart_op('2', 'update_cart_item', 'a', quantity=2),
+        cart_op('3', 'update_cart_item', 'a', quantity=3),
+        cart_op('4', 'remove_cart_item', 'a'),
+    ])
+    assert result.operations == []
+    assert result.dropped_ids == ['1', '2', '3', '4']
+    assert result.ratio == 4.0
+
+def test_add_then_updates_becomes_single_add_with_final_data():
+    result = compact_operations([
+        cart_op('1', 'add_cart_item', 'a', quantity=1),
+        cart_op('2', 'update_cart_item', 'a', quantity=2),
+        cart_op('3', 'update_cart_item', 'a', quantity=5),
+    ])
+    [operation] = result.operations
+    assert operation['type'] == 'add_cart_item'
+    assert operation['id'] == '3'
+    assert operation['data']['quantity'] == 5
+    assert operation['superseded_ids'] == ['1', '2']
+    assert result.dropped_ids == []
+
+def test_update_then_remove_keeps_the_remove():
+    result = compact_operations([
+        cart_op('1', 'update_cart_item', 'a', quantity=2),
+        cart_op('2', 'remove_cart_item', 'a'),
+    ])
+    [operation] = result.operations
+    assert operation['type'] == 'remove_cart_item'
+    assert operation['superseded_ids'] == ['1']
+
+def test_order_is_kept_and_other_operations_pass_through():
+    create_user = {'id': '2', 'type': 'create_user', 'item_id': None, 'data': {'email': 'a@example.com'}}
+    result = compact_operations([
+        cart_op('1', 'add_cart_item', 'a', quantity=1),
+        create_user,
+        cart_op('3', 'add_cart_item', 'b', quantity=1),
+        cart_op('4', 'update_cart_item', 'a', quantity=2),
+    ])
+    # Cada historial compactado ocupa la posición de su última operación
+    assert [operation['id'] for operation in result.operations] == ['2', '3', '4']
+    assert result.operations[0]['superseded_ids'] == []
+    assert result.compacted_count == 3
+    assert result.original_count == 4
+
+def test_empty_queue():
+    result = compact_operations([])
+    assert result.operations == []
+    assert result.ratio == 1.0
\ No newline at end of file
@@ -0,0 +1,111 @@
+import pytest
+from botocore.exceptions import EndpointConnectionError
+from app.core import connectivity
+from app.core.connectivity import CircuitState, ConnectivityMonitor, connectivity_monitor
+from app.utils.aws_client import is_connectivity_error
+from app.utils.fake_aws import client_error
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(connectivity.time, 'monotonic', clock)
+    return clock
+
+def test_opens_after_threshold_and_half_opens_after_timeout(clock):
+    monitor = ConnectivityMonitor(failure_threshold=3, reset_timeout=30.0)
+    monitor.record_failure()
+    monitor.record_failure()
+    assert monitor.state == CircuitState.CLOSED and monitor.is_online()
+
+    monitor.record_failure()
+    assert monitor.state == CircuitState.OPEN and not monitor.is_online()
+
+    clock.now += 29.0
+    assert not monitor.is_online()
+    clock.now += 1.0
+    assert monitor.is_online()
+    assert monitor.state == CircuitState.HALF_OPEN
+
+    monitor.record_success()
+    assert monitor.state == CircuitState.CLOSED
+
+def test_failed_trial_call_reopens_at_once(clock):
+    monitor = ConnectivityMonitor(failure_threshold=3, reset_timeout=30.0)
+    for _ in range(3):
+        monitor.record_failure()
+    clock.now += 30.0
+    assert monitor.is_online()
+
+    monitor.record_failure()
+    assert monitor.state == CircuitState.OPEN
+    clock.now += 29.0
+    assert not monitor.is_online()
+
+def test_success_resets_the_failure_count():
+    monitor = ConnectivityMonitor(failure_threshold=3)
+    monitor.record_failure()
+    monitor.record_failure()
+    monitor.record_success()
+    monitor.record_failure()
+    monitor.record_failure()
+    assert monitor.state == CircuitState.CLOSED
+
+def test_recovery_listeners_run_once_per_reconnection():
+    monitor = ConnectivityMonitor(failure_threshold=1)
+    calls = []
+
+    def broken():
+        raise RuntimeError("listener roto")
+
+    monitor.add_recovery_listener(broken)
+    monitor.add_recovery_listener(lambda: calls.append('recovered'))
+    monitor.record_success()
+    assert calls == []
+
+    monitor.record_failure()
+    monitor.record_success()
+    monitor.record_success()
+    # Un listener que falla no impide avisar a los demás
+    assert calls == ['recovered']
+
+@pytest.mark.asyncio
+async def test_check_records_the_probe_result():
+    monitor = ConnectivityMonitor(failure_threshold=1)
+
+    async def failing_probe():
+        raise EndpointConnectionError(endpoint_url='https://dynamodb.us-east-1.amazonaws.com')
+
+    async def probe():
+        return None
+
+    await monitor.check(failing_probe)
+    assert monitor.state == CircuitState.OPEN
+    monitor.reset_timeout = 0.0
+    await monitor.check(probe)
+    assert monitor.state == CircuitState.CLOSED
+
+def test_only_connectivity_errors_count_as_failures():
+    assert is_connectivity_error(EndpointConnectionError(endpoint_url='https://dynamodb'))
+    assert is_connectivity_error(client_error('ProvisionedThroughputExceededException', 'Rate exceeded', 'put_item'))
+    assert not is_connectivity_error(client_error('ValidationException', 'Bad item', 'put_item'))
+    assert not is_connectivity_error(client_error('UsernameExistsException', 'Exists', 'admin_create_user'))
+
+@pytest.mark.asyncio
+async def test_outage_opens_the_shared_circuit(aws_client, monkeypatch):
+    aws_client.backend.faults.set_outage(True)
+    for _ in range(connectivity_monitor.failure_threshold):
+        with pytest.raises(Exception):
+            await aws_client.get_all_products()
+    assert not connectivity_monitor.is_online()
+
+    aws_client.backend.faults.set_outage(False)
+    monkeypatch.setattr(connectivity_monitor, 'reset_timeout', 0.0)
+    await aws_client.get_all_products()
+    assert connectivity_monitor.state == CircuitState.CLOSED
\ No newline at end of file
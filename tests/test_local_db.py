@@ -0,0 +1,37 @@
+import sqlite3
+from app.db.local_db import LocalDB
+
+def test_pending_operations_by_user_use_the_index(local_db):
+    local_db.add_pending_operations([
+        {'type': 'add_cart_item', 'data': {'id': 'i1', 'user_id': 'u1'}},
+        {'type': 'create_user', 'data': {'email': 'a@example.com'}},
+    ])
+    assert local_db.has_pending_operations_for_user('u1')
+    assert not local_db.has_pending_operations_for_user('u2')
+
+    plan = local_db.conn.execute(
+        'EXPLAIN QUERY PLAN SELECT 1 FROM pending_operations WHERE user_id = ? LIMIT 1', ('u1',)
+    ).fetchall()
+    assert 'idx_pending_operations_user_id' in ' '.join(str(row[-1]) for row in plan)
+
+def test_old_queue_is_migrated(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.execute(
+        'CREATE TABLE pending_operations (id TEXT PRIMARY KEY, type TEXT NOT NULL, data TEXT, '
+        'item_id TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)'
+    )
+    conn.execute(
+        "INSERT INTO pending_operations VALUES ('1', 'add_cart_item', '{\"id\": \"i1\", \"user_id\": \"u1\"}', NULL, '2024')"
+    )
+    conn.commit()
+    conn.close()
+
+    local_db = LocalDB(path)
+    try:
+        [operation] = local_db.get_pending_operations()
+        assert operation['attempts'] == 0
+        assert operation['data'] == {'id': 'i1', 'user_id': 'u1'}
+        assert local_db.has_pending_operations_for_user('u1')
+    finally:
+        local_db.close()
\ No newline at end of file
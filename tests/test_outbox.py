@@ -0,0 +1,75 @@
+import asyncio
+import pytest
+from app.db.outbox import Outbox
+
+def operation(index, user_id='u1'):
+    return {'type': 'add_cart_item', 'data': {'id': f'item-{index}', 'user_id': user_id}}
+
+def test_invalid_durability():
+    with pytest.raises(ValueError):
+        Outbox(None, durability="eventual")
+
+@pytest.mark.asyncio
+async def test_sync_mode_writes_each_operation(local_db):
+    flushes = []
+    outbox = Outbox(local_db, durability="sync", on_flush=lambda: flushes.append(True))
+    assert await outbox.put(operation(1))
+    assert len(local_db.get_pending_operations()) == 1
+    assert flushes == [True]
+
+@pytest.mark.asyncio
+async def test_group_mode_commits_concurrent_puts_together(local_db, monkeypatch):
+    commits = []
+    add_pending_operations = local_db.add_pending_operations
+
+    def record_commit(operations):
+        commits.append(len(operations))
+        return add_pending_operations(operations)
+
+    monkeypatch.setattr(local_db, "add_pending_operations", record_commit)
+    outbox = Outbox(local_db, durability="group", flush_interval=0.01)
+    results = await asyncio.gather(*(outbox.put(operation(index)) for index in range(5)))
+    assert results == [True] * 5
+    assert commits == [5]
+    assert [op['data']['id'] for op in local_db.get_pending_operations()] == [f'item-{index}' for index in range(5)]
+
+@pytest.mark.asyncio
+async def test_group_mode_reports_failed_commit(local_db, monkeypatch):
+    monkeypatch.setattr(local_db, "add_pending_operations", lambda operations: False)
+    outbox = Outbox(local_db, durability="group")
+    assert await outbox.put(operation(1)) is False
+
+@pytest.mark.asyncio
+async def test_async_mode_buffers_until_flush(local_db):
+    outbox = Outbox(local_db, durability="async", flush_interval=60)
+    assert await outbox.put(operation(1, user_id='u1'))
+    assert local_db.get_pending_operations() == []
+    assert outbox.has_buffered_for_user('u1')
+    assert not outbox.has_buffered_for_user('u2')
+
+    assert outbox.flush()
+    assert len(local_db.get_pending_operations()) == 1
+    assert not outbox.has_buffered_for_user('u1')
+
+@pytest.mark.asyncio
+async def test_full_buffer_flushes_immediately(local_db):
+    outbox = Outbox(local_db, durability="async", flush_interval=60, max_batch=2)
+    await outbox.put(operation(1))
+    assert local_db.get_pending_operations() == []
+    await outbox.put(operation(2))
+    assert len(local_db.get_pending_operations()) == 2
+
+@pytest.mark.asyncio
+async def test_put_many_shares_one_commit(local_db, monkeypatch):
+    commits = []
+    add_pending_operations = local_db.add_pending_operations
+
+    def record_commit(operations):
+        commits.append(len(operations))
+        return add_pending_operations(operations)
+
+    monkeypatch.setattr(local_db, "add_pending_operations", record_commit)
+    outbox = Outbox(local_db, durability="group")
+    assert await outbox.put_many([operation(index) for index in range(3)])
+    assert await outbox.put_many([])
+    assert commits == [3]
\ No newline at end of file
@@ -0,0 +1,94 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.db.init_db import init_db
+from app.db.repositories.product import ProductRepository
+from app.db.search import PRODUCT_SEARCH_TRIGGERS, init_product_search
+from app.schemas.product import ProductCreate
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def repo(engine):
+    init_db(engine)
+    session = sessionmaker(bind=engine)()
+    yield ProductRepository(session)
+    session.close()
+
+async def create(repo, name, description=None, ingredients=None):
+    return (await repo.create_product(ProductCreate(
+        name=name, description=description, ingredients=ingredients, price=8.0
+    ))).id
+
+async def search(repo, query):
+    return [product.name for product in await repo.search_products(query)]
+
+@pytest.mark.asyncio
+async def test_matches_prefixes_without_accents_and_ranks_name_first(repo):
+    await create(repo, 'Clásica', ingredients='ternera, cebolla')
+    await create(repo, 'Cebolla crujiente')
+
+    assert await search(repo, 'clasi') == ['Clásica']
+    assert await search(repo, 'ceb') == ['Cebolla crujiente', 'Clásica']
+    assert await search(repo, '***') == []
+
+@pytest.mark.asyncio
+async def test_triggers_follow_updates_and_deletes(repo, engine):
+    first = await create(repo, 'Doble')
+    second = await create(repo, 'Veggie')
+
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE products SET name = 'Triple' WHERE id = :id"), {'id': first})
+        conn.execute(text("UPDATE products SET price = 9.5 WHERE id = :id"), {'id': second})
+    assert await search(repo, 'doble') == []
+    assert await search(repo, 'triple') == ['Triple']
+    assert await search(repo, 'veggie') == ['Veggie']
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM products WHERE id = :id"), {'id': second})
+    assert await search(repo, 'veggie') == []
+
+@pytest.mark.asyncio
+async def test_results_survive_renumbered_rowids(repo, engine):
+    await create(repo, 'Clásica')
+    await create(repo, 'Doble')
+    await create(repo, 'BBQ')
+
+    # VACUUM puede renumerar los rowid de una tabla con clave TEXT sin pasar por los triggers;
+    # se simula cambiándolos con los triggers quitados
+    with engine.begin() as conn:
+        for trigger in PRODUCT_SEARCH_TRIGGERS:
+            conn.execute(text(f"DROP TRIGGER {trigger}"))
+        conn.execute(text("UPDATE products SET rowid = 1000 - rowid"))
+    init_product_search(engine)
+
+    assert await search(repo, 'bbq') == ['BBQ']
+    assert await search(repo, 'doble') == ['Doble']
+
+@pytest.mark.asyncio
+async def test_rowid_index_from_previous_version_is_rebuilt(engine):
+    init_db(engine)
+    with engine.begin() as conn:
+        for trigger in PRODUCT_SEARCH_TRIGGERS:
+            conn.execute(text(f"DROP TRIGGER {trigger}"))
+        conn.execute(text("DROP TABLE products_fts"))
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE products_fts USING fts5("
+            "name, description, ingredients, content='products', content_rowid='rowid')"
+        ))
+        conn.execute(text(
+            "INSERT INTO products (id, name, price, is_available, created_at) "
+            "VALUES ('p1', 'Doble', 8.0, 1, '2024-01-01 00:00:00')"
+        ))
+
+    init_db(engine)
+
+    session = sessionmaker(bind=engine)()
+    try:
+        assert await search(ProductRepository(session), 'doble') == ['Doble']
+    finally:
+        session.close()
\ No newline at end of file
@@ -0,0 +1,77 @@
+import base64
+import json
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from app.schemas.product import Product
+from app.services.product_service import ProductService
+
+def product(product_id, name, price, category='burgers', is_available=True):
+    return Product(
+        id=product_id,
+        name=name,
+        price=price,
+        category=category,
+        is_available=is_available,
+        created_at=datetime(2024, 1, 1)
+    )
+
+CATALOG = [
+    product('p1', 'Clásica', 8.0),
+    product('p2', 'Doble', 11.0),
+    product('p3', 'BBQ', 11.0),
+    product('p4', 'Veggie', 9.5),
+    product('p5', 'Agotada', 7.0, is_available=False),
+    product('p6', 'Patatas', 3.0, category='sides'),
+    product('p7', 'Bacon', 11.0),
+]
+
+def walk_pages(service, sort, limit, category=None):
+    """Recorre todas las páginas siguiendo next_cursor"""
+    pages = []
+    cursor = None
+    while True:
+        page = service._page_from_catalog(CATALOG, category, sort, limit, service._decode_cursor(sort, cursor))
+        pages.append([item.id for item in page.items])
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages
+
+def test_pages_follow_sort_and_id_order():
+    service = ProductService(None, None, None)
+    # Los empates de precio se ordenan por id; los no disponibles no aparecen
+    assert walk_pages(service, 'price', 2) == [['p6', 'p1'], ['p4', 'p2'], ['p3', 'p7']]
+
+def test_descending_pages():
+    service = ProductService(None, None, None)
+    assert walk_pages(service, '-price', 2) == [['p7', 'p3'], ['p2', 'p4'], ['p1', 'p6']]
+
+def test_category_filter_and_last_page():
+    service = ProductService(None, None, None)
+    assert walk_pages(service, 'name', 10, category='burgers') == [['p3', 'p7', 'p1', 'p2', 'p4']]
+
+def test_limit_equal_to_remaining_items_has_no_next_page():
+    service = ProductService(None, None, None)
+    page = service._page_from_catalog(CATALOG, 'sides', 'name', 1, None)
+    assert [item.id for item in page.items] == ['p6']
+    assert page.next_cursor is None
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+@pytest.mark.parametrize('sort, payload', [
+    ('price', {'s': 'price', 'v': 'abc', 'id': 'p1'}),
+    ('-price', {'s': '-price', 'v': True, 'id': 'p1'}),
+    ('name', {'s': 'name', 'v': 3, 'id': 'p1'}),
+    ('name', {'s': 'name', 'v': 'Doble', 'id': 7}),
+])
+def test_cursor_with_wrong_value_type_is_rejected(sort, payload):
+    with pytest.raises(HTTPException) as error:
+        ProductService._decode_cursor(sort, raw_cursor(payload))
+    assert error.value.status_code == 400
+
+def test_integer_price_cursor_is_accepted():
+    service = ProductService(None, None, None)
+    after = service._decode_cursor('price', raw_cursor({'s': 'price', 'v': 11, 'id': 'p2'}))
+    page = service._page_from_catalog(CATALOG, None, 'price', 10, after)
+    assert [item.id for item in page.items] == ['p3', 'p7']
\ No newline at end of file
@@ -0,0 +1,136 @@
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+from app.core.config import settings
+from app.core.sync_manager import is_retryable, partition_key
+from app.schemas.cart import CartItemInDB
+from app.utils import fake_aws
+from app.utils.exceptions import AWSSyncException
+
+def test_cart_operations_are_partitioned_by_user():
+    operation = {'type': 'update_cart_item', 'data': {'id': 'i1', 'user_id': 'u1'}}
+    assert partition_key(operation) == 'user:u1'
+    assert partition_key({'type': 'remove_cart_item', 'item_id': 'i1', 'data': {'user_id': 'u1'}}) == 'user:u1'
+
+def test_cart_operations_without_user_are_partitioned_by_item():
+    assert partition_key({'type': 'remove_cart_item', 'item_id': 'i1', 'data': None}) == 'item:i1'
+
+def test_creations_are_partitioned_by_entity():
+    assert partition_key({'type': 'create_user', 'data': {'email': 'a@example.com'}}) == 'user:a@example.com'
+    assert partition_key({'type': 'create_product', 'data': {'id': 'p1'}}) == 'product:p1'
+    assert partition_key({'type': 'create_product', 'data': {'id': 'p2'}}) == 'product:p2'
+
+def test_unknown_operations_share_the_global_partition():
+    assert partition_key({'type': 'something_else', 'data': {}}) == 'global'
+
+def client_error(code, status=400):
+    return ClientError({'Error': {'Code': code, 'Message': code}, 'ResponseMetadata': {'HTTPStatusCode': status}}, 'op')
+
+def test_retryable_errors():
+    assert is_retryable(EndpointConnectionError(endpoint_url='https://dynamodb'))
+    assert is_retryable(client_error('ProvisionedThroughputExceededException'))
+    assert is_retryable(client_error('InternalServerError', 500))
+    assert is_retryable(AWSSyncException("2 elementos sin procesar"))
+    assert not is_retryable(client_error('ValidationException'))
+    assert not is_retryable(ValueError("datos inválidos"))
+
+def test_wrapped_client_errors_are_classified_by_their_cause():
+    # AWSClient convierte los ClientError en Exception("AWS Error: ...")
+    try:
+        try:
+            raise client_error('ThrottlingException')
+        except ClientError as e:
+            raise Exception(f"AWS Error: {e}")
+    except Exception as wrapped:
+        assert is_retryable(wrapped)
+
+def user_operation(email, full_name):
+    return {
+        'type': 'create_user',
+        'data': {'id': email, 'email': email, 'full_name': full_name, 'created_at': '2024-01-01T00:00:00'}
+    }
+
+@pytest.mark.asyncio
+async def test_rejected_operation_is_dead_lettered_without_blocking_others(sync_manager, aws_client, monkeypatch):
+    monkeypatch.setattr(settings, 'SYNC_MAX_ATTEMPTS', 2)
+    # Cognito rechaza el alta sin nombre: no se resolverá reintentando
+    sync_manager.local_db.add_pending_operations([
+        user_operation('bad@example.com', None),
+        user_operation('good@example.com', 'Good'),
+    ])
+
+    await sync_manager.sync_data()
+    [pending] = sync_manager.local_db.get_pending_operations()
+    assert pending['data']['email'] == 'bad@example.com'
+    assert pending['attempts'] == 1
+    pool = aws_client.cognito.pools[settings.COGNITO_USER_POOL_ID]
+    assert list(pool) == ['good@example.com']
+
+    await sync_manager.sync_data()
+    assert sync_manager.local_db.get_pending_operations() == []
+    [failed] = sync_manager.local_db.get_failed_operations()
+    assert failed['data']['email'] == 'bad@example.com'
+    assert failed['attempts'] == 2
+
+@pytest.mark.asyncio
+async def test_outage_keeps_operations_pending(sync_manager, aws_client):
+    sync_manager.local_db.add_pending_operations([user_operation('a@example.com', 'A')])
+    aws_client.backend.faults.set_outage(True)
+    await sync_manager.sync_data()
+    [pending] = sync_manager.local_db.get_pending_operations()
+    assert pending['attempts'] == 0
+    assert sync_manager.local_db.get_failed_operations() == []
+
+@pytest.mark.asyncio
+async def test_pending_remove_deletes_the_item(sync_manager, aws_client):
+    item = CartItemInDB(id='i1', user_id='u1', product_id='p1', quantity=1, created_at='2024-01-01T00:00:00')
+    await aws_client.add_to_cart(item)
+    sync_manager.local_db.add_pending_operations([
+        {'type': 'remove_cart_item', 'item_id': 'i1', 'data': {'user_id': 'u1'}}
+    ])
+    await sync_manager.sync_data()
+    assert sync_manager.local_db.get_pending_operations() == []
+    assert await aws_client.get_cart_items('u1') == []
+
+def product_operation(product_id, **overrides):
+    data = {
+        'id': product_id, 'name': f'Producto {product_id}', 'price': 5.0, 'is_available': True,
+        'created_at': '2024-01-01T00:00:00', **overrides
+    }
+    return {'type': 'create_product', 'data': data}
+
+@pytest.mark.asyncio
+async def test_writes_from_different_partitions_share_batches(sync_manager, aws_client):
+    operations = [product_operation(f'p{index}') for index in range(100)]
+    operations += [
+        {'type': 'add_cart_item', 'data': {
+            'id': f'i{index}', 'user_id': f'u{index}', 'product_id': 'p1', 'quantity': 1,
+            'created_at': '2024-01-01T00:00:00'
+        }}
+        for index in range(100)
+    ]
+    sync_manager.local_db.add_pending_operations(operations)
+
+    await sync_manager.sync_data()
+    assert sync_manager.local_db.get_pending_operations() == []
+    assert aws_client.backend.faults.calls_by_operation['batch_write_item'] == 200 // 25
+    assert len(sync_manager.partition_progress) == 200
+    assert all(progress['synced'] == 1 for progress in sync_manager.partition_progress.values())
+
+@pytest.mark.asyncio
+async def test_rejected_batch_only_holds_back_the_bad_operation(sync_manager, aws_client, monkeypatch):
+    products = aws_client.backend.dynamodb().Table('Products')
+    put = products.put
+
+    def reject_p2(item, operation='put_item'):
+        if item['id'] == 'p2':
+            raise fake_aws.client_error('ValidationException', "Item size has exceeded the maximum allowed size", operation)
+        put(item, operation)
+
+    # Un lote con una petición inválida se rechaza entero
+    monkeypatch.setattr(products, 'put', reject_p2)
+    sync_manager.local_db.add_pending_operations([product_operation('p1'), product_operation('p2'), product_operation('p3')])
+    await sync_manager.sync_data()
+    [pending] = sync_manager.local_db.get_pending_operations()
+    assert pending['data']['id'] == 'p2'
+    assert pending['attempts'] == 1
+    assert sorted(products.items) == ['p1', 'p3']
\ No newline at end of file